@@ -0,0 +1,82 @@
+"""
+Palet karşılaştırmasının (color_palette_app/palette_compare.py) kullanıcı başına palet sayısıyla nasıl ölçeklendiğini ölçer.
+
+Kullanım (color_palette dizininden):
+    python benchmarks/compare_benchmark.py [--palettes 1000 5000 10000] [--k 5] [--repeat 5] [--output compare_benchmark.json]
+
+Veritabanı kullanılmaz: sentetik paletler (rastgele sRGB renkleri ve Dirichlet payları) doğrudan dizilere üretilir ve
+bir palet diğer hepsiyle palette_distances ile karşılaştırılır. Her metrik için medyan süre raporlanır; küçük bir
+örnekte Sinkhorn EMD scipy.optimize.linprog ile çözülen gerçek EMD ile karşılaştırılır.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from scipy.optimize import linprog
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'color_palette.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from color_palette_app.models import PALETTE_METRICS  # noqa: E402
+from color_palette_app.palette_compare import ciede2000, palette_distances  # noqa: E402
+
+
+def synthetic_palettes(count, k, seed=0):
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, (count * k, 1, 3), dtype=np.uint8)
+    labs = cv2.cvtColor(rgb.astype(np.float32) / 255.0, cv2.COLOR_RGB2LAB).reshape((count, k, 3)).astype(np.float64)
+    return labs, rng.dirichlet(np.ones(k), count)
+
+
+def exact_emd(query_labs, query_weights, labs, weights):
+    distances = ciede2000(query_labs[:, None, :], labs[None, :, :])
+    rows, columns = distances.shape
+    constraints = [np.kron(np.eye(rows), np.ones(columns)), np.kron(np.ones(rows), np.eye(columns))]
+    return linprog(distances.ravel(), A_eq=np.vstack(constraints), b_eq=np.concatenate([query_weights, weights]),
+                   bounds=(0, None)).fun
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--palettes', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    args = parser.parse_args()
+
+    query_labs, query_weights = synthetic_palettes(1, args.k, seed=1)
+    results = []
+    for count in args.palettes:
+        labs, weights = synthetic_palettes(count, args.k)
+        row = {'palettes': count, 'k': args.k}
+        for metric in PALETTE_METRICS:
+            durations = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                palette_distances(query_labs[0], query_weights[0], labs, weights, metric)
+                durations.append(time.perf_counter() - start)
+            row[f'{metric}_ms'] = float(np.median(durations)) * 1000
+        results.append(row)
+        print(', '.join(f'{key}: {value:.1f}' if isinstance(value, float) else f'{key}: {value}' for key, value in row.items()))
+
+    labs, weights = synthetic_palettes(100, args.k, seed=2)
+    approximate = palette_distances(query_labs[0], query_weights[0], labs, weights, 'emd')
+    exact = np.array([exact_emd(query_labs[0], query_weights[0], labs[i], weights[i]) for i in range(len(labs))])
+    error = {'max_abs_error': float(np.abs(approximate - exact).max()), 'mean_error': float((approximate - exact).mean())}
+    print(f"Sinkhorn - gerçek EMD (100 palet): en büyük fark {error['max_abs_error']:.3f}, ortalama {error['mean_error']:.3f}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'timings': results, 'emd_error': error}, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
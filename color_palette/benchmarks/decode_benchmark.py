@@ -0,0 +1,119 @@
+"""
+Tam çözme + cv2.resize ile küçültülmüş (libjpeg DCT ölçekli) çözmenin süre ve bellek karşılaştırması.
+Küçültülmüş çözme sütunu decode_and_resize_image'dır: bellek bütçesini (IMAGE_DECODE_MEMORY_BUDGET) aşan
+PNG'ler orada şeritler halinde çözülür (bkz. color_palette_app/tiled_decode.py).
+
+Kullanım (color_palette dizininden):
+    python benchmarks/decode_benchmark.py [--repeat 3] [--output decode_benchmark.json]
+
+Her ölçüm ayrı bir alt süreçte yapılır; bellek tepe değeri, görsel baytları okunduktan sonraki
+ru_maxrss artışıdır (OpenCV'nin C++ tarafındaki ayırmaları da dahil). Test görselleri olarak
+PerformanceTest'teki küçük/orta/büyük dosyalar, kodla üretilen 24 MP JPEG/PNG görseller ve 100 MP bir PNG kullanılır.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+TEST_IMAGES_DIR = os.path.join(BASE_DIR, 'media', 'test_images')
+PERFORMANCE_TEST_IMAGES = ['test_images_small.jpg', 'test_images_medium.jpg', 'test_images_large.jpg']
+
+
+def measure(path, mode, repeat, size=(200, 200)):
+    # alt süreçte çalışır: tek bir görsel/yöntem çifti için süre ve bellek tepe değeri
+    import cv2
+    import numpy as np
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'color_palette.settings')
+    import django
+    django.setup()
+    from color_palette_app.imaging import decode_and_resize_image
+
+    with open(path, 'rb') as file:
+        data = file.read()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        if mode == 'full':
+            cv2.resize(cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR), size)
+        else:
+            decode_and_resize_image(data, size)
+        durations.append(time.perf_counter() - start)
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'seconds': sorted(durations)[len(durations) // 2],
+        'peak_memory_mb': (rss_after - rss_before) / 1024,  # linux'ta ru_maxrss KB cinsindendir
+    }
+
+
+def generate_large_images(directory):
+    import cv2
+    import numpy as np
+    rng = np.random.default_rng(0)
+    blocks = rng.integers(0, 256, (40, 60, 3), dtype=np.uint8)
+    img = cv2.resize(blocks, (6000, 4000), interpolation=cv2.INTER_CUBIC)  # 24 MP
+    paths = {
+        'synthetic_24mp_baseline.jpg': [cv2.IMWRITE_JPEG_QUALITY, 90],
+        'synthetic_24mp_progressive.jpg': [cv2.IMWRITE_JPEG_QUALITY, 90, cv2.IMWRITE_JPEG_PROGRESSIVE, 1],
+        'synthetic_24mp.png': [cv2.IMWRITE_PNG_COMPRESSION, 1],
+    }
+    for name, params in paths.items():
+        cv2.imwrite(os.path.join(directory, name), img, params)
+    del img
+    img = cv2.resize(blocks, (10000, 10000), interpolation=cv2.INTER_CUBIC)  # 100 MP, şeritler halinde çözülür
+    cv2.imwrite(os.path.join(directory, 'synthetic_100mp.png'), img, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    return [os.path.join(directory, name) for name in paths] + [os.path.join(directory, 'synthetic_100mp.png')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'MODE'), help=argparse.SUPPRESS)
+    parser.add_argument('--generate', metavar='DIRECTORY', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.generate:
+        print(json.dumps(generate_large_images(args.generate)))
+        return
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], args.child[1], args.repeat)))
+        return
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(TEST_IMAGES_DIR, name) for name in PERFORMANCE_TEST_IMAGES
+                 if os.path.exists(os.path.join(TEST_IMAGES_DIR, name))]
+        # ru_maxrss fork/exec ile alt süreçlere geçtiğinden büyük görseller ana süreçte değil, ayrı bir süreçte üretilir
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--generate', directory],
+                                capture_output=True, text=True, check=True, cwd=BASE_DIR).stdout
+        paths += json.loads(output.strip().splitlines()[-1])
+
+        for path in paths:
+            row = {'image': os.path.basename(path)}
+            for mode in ('full', 'reduced'):
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--repeat', str(args.repeat), '--child', path, mode],
+                    capture_output=True, text=True, check=True, cwd=BASE_DIR,
+                ).stdout
+                row[mode] = json.loads(output.strip().splitlines()[-1])
+            results.append(row)
+            print(f"{row['image']}: tam çözme {row['full']['seconds'] * 1000:.1f} ms / {row['full']['peak_memory_mb']:.1f} MB, "
+                  f"küçültülmüş çözme {row['reduced']['seconds'] * 1000:.1f} ms / {row['reduced']['peak_memory_mb']:.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
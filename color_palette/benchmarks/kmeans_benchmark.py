@@ -0,0 +1,99 @@
+"""
+Piksel tabanlı KMeans (eski apply_kmeans) ile histogram ağırlıklı KMeans motorunu karşılaştırır.
+
+Kullanım (color_palette dizininden):
+    python benchmarks/kmeans_benchmark.py [--repeat 5] [--k 5] [--output kmeans_benchmark.json]
+
+Her test görseli için iki yöntemin ortalama süresi ve paletler arasındaki Delta E uyumu raporlanır.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+from sklearn.cluster import KMeans
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from color_palette_app.clustering import histogram_kmeans, palette_delta_e  # noqa: E402
+
+TEST_IMAGES_DIR = os.path.join(BASE_DIR, 'media', 'test_images')
+
+
+def legacy_apply_kmeans(image, k=5):
+    # değişiklikten önceki apply_kmeans: 40.000 pikselin tamamı, n_init=10, max_iter=1000
+    pixels = image.reshape((-1, 3))
+    kmeans = KMeans(n_clusters=k, random_state=42, max_iter=1000, n_init=10)
+    kmeans.fit(pixels)
+    return kmeans.cluster_centers_
+
+
+def prepare_lab_image(path, size=(200, 200), blur_kernel=5):
+    # views.py'deki boru hattının kümeleme öncesi adımları
+    img = cv2.resize(cv2.imread(path), size)
+    img = cv2.GaussianBlur(img, (blur_kernel, blur_kernel), 0)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+
+
+def synthetic_lab_image(seed=0, size=(200, 200)):
+    # test görselleri yoksa rastgele bloklardan oluşan sentetik bir görüntü kullan
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (8, 8, 3), dtype=np.uint8)
+    img = cv2.resize(blocks, size, interpolation=cv2.INTER_LINEAR)
+    noise = rng.integers(-6, 7, img.shape)
+    img = np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2LAB)
+
+
+def time_call(func, repeat):
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append(time.perf_counter() - start)
+    return result, float(np.median(durations))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    args = parser.parse_args()
+
+    images = []
+    if os.path.isdir(TEST_IMAGES_DIR):
+        for name in sorted(os.listdir(TEST_IMAGES_DIR)):
+            if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                images.append((name, prepare_lab_image(os.path.join(TEST_IMAGES_DIR, name))))
+    if not images:
+        images = [(f'synthetic_{i}', synthetic_lab_image(seed=i)) for i in range(3)]
+
+    results = []
+    for name, img_lab in images:
+        legacy, legacy_time = time_call(lambda: legacy_apply_kmeans(img_lab, args.k), args.repeat)
+        (histogram, _), histogram_time = time_call(lambda: histogram_kmeans(img_lab, args.k), args.repeat)
+        result = {
+            'image': name,
+            'k': args.k,
+            'legacy_seconds': legacy_time,
+            'histogram_seconds': histogram_time,
+            'speedup': legacy_time / histogram_time if histogram_time else None,
+            'mean_delta_e': palette_delta_e(legacy, histogram),
+        }
+        results.append(result)
+        print(f"{name}: piksel KMeans {legacy_time * 1000:.1f} ms, histogram KMeans {histogram_time * 1000:.1f} ms "
+              f"({result['speedup']:.1f}x), ortalama Delta E {result['mean_delta_e']:.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+"""
+WSGI (senkron görünümler) ile ASGI (async görünümler + süreç havuzu) yollarını aynı yük altında karşılaştırır.
+
+Kullanım (color_palette dizininden, gunicorn, uvicorn ve httpx gerekir: pip install gunicorn uvicorn httpx):
+    python benchmarks/load_test.py [--requests 200] [--concurrency 32] [--output load_test.json]
+
+Geçici bir veritabanı ve medya dizini hazırlanır (benchmarks/load_test_settings.py), sonra her mod için tek
+süreçli bir sunucu başlatılır: WSGI modunda gunicorn + wsgi.py (gthread, istekler --concurrency kadar iş
+parçacığında), ASGI modunda uvicorn + asgi.py (PALETTE_ASYNC_VIEWS). İki senaryo ölçülür:
+    upload: POST /process_image/ (dosya okuma, içerik özeti, iş kuyruğa ekleme)
+    edit:   GET /edit_palette/<id>/ (palet önbelleği kapalı, her istek çözme + kümeleme çalıştırır)
+Her senaryo için saniyedeki istek sayısı, p50/p99 gecikme ve yanıt durum kodlarının dağılımı raporlanır.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SETTINGS_MODULE = 'benchmarks.load_test_settings'
+USERNAME, PASSWORD = 'loadtest', 'loadtest-password'
+
+
+def synthetic_jpeg(seed, size=(1600, 1200)):
+    import cv2
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    img = cv2.resize(blocks, size, interpolation=cv2.INTER_CUBIC)
+    return cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, 90])[1].tobytes()
+
+
+def setup_database(palettes):
+    # alt süreçte çalışır: tablolar, test kullanıcısı ve düzenlenecek paletler oluşturulur
+    sys.path.insert(0, BASE_DIR)
+    import django
+    django.setup()
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from color_palette_app.models import ColorPalette
+    from color_palette_app.views import store_upload
+
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user(username=USERNAME, password=PASSWORD)
+    ids = []
+    for seed in range(palettes):
+        image = store_upload(f'load_{seed}.jpg', synthetic_jpeg(seed))
+        ids.append(ColorPalette.objects.create(user=user, image=image, rgb_codes='#000000', k_value=5).id)
+    return ids
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, env, port, threads):
+    if mode == 'wsgi':
+        command = [sys.executable, '-m', 'gunicorn', 'color_palette.wsgi:application', '--bind', f'127.0.0.1:{port}',
+                   '--workers', '1', '--threads', str(threads), '--timeout', '300', '--log-level', 'warning']
+    else:
+        command = [sys.executable, '-m', 'uvicorn', 'color_palette.asgi:application', '--port', str(port),
+                   '--log-level', 'warning']
+    server = subprocess.Popen(command, cwd=BASE_DIR, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.kill()
+    raise RuntimeError(f'{mode} sunucusu başlatılamadı')
+
+
+async def login(client):
+    await client.get('/login/')
+    await client.post('/login/', data={
+        'username': USERNAME, 'password': PASSWORD, 'csrfmiddlewaretoken': client.cookies['csrftoken'],
+    })
+    await client.get('/home/')  # girişten sonra yenilenen csrf çerezini al
+
+
+async def run_scenario(client, make_request, total, concurrency):
+    latencies, statuses = [], {}
+    counter = iter(range(total))
+
+    async def worker():
+        for index in counter:
+            start = time.perf_counter()
+            try:
+                status = str((await make_request(index)).status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': total,
+        'statuses': statuses,  # 503: boru hattı sınırı doldu (Retry-After ile reddedildi)
+        'requests_per_second': total / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+async def benchmark_server(port, palette_ids, uploads, total, concurrency):
+    import httpx
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', timeout=120, limits=limits) as client:
+        await login(client)
+        token = client.cookies['csrftoken']
+
+        async def upload(index):
+            return await client.post('/process_image/', data={'k': 5, 'blur_kernel': 5, 'csrfmiddlewaretoken': token},
+                                     files={'image': (f'upload_{index}.jpg', uploads[index % len(uploads)], 'image/jpeg')})
+
+        async def edit(index):
+            return await client.get(f'/edit_palette/{palette_ids[index % len(palette_ids)]}/')
+
+        await edit(0)  # ısınma: görüntü işleme modülü ve süreç havuzu ilk istekte yüklenir
+        return {
+            'upload': await run_scenario(client, upload, total, concurrency),
+            'edit': await run_scenario(client, edit, total, concurrency),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=200, help='senaryo başına istek sayısı')
+    parser.add_argument('--concurrency', type=int, default=32, help='eşzamanlı istemci sayısı')
+    parser.add_argument('--palettes', type=int, default=20, help='düzenleme senaryosunda kullanılan palet sayısı')
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    parser.add_argument('--setup', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.setup:
+        print(json.dumps(setup_database(args.palettes)))
+        return
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=SETTINGS_MODULE, LOAD_TEST_DIR=directory, PYTHONPATH=BASE_DIR)
+        env.pop('PALETTE_ASYNC_VIEWS', None)
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--setup', '--palettes', str(args.palettes)],
+                                env=env, cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout
+        palette_ids = json.loads(output.strip().splitlines()[-1])
+        uploads = [synthetic_jpeg(1000 + seed) for seed in range(8)]
+
+        for mode in ('wsgi', 'asgi'):
+            port = free_port()
+            server = start_server(mode, env, port, args.concurrency)
+            try:
+                results[mode] = asyncio.run(benchmark_server(port, palette_ids, uploads, args.requests, args.concurrency))
+            finally:
+                server.terminate()
+                server.wait()
+            for scenario, row in results[mode].items():
+                print(f"{mode} {scenario:<7} {row['requests_per_second']:7.1f} istek/s   p50 {row['p50_ms']:8.1f} ms   "
+                      f"p99 {row['p99_ms']:8.1f} ms   durum {row['statuses']}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'concurrency': args.concurrency, 'cpu_count': os.cpu_count(), 'results': results}, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""
+load_test.py'nin başlattığı sunucular için ayarlar: proje ayarları + geçici veritabanı ve medya dizini.
+Palet önbelleği kapatılır, böylece her düzenleme isteği çözme ve kümelemeyi gerçekten çalıştırır.
+"""
+import os
+
+from color_palette.settings import *  # noqa: F401,F403
+
+LOAD_TEST_DIR = os.environ['LOAD_TEST_DIR']
+
+DEBUG = False
+ALLOWED_HOSTS = ['127.0.0.1', 'localhost']
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(LOAD_TEST_DIR, 'db.sqlite3'),
+        'OPTIONS': {'timeout': 30},
+    }
+}
+MEDIA_ROOT = os.path.join(LOAD_TEST_DIR, 'media')
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'palettes': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},  # her istek önbelleği ıskalar
+}
+UPLOAD_WRITE_IN_BACKGROUND = False
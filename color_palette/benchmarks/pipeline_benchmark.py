@@ -0,0 +1,195 @@
+"""
+Palet boru hattının her aşamasını ayrı ayrı ölçen ve sonuçları kayıtlı bir taban çizgisiyle (baseline) karşılaştıran benchmark.
+
+Kullanım (color_palette dizininden):
+    python benchmarks/pipeline_benchmark.py [--repeat 15] [--output pipeline_benchmark.json]
+    python benchmarks/pipeline_benchmark.py --baseline benchmarks/baselines/pipeline.json [--threshold 0.25]
+    python benchmarks/pipeline_benchmark.py --update-baseline benchmarks/baselines/pipeline.json
+
+Görseller kodla üretilir (küçük/orta/büyük JPEG), test görseli dosyalarına ihtiyaç yoktur.
+Her aşama için medyan ve p95 süre (ms) ile tepe bellek (KB) raporlanır. Bellek tracemalloc ile ölçülür:
+numpy dizileri (OpenCV'nin döndürdüğü diziler dahil) sayılır, OpenCV'nin C++ içindeki geçici tamponları sayılmaz.
+
+--baseline verilirse her aşamanın medyan süresi ve tepe belleği taban çizgisiyle karşılaştırılır; değer
+--threshold oranından (varsayılan %25) ve --min-delta-ms / --min-delta-kb gürültü payından fazla artmışsa
+gerileme (regression) olarak raporlanır ve komut 1 çıkış koduyla sonlanır.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from io import BytesIO
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'color_palette.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from color_palette_app.imaging import (  # noqa: E402
+    WORKING_SIZE, apply_gaussian_blur, apply_kmeans, convert_to_lab, lab_to_rgb,
+    load_and_resize_image, save_palette_to_base64, visualize_palette,
+)
+from color_palette_app.views import validate_image_format  # noqa: E402
+
+IMAGE_SIZES = {  # görsel adı -> (genişlik, yükseklik)
+    'small_640x480': (640, 480),
+    'medium_1920x1080': (1920, 1080),
+    'large_4000x3000': (4000, 3000),
+}
+STAGES = [
+    'validate_image_format', 'load_and_resize_image', 'apply_gaussian_blur', 'convert_to_lab',
+    'apply_kmeans', 'lab_to_rgb', 'visualize_palette', 'save_palette_to_base64',
+]
+
+
+def synthetic_image(size, seed=0):
+    # rastgele renk bloklarının yumuşak geçişlerle büyütülmesi + hafif gürültü: fotoğrafa benzer bir histogram
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(0, 256, (12, 16, 3), dtype=np.uint8)
+    img = cv2.resize(blocks, size, interpolation=cv2.INTER_CUBIC)
+    noise = rng.integers(-8, 9, img.shape)
+    return np.clip(img.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def percentile(values, q):
+    return float(np.percentile(np.asarray(values), q))
+
+
+def measure_stage(func, repeat):
+    """
+    Aşamayı repeat kez çalıştırır; (son sonuç, medyan ms, p95 ms, tepe bellek KB) döndürür.
+    Bellek ölçümü ayrı bir çalıştırmada yapılır, tracemalloc'un yükü süreleri etkilemez.
+    """
+    func()  # ısınma (ilk çağrıdaki içe aktarma/önbellek maliyetleri ölçüme girmez)
+    durations = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        durations.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, float(np.median(durations)), percentile(durations, 95), peak / 1024
+
+
+def benchmark_image(path, data, repeat, k):
+    """Tek bir görsel için boru hattını aşama aşama çalıştırır, her aşamaya bir önceki aşamanın çıktısı verilir."""
+    stages = {}
+
+    def record(name, func):
+        result, median_ms, p95_ms, peak_kb = measure_stage(func, repeat)
+        stages[name] = {'median_ms': median_ms, 'p95_ms': p95_ms, 'peak_memory_kb': peak_kb}
+        return result
+
+    record('validate_image_format', lambda: validate_image_format(BytesIO(data)))
+    img_resized = record('load_and_resize_image', lambda: load_and_resize_image(path, WORKING_SIZE))
+    img_blurred = record('apply_gaussian_blur', lambda: apply_gaussian_blur(img_resized, (5, 5)))
+    img_lab = record('convert_to_lab', lambda: convert_to_lab(img_blurred))
+    centroids_lab = record('apply_kmeans', lambda: apply_kmeans(img_lab, k))
+    centroids_rgb = record('lab_to_rgb', lambda: lab_to_rgb(centroids_lab))
+    palette_image = record('visualize_palette', lambda: visualize_palette(centroids_rgb))
+    record('save_palette_to_base64', lambda: save_palette_to_base64(palette_image))
+    return stages
+
+
+def run_benchmark(repeat, k):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for seed, (name, size) in enumerate(IMAGE_SIZES.items()):
+            path = os.path.join(directory, f'{name}.jpg')
+            cv2.imwrite(path, synthetic_image(size, seed), [cv2.IMWRITE_JPEG_QUALITY, 90])
+            with open(path, 'rb') as file:
+                data = file.read()
+            results[name] = benchmark_image(path, data, repeat, k)
+    return {
+        'meta': {
+            'repeat': repeat,
+            'k': k,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+        },
+        'results': results,
+    }
+
+
+def compare_to_baseline(report, baseline, threshold, min_delta_ms=0.5, min_delta_kb=64.0):
+    """
+    Raporu taban çizgisiyle karşılaştırır; gerilemelerin listesini döndürür.
+    Bir metrik hem oransal eşiği hem de mutlak gürültü payını aşarsa gerileme sayılır.
+    """
+    regressions = []
+    for image, stages in report['results'].items():
+        for stage, metrics in stages.items():
+            base = baseline.get('results', {}).get(image, {}).get(stage)
+            if base is None:
+                continue  # taban çizgisinde olmayan görsel/aşama karşılaştırılmaz
+            for metric, min_delta in (('median_ms', min_delta_ms), ('peak_memory_kb', min_delta_kb)):
+                old, new = base[metric], metrics[metric]
+                if new - old > min_delta and new > old * (1 + threshold):
+                    regressions.append({
+                        'image': image, 'stage': stage, 'metric': metric,
+                        'baseline': old, 'current': new, 'ratio': new / old if old else None,
+                    })
+    return regressions
+
+
+def print_report(report):
+    for image, stages in report['results'].items():
+        print(image)
+        for stage in STAGES:
+            metrics = stages[stage]
+            print(f"  {stage:<24} medyan {metrics['median_ms']:8.2f} ms   p95 {metrics['p95_ms']:8.2f} ms   "
+                  f"tepe bellek {metrics['peak_memory_kb']:10.1f} KB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=15)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    parser.add_argument('--baseline', default=None, help='karşılaştırılacak taban çizgisi json dosyası')
+    parser.add_argument('--update-baseline', default=None, metavar='PATH', help='sonuçları yeni taban çizgisi olarak yaz')
+    parser.add_argument('--threshold', type=float, default=0.25, help='gerileme sayılacak oransal artış (0.25 = %%25)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help='süre için mutlak gürültü payı (ms)')
+    parser.add_argument('--min-delta-kb', type=float, default=64.0, help='bellek için mutlak gürültü payı (KB)')
+    args = parser.parse_args()
+
+    report = run_benchmark(args.repeat, args.k)
+    print_report(report)
+
+    for path in (args.output, args.update_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, 'w') as file:
+                json.dump(report, file, indent=4)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare_to_baseline(report, baseline, args.threshold, args.min_delta_ms, args.min_delta_kb)
+        if regressions:
+            print(f'\n{len(regressions)} gerileme bulundu (eşik %{args.threshold * 100:.0f}):')
+            for item in regressions:
+                print(f"  {item['image']} / {item['stage']} / {item['metric']}: "
+                      f"{item['baseline']:.2f} -> {item['current']:.2f}")
+            sys.exit(1)
+        print('\nTaban çizgisine göre gerileme yok.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Kayıtlı tüm palet algoritmalarının (quantizers.py) süresini ve KMeans paletine göre Delta E farkını ölçer.
+
+Kullanım (color_palette dizininden):
+    python benchmarks/quantizer_benchmark.py [--repeat 5] [--k 5] [--output quantizer_benchmark.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from benchmarks.kmeans_benchmark import TEST_IMAGES_DIR, prepare_lab_image, synthetic_lab_image, time_call  # noqa: E402
+from color_palette_app.clustering import palette_delta_e  # noqa: E402
+from color_palette_app.quantizers import QUANTIZERS, DEFAULT_QUANTIZER  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    args = parser.parse_args()
+
+    images = []
+    if os.path.isdir(TEST_IMAGES_DIR):
+        for name in sorted(os.listdir(TEST_IMAGES_DIR)):
+            if name.lower().endswith(('.jpg', '.jpeg', '.png')):
+                images.append((name, prepare_lab_image(os.path.join(TEST_IMAGES_DIR, name))))
+    if not images:
+        images = [(f'synthetic_{i}', synthetic_lab_image(seed=i)) for i in range(3)]
+
+    results = []
+    for name, img_lab in images:
+        reference, _ = QUANTIZERS[DEFAULT_QUANTIZER](img_lab, args.k)
+        line = []
+        for algorithm, quantizer in sorted(QUANTIZERS.items()):
+            (centroids, _), seconds = time_call(lambda: quantizer(img_lab, args.k), args.repeat)
+            delta = palette_delta_e(reference, centroids)
+            results.append({'image': name, 'algorithm': algorithm, 'k': args.k, 'seconds': seconds, 'mean_delta_e': delta})
+            line.append(f'{algorithm} {seconds * 1000:.1f} ms (ΔE {delta:.2f})')
+        print(f"{name}: " + ', '.join(line))
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
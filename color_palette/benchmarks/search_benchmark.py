@@ -0,0 +1,114 @@
+"""
+Renk araması ızgara indeksinin (color_palette_app/color_search.py) kurulum, sorgu ve güncelleme sürelerini ölçer.
+
+Kullanım (color_palette dizininden):
+    python benchmarks/search_benchmark.py [--palettes 200000] [--k 5] [--queries 200] [--output search_benchmark.json]
+
+Veritabanı kullanılmaz: tek kullanıcıya ait sentetik paletler (varsayılan 200.000 x 5 = 1M renk) doğrudan
+ColorGrid.from_arrays ile indekslenir. Renkler gerçek paletlere benzesin diye rastgele sRGB renklerinden
+LAB'a çevrilir. En yakın renk ve benzer palet sorgularının p50/p99 süreleri, tek palet ekleme/silme ve
+anlık görüntü kaydetme/yükleme süreleri raporlanır. En yakın renk sonuçları kaba kuvvet taramasıyla doğrulanır.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'color_palette.settings')
+
+import django  # noqa: E402
+django.setup()
+
+from color_palette_app.color_search import ColorGrid, nearest_per_palette  # noqa: E402
+
+
+def synthetic_labs(count, seed=0):
+    rng = np.random.default_rng(seed)
+    rgb = rng.integers(0, 256, (count, 1, 3), dtype=np.uint8)
+    lab = cv2.cvtColor(rgb.astype(np.float32) / 255.0, cv2.COLOR_RGB2LAB)  # float girişte gerçek CIELAB döner
+    return lab.reshape((-1, 3))
+
+
+def percentiles(durations):
+    durations = np.asarray(durations) * 1000
+    return {'p50_ms': float(np.percentile(durations, 50)), 'p99_ms': float(np.percentile(durations, 99))}
+
+
+def timed(func, repeat):
+    durations = []
+    for args in repeat:
+        start = time.perf_counter()
+        func(*args)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--palettes', type=int, default=200000)
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--n', type=int, default=10, help='sorgu başına sonuç sayısı')
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    args = parser.parse_args()
+
+    count = args.palettes * args.k
+    labs = synthetic_labs(count)
+    palette_ids = np.repeat(np.arange(1, args.palettes + 1, dtype=np.int64), args.k)
+    positions = np.tile(np.arange(args.k, dtype=np.int16), args.palettes)
+
+    start = time.perf_counter()
+    grid = ColorGrid.from_arrays(palette_ids, positions, labs)
+    build_seconds = time.perf_counter() - start
+    print(f'{count} renk, {len(grid.cells)} hücre: kurulum {build_seconds:.2f} sn')
+
+    targets = synthetic_labs(args.queries, seed=1)
+    nearest = timed(lambda lab: grid.nearest(lab, args.n), [(lab,) for lab in targets])
+    # doğrulama: ilk birkaç sorgu kaba kuvvet taramasıyla aynı uzaklıkları bulmalı
+    for lab in targets[:5]:
+        expected = nearest_per_palette(palette_ids, np.linalg.norm(labs - lab, axis=1), positions)[1][:args.n]
+        assert np.allclose(grid.nearest(lab, args.n)[1], expected, atol=1e-4), 'ızgara sonucu kaba kuvvetle uyuşmuyor'
+    brute = timed(lambda lab: np.linalg.norm(labs - lab, axis=1).argpartition(args.n), [(lab,) for lab in targets[:20]])
+    print(f"en yakın renk: {percentiles(nearest)} (kaba kuvvet p50 {percentiles(brute)['p50_ms']:.1f} ms)")
+
+    query_palettes = np.random.default_rng(2).integers(1, args.palettes + 1, max(1, args.queries // 4))
+    similar = timed(lambda palette_id: grid.similar(grid.palettes[palette_id], args.n, exclude=palette_id),
+                    [(int(palette_id),) for palette_id in query_palettes])
+    print(f'benzer palet: {percentiles(similar)}')
+
+    new_ids = range(args.palettes + 1, args.palettes + 101)
+    new_labs = synthetic_labs(100 * args.k, seed=3).reshape((100, args.k, 3))
+    add = timed(grid.add, list(zip(new_ids, new_labs)))
+    remove = timed(grid.remove, [(palette_id,) for palette_id in new_ids])
+    print(f'palet ekleme: {percentiles(add)}, silme: {percentiles(remove)}')
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'index.npz')
+        start = time.perf_counter()
+        np.savez(path, palette_ids=palette_ids, positions=positions, labs=labs)
+        save_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        with np.load(path) as data:
+            ColorGrid.from_arrays(data['palette_ids'], data['positions'], data['labs'])
+        load_seconds = time.perf_counter() - start
+    print(f'anlık görüntü kaydetme {save_seconds:.2f} sn, yükleyip kurma {load_seconds:.2f} sn')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({
+                'colors': count, 'cells': len(grid.cells), 'build_seconds': build_seconds,
+                'nearest': percentiles(nearest), 'brute_force': percentiles(brute), 'similar': percentiles(similar),
+                'add': percentiles(add), 'remove': percentiles(remove),
+                'save_seconds': save_seconds, 'load_seconds': load_seconds,
+            }, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
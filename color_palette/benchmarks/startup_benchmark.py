@@ -0,0 +1,105 @@
+"""
+Süreç başlangıç süresi ve bellek benchmark'ı: manage.py komutları, WSGI worker açılışı ve hafif
+görünümler ağır görüntü işleme kütüphanelerini (OpenCV, numpy, scikit-learn, PIL) yüklemeden çalışmalıdır.
+
+Kullanım (color_palette dizininden):
+    python benchmarks/startup_benchmark.py [--repeat 5] [--output startup_benchmark.json]
+
+Her senaryo ayrı bir Python sürecinde çalıştırılır; süre, yorumlayıcının açılışı dahil süreç başlangıcından
+senaryonun sonuna kadar geçen duvar saati süresidir. Bellek, sürecin ru_maxrss tepe değeridir.
+Her senaryo için hangi ağır modüllerin yüklendiği de raporlanır.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('cv2', 'numpy', 'sklearn', 'PIL')
+
+
+def scenario_manage_check():
+    from django.core.management import call_command
+    call_command('check', verbosity=0)
+
+
+def scenario_wsgi_boot():
+    # WSGI worker açılışı: uygulama nesnesi ve URL yapılandırması (ilk istekte yüklenen görünüm modülleri dahil)
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+    get_wsgi_application()
+    get_resolver().url_patterns
+
+
+def scenario_login_request():
+    from django.test import Client
+    Client().get('/login/', HTTP_HOST='localhost')
+
+
+def scenario_pipeline_first_use():
+    # görüntü işleme modülünün ilk kullanımda ödenen maliyeti (ör. edit_palette'in ilk çağrısı)
+    from django.urls import get_resolver
+    get_resolver().url_patterns
+    from color_palette_app.clustering import weighted_kmeans
+    import numpy as np
+    from color_palette_app import imaging  # noqa: F401
+    weighted_kmeans(np.random.default_rng(0).random((50, 3)), np.ones(50), 3)
+
+
+SCENARIOS = {
+    'manage_check': scenario_manage_check,
+    'wsgi_boot': scenario_wsgi_boot,
+    'login_request': scenario_login_request,
+    'pipeline_first_use': scenario_pipeline_first_use,
+}
+
+
+def run_child(name, started):
+    sys.path.insert(0, BASE_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'color_palette.settings')
+    import django
+    django.setup()
+    SCENARIOS[name]()
+    return {
+        'seconds': time.time() - started,
+        'peak_memory_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,  # linux'ta KB
+        'heavy_modules': [module for module in HEAVY_MODULES if module in sys.modules],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help='sonuçların yazılacağı json dosyası')
+    parser.add_argument('--child', nargs=2, metavar=('SCENARIO', 'STARTED'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child[0], float(args.child[1]))))
+        return
+
+    results = []
+    for name in SCENARIOS:
+        runs = []
+        for _ in range(args.repeat):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', name, repr(time.time())],
+                capture_output=True, text=True, check=True, cwd=BASE_DIR,
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        runs.sort(key=lambda run: run['seconds'])
+        median = runs[len(runs) // 2]
+        results.append({'scenario': name, **median})
+        print(f"{name:<20} {median['seconds'] * 1000:7.0f} ms  {median['peak_memory_mb']:6.1f} MB  "
+              f"yüklenen ağır modüller: {', '.join(median['heavy_modules']) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,6 +9,14 @@ test_files = [
     "color_palette_app.tests.test_models",  # model testleri
     "color_palette_app.tests.test_utils",  # yardımcı fonksiyon testleri
     "color_palette_app.tests.test_views",  # view fonksiyonlarının testleri
+    "color_palette_app.tests.test_cache",  # palet sonuç önbelleği testleri
+    "color_palette_app.tests.test_previews",  # bulanık/LAB önizleme testleri
+    "color_palette_app.tests.test_metrics",  # Server-Timing ve /metrics testleri
+    "color_palette_app.tests.test_concurrency",  # eşzamanlılık sınırı testleri
+    "color_palette_app.tests.test_async",  # ASGI async görünüm testleri
+    "color_palette_app.tests.test_batch",  # toplu yükleme testleri
+    "color_palette_app.tests.test_search",  # renk araması testleri
+    "color_palette_app.tests.test_export",  # dışa aktarım testleri
 ]
 
 def run_tests_and_collect_results(output_format="csv"):
@@ -12,5 +12,10 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "color_palette.settings")
+os.environ.setdefault("PALETTE_ASYNC_VIEWS", "1")  # yükleme/düzenleme görünümlerinin async sürümlerini kullan
 
 application = get_asgi_application()
+
+from color_palette_app.background import start_search_index_warmup  # noqa: E402  uygulamalar yüklendikten sonra
+
+start_search_index_warmup()  # renk araması indeksi ilk aramayı beklemeden arka planda yüklenir
@@ -42,6 +42,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "color_palette_app.middleware.ServerTimingMiddleware",  # aşama sürelerini Server-Timing başlığına yazar
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -82,6 +83,40 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "palettes": {  # palet sonuç önbelleği (LocMemCache, MAX_ENTRIES aşılınca LRU tahliye yapar)
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "palettes",
+        "TIMEOUT": None,
+        "OPTIONS": {"MAX_ENTRIES": 5000},
+    },
+}
+
+# Palet sonuç önbelleği: 'django' (yukarıdaki CACHES takma adı) ya da 'disk' (yerel LRU dizini)
+PALETTE_CACHE = {
+    "BACKEND": "django",
+    "ALIAS": "palettes",
+    # "BACKEND": "disk",
+    # "DIRECTORY": BASE_DIR / "palette_cache",
+    # "MAX_BYTES": 64 * 1024 * 1024,
+    # "MAX_ENTRIES": 10000,
+}
+
+# Renk araması indeksi (bkz. color_palette_app/color_search.py): anlık görüntü dosyası ve en sık kaydetme aralığı (saniye).
+# INDEX_PATH None ise indeks yalnızca bellekte tutulur ve her süreç ilk aramada veritabanından kurar.
+PALETTE_SEARCH = {
+    "INDEX_PATH": BASE_DIR / "palette_search_index.npz",
+    "SAVE_INTERVAL": 60,
+    "WARM_ON_STARTUP": True,  # wsgi.py/asgi.py indeksi açılışta arka planda yükler (dosyayı dağıtımda build_search_index kurar)
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -152,4 +187,37 @@ AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
     },
-]
\ No newline at end of file
+]
+# Ana sayfada bir seferde listelenen palet sayısı (sonraki sayfalar imleçle yüklenir)
+PALETTES_PER_PAGE = 24
+
+# Bulanık/LAB önizleme görselleri: istek anında üretilir, previews/ altında saklanır
+PREVIEW_FORMAT = 'webp'  # 'webp' ya da 'jpeg'
+PREVIEW_QUALITY = 80
+PREVIEW_TTL = 7 * 24 * 60 * 60  # sweep_previews komutunun sildiği önizlemelerin yaşı (saniye)
+
+# Aşama süreleri ve /metrics uç noktası (bkz. color_palette_app/metrics.py)
+SERVER_TIMING_ENABLED = True
+METRICS_ENABLED = True
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # ayarlanırsa /metrics/ 'Authorization: Bearer <token>' ister
+INTERNAL_IPS = []  # token yokken /metrics/'e erişebilen adresler (ters vekil arkasında 127.0.0.1 eklemeyin)
+
+# CPU yoğun boru hattının (çözme + kümeleme) eşzamanlılık sınırları (bkz. color_palette_app/concurrency.py)
+PIPELINE_MAX_CONCURRENCY = max(1, (os.cpu_count() or 2) // 2)  # süreç başına aynı anda çalışan kümeleme işi
+PIPELINE_THREADS_PER_JOB = 1  # iş başına OpenCV/BLAS/OpenMP iş parçacığı sayısı
+PIPELINE_QUEUE_SIZE = 8  # sınır doluyken bekleyebilecek istek sayısı, fazlası 503 alır
+PIPELINE_QUEUE_TIMEOUT = 30  # sırada en fazla bekleme süresi (saniye)
+PIPELINE_RETRY_AFTER = 5  # 503 yanıtlarındaki Retry-After değeri (saniye)
+PALETTE_JOB_QUEUE_LIMIT = 1000  # kuyrukta bekleyen iş bu sayıya ulaşınca yeni yüklemeler 503 alır (None = sınırsız)
+PALETTE_JOB_LEASE_SECONDS = 120  # heartbeat'i bu kadar süre yenilenmeyen 'running' iş (worker ölmüş) yeniden kuyruğa alınır
+PALETTE_JOB_MAX_ATTEMPTS = 3  # bir işin en fazla kaç kez üstlenileceği, sonra 'failed' olur
+PALETTE_MAX_K = 20  # yükleme ve düzenlemede izin verilen en büyük k (karşılaştırma dizileri en büyük palete göre boyutlanır)
+PALETTE_SWEEP_MAX_K = 16  # çoklu k taramasında izin verilen en büyük k
+PALETTE_BATCH_MAX_FILES = 50  # toplu yüklemede bir istekteki en fazla görsel sayısı
+PALETTE_SEARCH_MAX_RESULTS = 50  # renk aramasında döndürülen en fazla palet sayısı
+IMAGE_MAX_PIXELS = 250_000_000  # başlığındaki boyutu bundan büyük görseller (decompression bomb) çözülmeden reddedilir
+IMAGE_DECODE_MEMORY_BUDGET = 256 * 2 ** 20  # tek bir görseli çözmenin tahmini tepe belleği bunu aşarsa şeritler halinde çözülür (bayt)
+PIPELINE_PROCESS_START_METHOD = 'spawn'  # async görünümlerin ve toplu yüklemenin süreç havuzu için başlatma yöntemi
+
+# asgi.py bu değişkeni ayarlar: process_image, edit_palette ve process_batch'in async sürümleri kullanılır
+PALETTE_ASYNC_VIEWS = os.environ.get('PALETTE_ASYNC_VIEWS') == '1'
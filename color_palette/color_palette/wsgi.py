@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "color_palette.settings")
 
 application = get_wsgi_application()
+
+from color_palette_app.background import start_search_index_warmup  # noqa: E402  uygulamalar yüklendikten sonra
+
+start_search_index_warmup()  # renk araması indeksi ilk aramayı beklemeden arka planda yüklenir
@@ -1,6 +1,8 @@
 from django.contrib import admin
 
-from .models import ImageUpload, ColorPalette
+from .models import ImageUpload, ColorPalette, PaletteColor, PaletteJob
 
 admin.site.register(ImageUpload)
 admin.site.register(ColorPalette)
+admin.site.register(PaletteJob)
+admin.site.register(PaletteColor)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ColorPaletteAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "color_palette_app"
+
+    def ready(self):
+        from . import signals  # noqa: F401  sinyal alıcılarını kaydet
+        from .concurrency import configure_native_threads
+        configure_native_threads()  # numpy/scikit-learn yüklenmeden önce BLAS/OpenMP iş parçacığı sayısını sınırla
@@ -0,0 +1,48 @@
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from django.conf import settings
+from django.db import connection
+
+# İstek yanıtını bekletmemesi gereken küçük yan işler (ör. yüklenen dosyanın diske yazılması)
+# için süreç içi iş parçacığı havuzu. UPLOAD_WRITE_IN_BACKGROUND kapalıysa işler senkron çalışır.
+_executor = ThreadPoolExecutor(max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2), thread_name_prefix='palette-bg')
+logger = logging.getLogger(__name__)
+
+
+def _run(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        # Future'ı kimse beklemeyebilir; hata kaybolmasın diye loglanır, Future'a da yine iletilir
+        logger.exception('Arka plan işi başarısız oldu: %s', getattr(func, '__qualname__', func))
+        raise
+    finally:
+        connection.close()  # iş parçacığına ait veritabanı bağlantısını açık bırakma
+
+
+def run_in_background(func, *args, **kwargs):
+    """func'ı arka planda çalıştırır ve bir Future döndürür. Senkron kipte func'ın hatası doğrudan fırlatılır."""
+    if getattr(settings, 'UPLOAD_WRITE_IN_BACKGROUND', True):
+        return _executor.submit(_run, func, args, kwargs)
+    future = Future()
+    future.set_result(func(*args, **kwargs))
+    return future
+
+
+def start_search_index_warmup():
+    """
+    Sunucu açılışında (wsgi.py/asgi.py) renk araması indeksini ayrı bir iş parçacığında yükler, böylece ilk arama
+    isteği indeksin yüklenmesini beklemez. PALETTE_SEARCH["WARM_ON_STARTUP"] kapalıysa hiçbir şey yapmaz.
+    numpy ve indeks modülü yalnızca bu iş parçacığında yüklenir; django.setup() hafif kalır.
+    """
+    if not getattr(settings, 'PALETTE_SEARCH', {}).get('WARM_ON_STARTUP'):
+        return None
+
+    def warm():
+        from .color_search import warm_search_index
+        _run(warm_search_index, (), {})
+
+    thread = threading.Thread(target=warm, name='palette-search-warmup', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,208 @@
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, wait
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from .concurrency import PipelineBusy, get_process_executor
+from .models import ColorPalette, ImageUpload, PaletteColor
+from .palette_cache import get_palette_cache, image_digest
+from .palette_colors import palette_color_rows
+from .signals import adjust_image_refs
+
+# Toplu yükleme: çok sayıda görsel aynı k/blur/algoritma ile süreç havuzunda paralel işlenir.
+# Aynı içerikli dosyalar bir kez işlenir, önbellekte sonucu olanlar hiç işlenmez.
+# Her görsel bitince bir ilerleme olayı üretilir; kayıtlar (ImageUpload, ColorPalette) sonda bulk_create ile eklenir.
+
+
+class PaletteBatch:
+    """
+    Bir toplu yüklemeyi çalıştırır ve ilerleme olaylarını (sözlük) üretir:
+        {'event': 'accepted', 'total': n}
+        {'event': 'image', 'index': i, 'name': ..., 'status': 'done' | 'failed', 'rgb_codes' | 'error', 'completed', 'total'}
+        {'event': 'done', 'palettes': [{'index', 'name', 'palette_id'}], 'failed': m, 'seconds': t}
+    Senkron görünümler `for event in batch`, async görünümler `async for event in batch` ile kullanır.
+    files: (dosya adı, baytlar, hata mesajı) üçlüleri; hata mesajı olan dosyalar işlenmeden 'failed' olur.
+    Havuza aynı anda en fazla PIPELINE_MAX_CONCURRENCY görsel gönderilir, böylece toplam süre görsel sayısıyla
+    değil çekirdek sayısıyla ölçeklenir ve havuzun bekleme sırası diğer isteklere açık kalır.
+    """
+
+    def __init__(self, user, files, k, blur_kernel, algorithm):
+        self.user = user
+        self.k = k
+        self.blur_kernel = blur_kernel
+        self.algorithm = algorithm
+        self.items = [{'index': index, 'name': name, 'data': data, 'error': error}
+                      for index, (name, data, error) in enumerate(files)]
+        self.groups = {}  # içerik özeti -> aynı içerikli dosyalar
+        self.waiting = []  # havuza henüz gönderilmemiş özetler
+        self.running = {}  # future -> özet
+        self.completed = 0
+        self.started = time.perf_counter()
+
+    def __iter__(self):
+        yield from self.start()
+        while self.waiting or self.running:
+            yield from self.complete(self.wait_next())
+        yield self.save()
+
+    async def __aiter__(self):
+        for event in await sync_to_async(self.start)():
+            yield event
+        while self.waiting or self.running:
+            # bekleme veritabanına dokunmaz, olay döngüsünü ve senkron iş parçacığını bekletmemek için ayrı iş parçacığında
+            outcomes = await sync_to_async(self.wait_next, thread_sensitive=False)()
+            for event in await sync_to_async(self.complete)(outcomes):
+                yield event
+        yield await sync_to_async(self.save)()
+
+    def start(self):
+        """Özetleri hesaplar; geçersiz ve önbellekte sonucu olan dosyaları hemen sonuçlandırır."""
+        from .imaging import WORKING_SIZE, lookup_palette # görüntü işleme modülü ilk kullanımda yüklenir
+
+        events = [{'event': 'accepted', 'total': len(self.items)}]
+        for item in self.items:
+            if item['error']:
+                events.append(self.finish_item(item, error=item['error']))
+                continue
+            item['digest'] = image_digest(item['data'])
+            self.groups.setdefault(item['digest'], []).append(item)
+
+        for digest, group in self.groups.items():
+            first = group[0]
+            first['key'], cached = lookup_palette(first['data'], self.k, self.blur_kernel, self.algorithm,
+                                                  WORKING_SIZE, digest)
+            if cached is not None:
+                events += self.complete([(digest, cached, None)], cache=False)
+            else:
+                self.waiting.append(digest)
+        return events
+
+    def wait_next(self):
+        """
+        Havuzu PIPELINE_MAX_CONCURRENCY işe kadar doldurur ve en az biri bitene kadar bekler.
+        Dönüş: (özet, sonuç, hata) listesi. Havuz başka isteklerle doluysa PIPELINE_QUEUE_TIMEOUT
+        boyunca tekrar denenir, süre dolarsa sıradaki görsel meşgul hatasıyla sonuçlanır.
+        """
+        from .imaging import palette_from_bytes
+
+        executor = get_process_executor()
+        deadline = time.monotonic() + getattr(settings, 'PIPELINE_QUEUE_TIMEOUT', 30)
+        while self.waiting and len(self.running) < executor.max_concurrency:
+            digest = self.waiting[0]
+            try:
+                future = executor.submit(palette_from_bytes, self.groups[digest][0]['data'],
+                                         self.k, self.blur_kernel, self.algorithm)
+            except PipelineBusy as e:
+                if self.running:
+                    break  # kendi işlerimizden biri bitince tekrar denenir
+                if time.monotonic() >= deadline:
+                    self.waiting.pop(0)
+                    return [(digest, None, str(e))]
+                time.sleep(0.05)
+                continue
+            self.waiting.pop(0)
+            self.running[future] = digest
+
+        done, _ = wait(self.running, return_when=FIRST_COMPLETED)
+        outcomes = []
+        for future in done:
+            digest = self.running.pop(future)
+            try:
+                outcomes.append((digest, future.result(), None))
+            except Exception as e:
+                outcomes.append((digest, None, str(e)))
+        return outcomes
+
+    def complete(self, outcomes, cache=True):
+        events = []
+        for digest, result, error in outcomes:
+            group = self.groups[digest]
+            if result is not None and cache:
+                get_palette_cache().set(group[0]['key'], result)
+            for item in group:
+                events.append(self.finish_item(item, result, error))
+        return events
+
+    def finish_item(self, item, result=None, error=None):
+        self.completed += 1
+        event = {'event': 'image', 'index': item['index'], 'name': item['name'],
+                 'completed': self.completed, 'total': len(self.items)}
+        if result is not None:
+            item['rgb_codes'] = result['rgb_codes']
+            item['weights'] = result['weights']
+            event.update(status='done', rgb_codes=result['rgb_codes'])
+        else:
+            item['error'] = error
+            event.update(status='failed', error=error)
+        return event
+
+    def save(self):
+        """Başarılı görsellerin kayıtlarını toplu ekler ve son olayı döndürür."""
+        done = [item for item in self.items if item.get('rgb_codes')]
+        images = store_images({item['digest']: (item['name'], ContentFile(item['data'])) for item in done})
+        palettes = bulk_create_palettes(self.user, [(images[item['digest']], item['rgb_codes'], item['weights']) for item in done],
+                                        self.k, self.algorithm, self.blur_kernel)
+        return {
+            'event': 'done',
+            'palettes': [{'index': item['index'], 'name': item['name'], 'palette_id': palette.id}
+                         for item, palette in zip(done, palettes)],
+            'failed': len(self.items) - len(done),
+            'seconds': round(time.perf_counter() - self.started, 3),
+        }
+
+
+def store_images(files_by_digest):
+    """
+    İçerik özeti -> (dosya adı, django File) sözlüğündeki görseller için özet -> ImageUpload sözlüğü döndürür.
+    Daha önce yüklenmiş içerikler yeniden kullanılır (dosyası depolamada yoksa yeniden yazılır), yeniler depolamaya
+    yazılıp tek sorguyla eklenir.
+    Aynı içerik eşzamanlı başka bir istekte eklendiyse (ignore_conflicts) o kayıt kullanılır ve burada yazılan dosya silinir.
+    """
+    from .views import upload_file_missing  # views bu modülü içe aktarır
+    digests = list(files_by_digest)
+    existing = set(ImageUpload.objects.filter(content_hash__in=digests).values_list('content_hash', flat=True))
+    field = ImageUpload._meta.get_field('image')
+    new_images = []
+    for digest, (filename, content) in files_by_digest.items():
+        if digest in existing:
+            continue
+        name = field.storage.save(field.generate_filename(None, filename), content, max_length=field.max_length)
+        new_images.append(ImageUpload(image=name, content_hash=digest))
+    ImageUpload.objects.bulk_create(new_images, ignore_conflicts=True)
+
+    images = {image.content_hash: image for image in ImageUpload.objects.filter(content_hash__in=digests)}
+    for image in new_images:
+        if images[image.content_hash].image.name != image.image.name:
+            field.storage.delete(image.image.name)
+    for digest in existing:
+        image = images[digest]
+        if upload_file_missing(image):  # önceki arka plan yazması başarısız olmuş
+            _, content = files_by_digest[digest]
+            name = field.storage.save(image.image.name, content, max_length=field.max_length)
+            if name != image.image.name:
+                ImageUpload.objects.filter(pk=image.pk).update(image=name)
+                image.image.name = name
+    return images
+
+
+def bulk_create_palettes(user, entries, k, algorithm, blur_kernel=5):
+    """
+    (ImageUpload, hex kodları listesi, küme ağırlıkları) üçlüleri için ColorPalette kayıtlarını ve renk satırlarını
+    (PaletteColor) birer sorguyla ekler. bulk_create post_save sinyali göndermez, görsel referans sayıları
+    burada artırılır (bkz. signals.py).
+    """
+    with transaction.atomic():
+        palettes = ColorPalette.objects.bulk_create([
+            ColorPalette(user=user, image=image, rgb_codes='|'.join(rgb_codes), k_value=k,
+                         algorithm=algorithm, blur_kernel=blur_kernel)
+            for image, rgb_codes, _ in entries
+        ])
+        PaletteColor.objects.bulk_create([
+            row for palette, (_, rgb_codes, weights) in zip(palettes, entries)
+            for row in palette_color_rows(palette.id, rgb_codes, weights)
+        ])
+        for image_id, count in Counter(palette.image_id for palette in palettes).items():
+            adjust_image_refs(image_id, count)
+    return palettes
@@ -0,0 +1,201 @@
+import numpy as np
+
+# Histogram tabanlı kümeleme motoru
+# 200x200'lük görüntüdeki 40.000 pikselin hepsini KMeans'e vermek yerine görüntü önce
+# nicemlenmiş (quantized) bir LAB renk histogramına indirgenir: her benzersiz renk kutusu
+# (bin) bir kez, içindeki piksel sayısı kadar ağırlıkla kümelenir.
+
+DEFAULT_BIN_SIZE = 4  # her LAB kanalının kaç birimlik kutulara bölüneceği (1 = nicemleme yok)
+
+
+def build_color_histogram(image, bin_size=DEFAULT_BIN_SIZE):
+    """
+    LAB görüntüyü nicemlenmiş bir renk histogramına dönüştürür.
+
+    Parametreler:
+    - image: LAB renk uzayında (h, w, 3) ya da (n, 3) boyutlu uint8 numpy dizisi.
+    - bin_size: her kanal için kutu genişliği.
+
+    Dönüş:
+    - colors: her dolu kutudaki piksellerin ortalama rengi (m x 3, float64).
+    - counts: her kutudaki piksel sayısı (m, int64).
+    """
+    pixels = np.asarray(image).reshape((-1, 3))
+    if pixels.shape[0] == 0:
+        raise ValueError('Görüntüde piksel bulunamadı.')
+
+    quantized = pixels.astype(np.int64) // bin_size
+    bins_per_channel = 256 // bin_size + 1
+    # üç kanalı tek bir tamsayı anahtarına paketle, np.unique ile benzersiz kutuları bul
+    keys = (quantized[:, 0] * bins_per_channel + quantized[:, 1]) * bins_per_channel + quantized[:, 2]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+
+    # kutunun merkezi yerine içindeki piksellerin gerçek ortalaması kullanılır,
+    # böylece nicemleme hatası ağırlıklı ortalamaya yansımaz
+    colors = np.empty((counts.shape[0], 3), dtype=np.float64)
+    for channel in range(3):
+        colors[:, channel] = np.bincount(inverse, weights=pixels[:, channel], minlength=counts.shape[0]) / counts
+    return colors, counts
+
+
+def weighted_kmeans(colors, counts, k, random_state=42, max_iter=300, n_init=4, init='k-means++'):
+    """
+    Histogram kutuları üzerinde piksel sayılarıyla ağırlıklandırılmış KMeans çalıştırır.
+
+    Dönüş:
+    - centroids: k x 3 küme merkezleri (LAB formatında).
+    - weights: her kümeye düşen piksel oranı (toplamı 1).
+    - inertia: ağırlıklı kareler toplamı (piksel başına değil, toplam).
+    """
+    if k < 1:
+        raise ValueError('k en az 1 olmalıdır.')
+    n_bins = colors.shape[0]
+
+    if n_bins <= k:
+        # benzersiz renk sayısı k'dan azsa her kutu kendi kümesidir, eksik kümeler
+        # en kalabalık renk tekrarlanarak doldurulur (sklearn de aynı merkezi tekrar döndürür)
+        order = np.argsort(-counts, kind='stable')
+        fill = np.resize(order, k)
+        centroids = colors[fill].copy()
+        weights = np.zeros(k, dtype=np.float64)
+        weights[:n_bins] = counts[order] / counts.sum()
+        return centroids, weights, 0.0
+
+    from sklearn.cluster import KMeans # scikit-learn'ün içe aktarılması yavaştır, yalnızca KMeans ilk kez çalıştığında yüklenir
+
+    kmeans = KMeans(n_clusters=k, random_state=random_state, max_iter=max_iter, n_init=n_init, init=init)
+    kmeans.fit(colors, sample_weight=counts)
+    weights = np.bincount(kmeans.labels_, weights=counts, minlength=k) / counts.sum()
+    return kmeans.cluster_centers_, weights, float(kmeans.inertia_)
+
+
+def histogram_kmeans(image, k=5, bin_size=DEFAULT_BIN_SIZE, **kmeans_kwargs):
+    """
+    Görüntünün baskın renklerini histogram ağırlıklı KMeans ile bulur.
+
+    Dönüş: (centroids, weights) — centroids, apply_kmeans ile aynı LAB formatındadır;
+    weights her kümenin görüntüdeki piksel payıdır.
+    """
+    colors, counts = build_color_histogram(image, bin_size=bin_size)
+    centroids, weights, _ = weighted_kmeans(colors, counts, k, **kmeans_kwargs)
+    return centroids, weights
+
+
+def palette_scores(colors, counts, centroids):
+    """
+    Bir paletin histogram kutularına ne kadar uyduğunu ölçer: (inertia, silhouette).
+    - inertia: her kutunun en yakın merkeze uzaklığının karesi, piksel sayısıyla ağırlıklı toplam.
+    - silhouette: basitleştirilmiş (merkez tabanlı) silhouette; a en yakın, b ikinci en yakın merkeze
+      uzaklıkken (b - a) / b'nin ağırlıklı ortalaması. Tam silhouette kutu sayısının karesiyle büyür,
+      bu sürüm O(kutu x k)'dır. k=1 için tanımsızdır (None).
+    """
+    centroids = np.asarray(centroids, dtype=np.float64)
+    distances = np.linalg.norm(colors[:, None, :] - centroids[None, :, :], axis=2)
+    if centroids.shape[0] < 2:
+        return float((counts * distances[:, 0] ** 2).sum()), None
+    nearest = np.partition(distances, 1, axis=1)
+    a, b = nearest[:, 0], nearest[:, 1]
+    scores = np.divide(b - a, b, out=np.zeros_like(b), where=b > 0)
+    return float((counts * a ** 2).sum()), float((counts * scores).sum() / counts.sum())
+
+
+def grow_centroids(colors, counts, centroids, k):
+    """
+    Önceki merkezleri koruyarak k merkeze tamamlar: her yeni merkez, en yakın merkeze uzaklığının karesi
+    ile piksel sayısının çarpımı en büyük olan kutuya konur (rastgelelik olmadan k-means++).
+    """
+    centroids = np.asarray(centroids, dtype=np.float64)
+    closest = ((colors[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2).min(axis=1)
+    while centroids.shape[0] < k:
+        index = int(np.argmax(counts * closest))
+        centroids = np.vstack([centroids, colors[index]])
+        closest = np.minimum(closest, ((colors - colors[index]) ** 2).sum(axis=1))
+    return centroids
+
+
+def shrink_centroids(colors, counts, centroids, k):
+    """
+    Merkez sayısını k'ya indirir: her adımda histogramda en az piksel payı kalan merkez çıkarılır,
+    kalanların payları yeniden hesaplanır (çıkarılan merkezin pikselleri en yakın komşulara dağılır).
+    """
+    centroids = np.asarray(centroids, dtype=np.float64)
+    while centroids.shape[0] > k:
+        labels = ((colors[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+        shares = np.bincount(labels, weights=counts, minlength=centroids.shape[0])
+        centroids = np.delete(centroids, int(np.argmin(shares)), axis=0)
+    return centroids
+
+
+def refine_kmeans(colors, counts, seed, k, random_state=42, max_iter=10):
+    """
+    Var olan bir paletten (seed, LAB merkezleri) başlayan kısa KMeans: merkezler k'ya tamamlanır
+    (grow_centroids) ya da azaltılır (shrink_centroids), sonra tek başlatmayla en fazla max_iter iterasyon çalışır.
+    Paleti düzenlemek için tam başlatmalı (k-means++, n_init=4) kümelemenin küçük bir kısmı kadar iş yapar.
+    Seed boşsa tam kümelemeye düşer. Dönüş: weighted_kmeans ile aynı (centroids, weights, inertia).
+    """
+    seed = np.asarray(seed, dtype=np.float64).reshape((-1, 3))
+    if seed.shape[0] == 0:
+        return weighted_kmeans(colors, counts, k, random_state=random_state)
+    if seed.shape[0] < k:
+        seed = grow_centroids(colors, counts, seed, k)
+    elif seed.shape[0] > k:
+        seed = shrink_centroids(colors, counts, seed, k)
+    return weighted_kmeans(colors, counts, k, random_state=random_state, max_iter=max_iter, n_init=1, init=seed)
+
+
+def kmeans_sweep(colors, counts, k_values, random_state=42, max_iter=300):
+    """
+    Aynı histogram için birden çok k değerinde KMeans çalıştırır. En küçük k tam başlatmayla (k-means++,
+    n_init=4) kümelenir; sonraki her k bir önceki k'nın merkezlerinden (grow_centroids) tek başlatmayla
+    devam eder, böylece her adım birkaç iterasyonda yakınsar.
+
+    Dönüş: {k: {'centroids_lab', 'weights', 'inertia', 'silhouette'}}
+    """
+    results = {}
+    centroids = None
+    for k in sorted(set(k_values)):
+        if centroids is None:
+            centroids, weights, _ = weighted_kmeans(colors, counts, k, random_state=random_state, max_iter=max_iter)
+        else:
+            init = grow_centroids(colors, counts, centroids, k)
+            centroids, weights, _ = weighted_kmeans(colors, counts, k, random_state=random_state,
+                                                    max_iter=max_iter, n_init=1, init=init)
+        inertia, silhouette = palette_scores(colors, counts, centroids)
+        results[k] = {'centroids_lab': centroids, 'weights': weights, 'inertia': inertia, 'silhouette': silhouette}
+    return results
+
+
+def suggest_k(results):
+    """Silhouette skoru en yüksek k'yı önerir (eşitlikte küçük k); skor yoksa en küçük k döner."""
+    scored = [(result['silhouette'], -k) for k, result in results.items() if result['silhouette'] is not None]
+    if not scored:
+        return min(results)
+    return -max(scored)[1]
+
+
+# OpenCV 8 bitlik LAB gösterimi (L: 0-255, a/b: 128 ofsetli) ile CIELAB arasındaki dönüşümler
+def opencv_lab_to_cielab(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    return np.stack([lab[..., 0] * 100.0 / 255.0, lab[..., 1] - 128.0, lab[..., 2] - 128.0], axis=-1)
+
+
+def cielab_to_opencv_lab(lab):
+    lab = np.asarray(lab, dtype=np.float64)
+    return np.stack([lab[..., 0] * 255.0 / 100.0, lab[..., 1] + 128.0, lab[..., 2] + 128.0], axis=-1)
+
+
+def delta_e(lab1, lab2):
+    """İki CIELAB renk (dizisi) arasındaki CIE76 Delta E mesafesi."""
+    return np.linalg.norm(np.asarray(lab1, dtype=np.float64) - np.asarray(lab2, dtype=np.float64), axis=-1)
+
+
+def palette_delta_e(palette_a, palette_b):
+    """
+    İki paletin (OpenCV LAB formatında) ne kadar uyuştuğunu ölçer: her renk için diğer
+    paletteki en yakın rengin Delta E değeri alınır, iki yönün ortalaması döndürülür.
+    """
+    a = opencv_lab_to_cielab(palette_a)
+    b = opencv_lab_to_cielab(palette_b)
+    distances = delta_e(a[:, None, :], b[None, :, :])
+    return float((distances.min(axis=1).mean() + distances.min(axis=0).mean()) / 2)
@@ -0,0 +1,368 @@
+import logging
+import os
+import threading
+import time
+from itertools import product
+import numpy as np
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import DatabaseError
+from django.db.models import Max
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from .clustering import cielab_to_opencv_lab, palette_delta_e
+from .metrics import stage_timer
+from .models import ColorPalette, PaletteColor
+from .palette_colors import LAB_BIN_SIZE
+
+# Renk araması: kayıtlı paletlerin renkleri üzerinde CIELAB ızgara (grid-bucket) indeksi.
+# Her kullanıcının renkleri LAB_BIN_SIZE birimlik küp hücrelere dağıtılır; en yakın renk araması hedefin
+# hücresinden başlayıp halka halka dışarı doğru ilerler ve bulunan k'ıncı sonuç taranmamış bölgeden daha
+# yakın olunca durur (Delta E = CIE76, LAB'da öklid uzaklığı, bkz. clustering.delta_e).
+# İndeks süreç içindedir: ilk aramada diskteki anlık görüntüden yüklenir (yoksa veritabanından kurulur),
+# sonraki her aramada yalnızca son senkrondan sonra eklenen PaletteColor satırları (id > watermark) okunur.
+# Sunucular indeksi açılışta istek dışında ısıtır (wsgi.py/asgi.py, PALETTE_SEARCH["WARM_ON_STARTUP"]); tam kurulum
+# kullanıcı isteğinde değil, dağıtımda build_search_index komutuyla yapılmalıdır, açılış yalnızca dosyayı yükler.
+# Bu süreçte silinen paletler post_delete sinyaliyle hemen, başka süreçlerde silinenler arama sonucunda
+# veritabanında bulunamayınca indeksten çıkarılır.
+
+INDEX_FORMAT = 1  # anlık görüntü dosyasının biçimi; değişirse eski dosyalar yok sayılır ve indeks yeniden kurulur
+CELL_SIZE = float(LAB_BIN_SIZE)
+logger = logging.getLogger(__name__)
+SIMILAR_CANDIDATES = 4  # benzer palet aramasında her renk için n x bu kadar aday palet toplanır
+
+
+def cell_keys(labs):
+    return np.floor(np.asarray(labs, dtype=np.float64) / CELL_SIZE).astype(np.int64)
+
+
+def ring_cells(center, radius):
+    """center hücresine Chebyshev uzaklığı tam olarak radius olan hücreler."""
+    if radius == 0:
+        return [tuple(center)]
+    offsets = range(-radius, radius + 1)
+    return [(center[0] + dl, center[1] + da, center[2] + db) for dl, da, db in product(offsets, repeat=3)
+            if max(abs(dl), abs(da), abs(db)) == radius]
+
+
+def nearest_per_palette(palette_ids, distances, positions):
+    """Her paletin en yakın rengini seçer: uzaklığa göre sıralı (palet id, delta e, sıra) dizileri."""
+    order = np.lexsort((distances, palette_ids))
+    palette_ids, distances, positions = palette_ids[order], distances[order], positions[order]
+    first = np.ones(len(palette_ids), dtype=bool)
+    first[1:] = palette_ids[1:] != palette_ids[:-1]
+    palette_ids, distances, positions = palette_ids[first], distances[first], positions[first]
+    order = np.argsort(distances, kind='stable')
+    return palette_ids[order], distances[order], positions[order]
+
+
+class ColorGrid:
+    """
+    Bir kullanıcının palet renkleri. cells: hücre -> (LAB dizisi, palet id'leri, renk sıraları);
+    palettes: palet id -> o paletin LAB renkleri (benzer palet araması ve silme için).
+    """
+
+    def __init__(self):
+        self.cells = {}
+        self.palettes = {}
+
+    @classmethod
+    def from_arrays(cls, palette_ids, positions, labs):
+        # toplu kurulum: renkler hücre anahtarına göre sıralanıp tek seferde bölünür
+        grid = cls()
+        labs = np.asarray(labs, dtype=np.float32)
+        keys = cell_keys(labs)
+        order = np.lexsort((keys[:, 2], keys[:, 1], keys[:, 0]))
+        keys, sorted_labs, sorted_ids, sorted_positions = keys[order], labs[order], palette_ids[order], positions[order]
+        starts = np.flatnonzero(np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)])
+        for start, end in zip(starts, np.r_[starts[1:], len(keys)]):
+            grid.cells[tuple(int(v) for v in keys[start])] = (sorted_labs[start:end], sorted_ids[start:end],
+                                                              sorted_positions[start:end])
+        order = np.lexsort((positions, palette_ids))
+        palette_ids, labs = palette_ids[order], labs[order]
+        starts = np.flatnonzero(np.r_[True, palette_ids[1:] != palette_ids[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], len(palette_ids)]):
+            grid.palettes[int(palette_ids[start])] = labs[start:end]
+        return grid
+
+    def add(self, palette_id, labs):
+        """Paletin renklerini ekler; palet zaten varsa eski renklerinin yerine geçer."""
+        self.remove(palette_id)
+        labs = np.asarray(labs, dtype=np.float32).reshape((-1, 3))
+        if not len(labs):
+            return
+        self.palettes[palette_id] = labs
+        for position, (lab, key) in enumerate(zip(labs, cell_keys(labs))):
+            key = tuple(int(v) for v in key)
+            cell_labs, cell_ids, cell_positions = self.cells.get(key, (np.empty((0, 3), np.float32), np.empty(0, np.int64),
+                                                                        np.empty(0, np.int16)))
+            self.cells[key] = (np.vstack([cell_labs, lab]), np.append(cell_ids, palette_id),
+                               np.append(cell_positions, np.int16(position)))
+
+    def remove(self, palette_id):
+        labs = self.palettes.pop(palette_id, None)
+        if labs is None:
+            return
+        for key in {tuple(int(v) for v in key) for key in cell_keys(labs)}:
+            cell_labs, cell_ids, cell_positions = self.cells[key]
+            keep = cell_ids != palette_id
+            if keep.any():
+                self.cells[key] = (cell_labs[keep], cell_ids[keep], cell_positions[keep])
+            else:
+                del self.cells[key]
+
+    def nearest(self, lab, n):
+        """
+        lab'a en yakın rengi içeren n palet: uzaklığa göre sıralı (palet id, delta e, sıra) dizileri.
+        Halka taraması, taranacak küp dolu hücre sayısını geçince kalan hücrelerin doğrudan taranmasına döner.
+        """
+        target = np.asarray(lab, dtype=np.float64)
+        center = tuple(int(v) for v in cell_keys(target))
+        found_ids, found_distances, found_positions = [], [], []
+        radius = 0
+        while True:
+            scan_all = (2 * radius + 1) ** 3 >= len(self.cells)
+            if scan_all:
+                keys = [key for key in self.cells
+                        if max(abs(key[0] - center[0]), abs(key[1] - center[1]), abs(key[2] - center[2])) >= radius]
+            else:
+                keys = [key for key in ring_cells(center, radius) if key in self.cells]
+            for key in keys:
+                cell_labs, cell_ids, cell_positions = self.cells[key]
+                found_distances.append(np.linalg.norm(cell_labs - target, axis=1))
+                found_ids.append(cell_ids)
+                found_positions.append(cell_positions)
+
+            if found_ids:
+                ids, distances, positions = nearest_per_palette(
+                    np.concatenate(found_ids), np.concatenate(found_distances), np.concatenate(found_positions),
+                )
+            else:
+                ids, distances, positions = np.empty(0, np.int64), np.empty(0), np.empty(0, np.int16)
+            if scan_all:
+                break
+            # taranan küpün dışındaki her renk, hedefin küpün en yakın yüzeyine uzaklığından daha uzaktadır
+            lower = (np.asarray(center) - radius) * CELL_SIZE
+            upper = (np.asarray(center) + radius + 1) * CELL_SIZE
+            bound = min((target - lower).min(), (upper - target).min())
+            if len(ids) >= n and distances[n - 1] <= bound:
+                break
+            radius += 1
+        return ids[:n], distances[:n], positions[:n]
+
+    def similar(self, labs, n, exclude=None):
+        """
+        labs paletine en çok benzeyen n palet: (palet id, uzaklık) listesi. Uzaklık clustering.palette_delta_e'dir
+        (her renk için diğer paletteki en yakın rengin Delta E'si, iki yönün ortalaması). Adaylar her rengin en yakın
+        paletlerinden toplanır, yani sonuç yaklaşıktır; bütün paletler taranmaz.
+        """
+        labs = np.asarray(labs, dtype=np.float64).reshape((-1, 3))
+        candidates = set()
+        for lab in labs:
+            candidates.update(int(palette_id) for palette_id in self.nearest(lab, n * SIMILAR_CANDIDATES + 1)[0])
+        candidates.discard(exclude)
+        query = cielab_to_opencv_lab(labs)
+        scores = sorted((palette_delta_e(query, cielab_to_opencv_lab(self.palettes[palette_id])), palette_id)
+                        for palette_id in candidates)
+        return [(palette_id, distance) for distance, palette_id in scores[:n]]
+
+    def __len__(self):
+        return sum(len(cell[1]) for cell in self.cells.values())
+
+
+class PaletteSearchIndex:
+    """
+    Kullanıcı başına ColorGrid tutan, veritabanıyla artımlı senkronlanan ve diske kaydedilen arama indeksi.
+    path None ise anlık görüntü kaydedilmez (her süreç ilk aramada indeksi veritabanından kurar).
+    """
+
+    def __init__(self, path=None, save_interval=60):
+        self.path = str(path) if path else None
+        self.save_interval = save_interval
+        self.grids = {}  # kullanıcı id -> ColorGrid
+        self.owners = {}  # palet id -> kullanıcı id
+        self.watermark = 0  # indekse alınan en büyük PaletteColor id'si
+        self.loaded = False
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        self._lock = threading.RLock()
+
+    def ensure_loaded(self):
+        with self._lock:
+            if self.loaded:
+                return
+            if not self.load():
+                self.rebuild()
+            self.loaded = True
+
+    def load(self):
+        """Diskteki anlık görüntüyü yükler. Dosya yoksa, biçimi eskiyse ya da veritabanı sıfırlandıysa False döner."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as data:
+                meta = data['meta']
+                if int(meta[0]) != INDEX_FORMAT:
+                    return False
+                watermark = int(meta[1])
+                arrays = data['palette_ids'], data['user_ids'], data['positions'], data['labs']
+        except (OSError, ValueError, KeyError):
+            return False
+        if watermark > (PaletteColor.objects.aggregate(last=Max('id'))['last'] or 0):
+            return False  # veritabanı anlık görüntüden eski (ör. yeniden oluşturuldu)
+        self._replace_all(*arrays)
+        self.watermark = watermark
+        return True
+
+    def rebuild(self):
+        """İndeksi PaletteColor tablosunun tamamından yeniden kurar ve kaydeder."""
+        with self._lock:
+            palette_ids, user_ids, positions, labs, watermark = self._read_rows(0)
+            self._replace_all(palette_ids, user_ids, positions, labs)
+            self.watermark = watermark
+            self.loaded = True
+            self.dirty = True
+            self.save()
+
+    def _replace_all(self, palette_ids, user_ids, positions, labs):
+        self.grids, self.owners = {}, {}
+        order = np.argsort(user_ids, kind='stable')
+        palette_ids, user_ids, positions, labs = palette_ids[order], user_ids[order], positions[order], labs[order]
+        starts = np.flatnonzero(np.r_[True, user_ids[1:] != user_ids[:-1]]) if len(user_ids) else []
+        for start, end in zip(starts, np.r_[starts[1:], len(user_ids)]):
+            user_id = int(user_ids[start])
+            grid = ColorGrid.from_arrays(palette_ids[start:end], positions[start:end], labs[start:end])
+            self.grids[user_id] = grid
+            self.owners.update(dict.fromkeys(grid.palettes, user_id))
+
+    def _read_rows(self, after_id):
+        rows = (PaletteColor.objects.filter(id__gt=after_id).order_by('id')
+                .values_list('id', 'palette_id', 'palette__user_id', 'position', 'lab_l', 'lab_a', 'lab_b'))
+        data = np.array(list(rows.iterator(chunk_size=10000)), dtype=np.float64).reshape((-1, 7))
+        watermark = int(data[-1, 0]) if len(data) else after_id
+        return (data[:, 1].astype(np.int64), data[:, 2].astype(np.int64), data[:, 3].astype(np.int16),
+                data[:, 4:].astype(np.float32), watermark)
+
+    def sync(self):
+        """Son senkrondan sonra yazılan renk satırlarını ekler; satırı yazılan palet indekste varsa eski renklerinin yerine geçer."""
+        with self._lock:
+            self.ensure_loaded()
+            palette_ids, user_ids, positions, labs, watermark = self._read_rows(self.watermark)
+            if len(palette_ids):
+                # replace_palette_colors bir paletin tüm renklerini tek işlemde yeniden yazar
+                for palette_id in np.unique(palette_ids):
+                    rows = palette_ids == palette_id
+                    order = np.argsort(positions[rows], kind='stable')
+                    self.add_palette(int(palette_id), int(user_ids[rows][0]), labs[rows][order])
+                self.watermark = watermark
+            if self.dirty and self.save_interval is not None and time.monotonic() - self.saved_at >= self.save_interval:
+                self.save()
+
+    def add_palette(self, palette_id, user_id, labs):
+        with self._lock:
+            self.discard_palette(palette_id)
+            self.grids.setdefault(user_id, ColorGrid()).add(palette_id, labs)
+            self.owners[palette_id] = user_id
+            self.dirty = True
+
+    def discard_palette(self, palette_id):
+        with self._lock:
+            user_id = self.owners.pop(palette_id, None)
+            if user_id is not None:
+                self.grids[user_id].remove(palette_id)
+                self.dirty = True
+
+    def save(self):
+        """Anlık görüntüyü yarım yazılmış dosya okunmasın diye geçici dosya üzerinden atomik olarak yazar."""
+        with self._lock:
+            if not self.path:
+                return
+            palette_ids, user_ids, positions, labs = [], [], [], []
+            for user_id, grid in self.grids.items():
+                for palette_id, palette_labs in grid.palettes.items():
+                    palette_ids.append(np.full(len(palette_labs), palette_id, dtype=np.int64))
+                    user_ids.append(np.full(len(palette_labs), user_id, dtype=np.int64))
+                    positions.append(np.arange(len(palette_labs), dtype=np.int16))
+                    labs.append(palette_labs)
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            temp_path = f'{self.path}.{os.getpid()}.{threading.get_ident()}.tmp.npz'
+            np.savez(
+                temp_path,
+                meta=np.array([INDEX_FORMAT, self.watermark], dtype=np.int64),
+                palette_ids=np.concatenate(palette_ids) if palette_ids else np.empty(0, np.int64),
+                user_ids=np.concatenate(user_ids) if user_ids else np.empty(0, np.int64),
+                positions=np.concatenate(positions) if positions else np.empty(0, np.int16),
+                labs=np.concatenate(labs) if labs else np.empty((0, 3), np.float32),
+            )
+            os.replace(temp_path, self.path)
+            self.dirty = False
+            self.saved_at = time.monotonic()
+
+    def nearest_palettes(self, user_id, lab, n):
+        """Kullanıcının lab rengine en yakın rengi içeren n paleti: [(palet id, delta e, renk sırası)]."""
+        with self._lock, stage_timer('search'):
+            self.sync()
+            grid = self.grids.get(user_id)
+            if grid is None:
+                return []
+            ids, distances, positions = grid.nearest(lab, n)
+            return [(int(i), float(d), int(p)) for i, d, p in zip(ids, distances, positions)]
+
+    def similar_palettes(self, user_id, palette_id, n):
+        """Kullanıcının palette_id paletine en çok benzeyen n paleti: [(palet id, uzaklık)]. Palet indekste yoksa boş liste."""
+        with self._lock, stage_timer('search'):
+            self.sync()
+            grid = self.grids.get(user_id)
+            if grid is None or palette_id not in grid.palettes:
+                return []
+            return grid.similar(grid.palettes[palette_id], n, exclude=palette_id)
+
+    def __len__(self):
+        return sum(len(grid) for grid in self.grids.values())
+
+
+_search_index = None
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """settings.PALETTE_SEARCH yapılandırmasına göre süreç genelinde tek bir PaletteSearchIndex döndürür (yüklenmemiş olabilir)."""
+    global _search_index
+    with _search_index_lock:
+        if _search_index is None:
+            config = getattr(settings, 'PALETTE_SEARCH', {})
+            _search_index = PaletteSearchIndex(config.get('INDEX_PATH'), config.get('SAVE_INTERVAL', 60))
+        return _search_index
+
+
+def warm_search_index():
+    """
+    İndeksi yükler (anlık görüntü yoksa kurar) ve sonradan yazılan renkleri okur. Veritabanı hazır değilse
+    (ör. migrate öncesi) yalnızca loglanır; indeks ilk aramada yüklenir.
+    """
+    try:
+        index = get_search_index()
+        index.sync()
+        return index
+    except DatabaseError:
+        logger.warning('Renk araması indeksi açılışta yüklenemedi, ilk aramada yüklenecek.', exc_info=True)
+        return None
+
+
+def reset_search_index():
+    global _search_index
+    with _search_index_lock:
+        _search_index = None
+
+
+@receiver(post_delete, sender=ColorPalette)
+def _discard_deleted_palette(sender, instance, **kwargs):
+    # modül yalnızca arama kullanılan süreçlerde yüklenir; indeksi olmayan süreçlerde bu alıcı hiç bağlanmaz
+    if _search_index is not None:
+        _search_index.discard_palette(instance.id)
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs):
+    if setting == 'PALETTE_SEARCH':
+        reset_search_index()
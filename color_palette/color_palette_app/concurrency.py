@@ -0,0 +1,244 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# CPU yoğun boru hattı için sınırlı eşzamanlılık
+# scikit-learn (OpenMP/BLAS) ve OpenCV varsayılan olarak tüm çekirdekleri kullanan kendi iş parçacığı
+# havuzlarını açar; birden çok istek aynı anda kümeleme yaptığında makine aşırı yüklenir.
+# PipelineExecutor aynı anda çalışan iş sayısını PIPELINE_MAX_CONCURRENCY ile sınırlar, her işte yerel
+# iş parçacığı sayısını PIPELINE_THREADS_PER_JOB'a indirir. Sınır doluysa istekler en fazla
+# PIPELINE_QUEUE_SIZE kadar sırada bekler; sıra da doluysa PipelineBusy hemen fırlatılır
+# (görünümler bunu Retry-After başlıklı 503 yanıtına çevirir). Sınır süreç başınadır:
+# toplam iş parçacığı sayısı en fazla (süreç sayısı x eşzamanlılık x iş başına iş parçacığı) olur.
+
+NATIVE_THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'VECLIB_MAXIMUM_THREADS')
+
+
+class PipelineBusy(Exception):
+    """Eşzamanlılık sınırı ve bekleme sırası dolu; istemci retry_after saniye sonra tekrar denemeli."""
+
+    def __init__(self, message='Sunucu şu anda çok yoğun, lütfen biraz sonra tekrar deneyin.', retry_after=5):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def pipeline_settings():
+    return {
+        'max_concurrency': max(1, int(getattr(settings, 'PIPELINE_MAX_CONCURRENCY', os.cpu_count() or 1))),
+        'queue_size': max(0, int(getattr(settings, 'PIPELINE_QUEUE_SIZE', 8))),
+        'queue_timeout': float(getattr(settings, 'PIPELINE_QUEUE_TIMEOUT', 30)),
+        'threads_per_job': max(1, int(getattr(settings, 'PIPELINE_THREADS_PER_JOB', 1))),
+        'retry_after': int(getattr(settings, 'PIPELINE_RETRY_AFTER', 5)),
+    }
+
+
+def configure_native_threads(threads=None):
+    """
+    BLAS/OpenMP kütüphanelerinin iş parçacığı sayısını ortam değişkenleriyle sınırlar.
+    Değişkenler kütüphaneler yüklenmeden önce okunur; numpy/scikit-learn ilk kullanımda yüklendiği
+    için (bkz. imaging.py) apps.ready'de çağrılması yeterlidir. Önceden ayarlanmış değerler korunur.
+    """
+    threads = threads or pipeline_settings()['threads_per_job']
+    for name in NATIVE_THREAD_ENV_VARS:
+        os.environ.setdefault(name, str(threads))
+
+
+_applied_thread_limit = None
+
+
+def apply_native_thread_limits(threads):
+    """
+    OpenCV ve (threadpoolctl ile) BLAS/OpenMP iş parçacığı sayısını sınırlar.
+    Bu ayarlar süreç geneli olduğu için iş bitince geri alınmaz; eşzamanlı işlerden birinin
+    geri yüklemesi diğerinin sınırını kaldırırdı. Aynı değer için yalnızca bir kez uygulanır.
+    """
+    global _applied_thread_limit
+    if _applied_thread_limit == threads:
+        return
+    import cv2
+    cv2.setNumThreads(threads)
+    try:
+        from threadpoolctl import threadpool_limits  # scikit-learn'ün bağımlılığı
+    except ImportError:
+        pass
+    else:
+        threadpool_limits(limits=threads)
+    _applied_thread_limit = threads
+
+
+class PipelineExecutor:
+    def __init__(self, max_concurrency=1, queue_size=8, queue_timeout=30.0, threads_per_job=1, retry_after=5):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.threads_per_job = threads_per_job
+        self.retry_after = retry_after
+        self._condition = threading.Condition()
+        self._running = 0
+        self._waiting = 0
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def waiting(self):
+        return self._waiting
+
+    def _acquire(self):
+        with self._condition:
+            if self._running >= self.max_concurrency:
+                if self._waiting >= self.queue_size:
+                    raise PipelineBusy(retry_after=self.retry_after)  # sıra dolu, bekletmeden reddet
+                self._waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self._running >= self.max_concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise PipelineBusy(retry_after=self.retry_after)
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+            self._running += 1
+
+    def _release(self):
+        with self._condition:
+            self._running -= 1
+            self._condition.notify()
+
+    def run(self, func, *args, **kwargs):
+        """func'ı bir eşzamanlılık yuvası alarak ve yerel iş parçacığı sınırlarıyla çağıran iş parçacığında çalıştırır."""
+        self._acquire()
+        try:
+            apply_native_thread_limits(self.threads_per_job)
+            return func(*args, **kwargs)
+        finally:
+            self._release()
+
+
+_pipeline_executor = None
+_pipeline_executor_lock = threading.Lock()
+
+
+def get_pipeline_executor():
+    """settings.PIPELINE_* ayarlarına göre süreç genelinde tek bir PipelineExecutor döndürür."""
+    global _pipeline_executor
+    with _pipeline_executor_lock:
+        if _pipeline_executor is None:
+            _pipeline_executor = PipelineExecutor(**pipeline_settings())
+        return _pipeline_executor
+
+
+def reset_pipeline_executor():
+    global _pipeline_executor
+    with _pipeline_executor_lock:
+        _pipeline_executor = None
+
+
+def _exit_with_parent():
+    # sunucu sinyalle öldürülünce (ör. uvicorn SIGTERM'ü yeniden fırlatır) havuz kapatılamaz; işçi yetim kalmasın
+    multiprocessing.parent_process().join()
+    os._exit(0)
+
+
+def _init_pipeline_process(threads):
+    # süreç havuzundaki her işçi kütüphaneler yüklenmeden önce iş parçacığı sınırını uygular
+    configure_native_threads(threads)
+    apply_native_thread_limits(threads)
+    threading.Thread(target=_exit_with_parent, daemon=True).start()
+
+
+class ProcessPipelineExecutor:
+    """
+    Async görünümler ve toplu yükleme için süreç havuzu: CPU yoğun iş ayrı çekirdeklerde çalışırken olay döngüsü serbest kalır.
+    Havuz en fazla max_concurrency süreç açar; havuzdaki (çalışan + bekleyen) iş sayısı
+    max_concurrency + queue_size'a ulaşınca yeni işler PipelineBusy ile hemen reddedilir.
+    Süreçler 'spawn' ile başlatılır: olay döngüsü ve iş parçacıkları olan bir süreçten fork güvenli değildir.
+    """
+
+    def __init__(self, max_concurrency=1, queue_size=8, threads_per_job=1, retry_after=5, start_method='spawn', **kwargs):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.threads_per_job = threads_per_job
+        self.retry_after = retry_after
+        self.start_method = start_method
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_concurrency,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_pipeline_process,
+                initargs=(self.threads_per_job,),
+            )
+        return self._pool
+
+    def _done(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def submit(self, func, *args):
+        """func(*args)'ı havuza gönderir ve concurrent.futures.Future döndürür; func modül düzeyinde olmalıdır."""
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.queue_size:
+                raise PipelineBusy(retry_after=self.retry_after)
+            self._pending += 1
+            try:
+                future = self._get_pool().submit(func, *args)
+            except Exception:
+                self._pending -= 1
+                raise
+        future.add_done_callback(self._done)
+        return future
+
+    async def run(self, func, *args):
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait, cancel_futures=cancel_futures)
+                self._pool = None
+
+
+_process_executor = None
+
+
+def get_process_executor():
+    """settings.PIPELINE_* ayarlarına göre süreç genelinde tek bir ProcessPipelineExecutor döndürür."""
+    global _process_executor
+    with _pipeline_executor_lock:
+        if _process_executor is None:
+            _process_executor = ProcessPipelineExecutor(
+                start_method=getattr(settings, 'PIPELINE_PROCESS_START_METHOD', 'spawn'), **pipeline_settings(),
+            )
+        return _process_executor
+
+
+def reset_process_executor():
+    global _process_executor
+    with _pipeline_executor_lock:
+        if _process_executor is not None:
+            _process_executor.shutdown(wait=False)
+        _process_executor = None
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs): # testlerde override_settings ile yapılandırma değişince
+    if setting.startswith('PIPELINE_'):
+        reset_pipeline_executor()
+        reset_process_executor()
@@ -0,0 +1,87 @@
+import struct
+from collections import namedtuple
+from io import BytesIO
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+# Görsel başlığından boyut okuma ve decompression bomb kontrolü.
+# Saf Python'dur (OpenCV, numpy ya da Pillow yüklemez): yükleme kontrolü görünümlerde görseli çözmeden,
+# yalnızca PNG'nin IHDR'sini ya da JPEG'in SOF segmentini okuyarak piksel sayısını bilir.
+# Birkaç yüz baytlık bir dosya çözüldüğünde gigabaytlarca yer kaplayabilir; sınırı aşan görseller hiç çözülmez.
+
+ImageInfo = namedtuple('ImageInfo', 'format width height bit_depth color_type interlaced')
+# color_type: PNG'de IHDR renk tipi (0 gri, 2 RGB, 3 paletli, 4 gri+alfa, 6 RGBA), JPEG'de bileşen sayısı
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def read_png_info(file):
+    header = file.read(33)  # imza + IHDR (uzunluk, tip, 13 bayt veri, crc)
+    if len(header) < 29 or header[12:16] != b'IHDR':
+        return None
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', header[16:29])
+    return ImageInfo('PNG', width, height, bit_depth, color_type, bool(interlace))
+
+
+def read_jpeg_info(file):
+    """SOF segmentine kadar segmentlerin yalnızca uzunluklarını okuyup atlar (EXIF gibi büyük segmentler okunmaz)."""
+    file.read(2)  # SOI
+    while True:
+        byte = file.read(1)
+        while byte and byte != b'\xff':  # segmentler arasındaki beklenmedik baytlar atlanır
+            byte = file.read(1)
+        while byte == b'\xff':  # dolgu baytları
+            byte = file.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        if marker == 0x01 or 0xD0 <= marker <= 0xD8:  # uzunluğu olmayan işaretler
+            continue
+        if marker in (0xD9, 0xDA):  # EOI ya da tarama verisi: SOF bulunamadı
+            return None
+        length_bytes = file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if marker in JPEG_SOF_MARKERS:
+            segment = file.read(6)
+            if len(segment) < 6:
+                return None
+            precision, height, width, components = struct.unpack('>BHHB', segment)
+            return ImageInfo('JPEG', width, height, precision, components, marker in (0xC2, 0xC6, 0xCA, 0xCE))
+        file.seek(length - 2, 1)
+
+
+def read_image_info(source):
+    """
+    JPEG ya da PNG başlığını okur: ImageInfo ya da (format tanınmıyorsa, başlık bozuksa) None.
+    source bir dosya yolu, bayt dizisi ya da okunabilir ve seek edilebilir bir dosya nesnesidir (konumu değişir).
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return read_image_info(BytesIO(source))
+    if not hasattr(source, 'read'):
+        with open(source, 'rb') as file:
+            return read_image_info(file)
+    try:
+        start = source.tell()
+        signature = source.read(8)
+        source.seek(start)
+        if signature.startswith(PNG_SIGNATURE):
+            return read_png_info(source)
+        if signature.startswith(b'\xff\xd8\xff'):
+            return read_jpeg_info(source)
+    except (OSError, ValueError, struct.error):
+        pass
+    return None
+
+
+def check_image_pixels(info):
+    """Başlıktaki piksel sayısı IMAGE_MAX_PIXELS'ı aşıyorsa görsel çözülmeden ValidationError fırlatır."""
+    max_pixels = getattr(settings, 'IMAGE_MAX_PIXELS', None)
+    if info is None or max_pixels is None:
+        return
+    if info.width * info.height > max_pixels:
+        raise ValidationError(
+            f'Görsel çok büyük ({info.width}x{info.height}). En fazla {max_pixels / 1e6:.0f} megapiksel desteklenir.'
+        )
@@ -0,0 +1,483 @@
+import base64
+import os
+from io import BytesIO
+from asgiref.sync import sync_to_async
+import cv2 # opencv'nin kütüphanesi
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from .concurrency import get_pipeline_executor, get_process_executor
+from .clustering import build_color_histogram, histogram_kmeans, refine_kmeans, suggest_k # histogram ağırlıklı KMeans motoru
+from .image_header import check_image_pixels, read_image_info # başlıktan boyut okuma ve decompression bomb sınırı
+from .metrics import CACHE_REQUESTS, DECODE_MEMORY, K_VALUES, observe_image_size, stage_timer, timed_stage # Server-Timing ve /metrics için aşama süreleri
+from .palette_cache import get_palette_cache, image_digest, lab_histogram_key, palette_cache_key, palette_sweep_key
+from .quantizers import DEFAULT_QUANTIZER, quantize, sweep_quantize # isimle seçilen palet algoritmaları
+from .tiled_decode import can_decode_in_strips, decode_png_in_strips, plan_strips # büyük PNG'leri şeritler halinde çözme
+
+# Görüntü işleme boru hattı: çözme, blur, LAB dönüşümü, nicemleme ve palet görselleri
+# OpenCV, numpy ve scikit-learn'ün içe aktarılması yavaştır; bu modül views.py tarafından yalnızca
+# bir boru hattı fonksiyonu ilk kez gerektiğinde (fonksiyon içinde) içe aktarılır. Böylece giriş/kayıt
+# gibi görünümler, manage.py komutları ve migrate bu maliyeti ödemez (bkz. benchmarks/startup_benchmark.py).
+
+WORKING_SIZE = (200, 200)  # palet çıkarılan çalışma görüntüsünün boyutu
+PREVIEW_SIZE = (64, 64)  # yüklemeden hemen sonra gösterilen yaklaşık paletin çalışma görüntüsü
+PREVIEW_MAX_ITER = 20  # önizleme KMeans'inin (tek başlatma) en fazla iterasyon sayısı
+EDIT_REFINE_ITERATIONS = 10  # palet düzenlemede var olan renklerden başlayan KMeans'in en fazla iterasyon sayısı
+
+REDUCED_DECODE_FLAGS = (  # libjpeg DCT ölçekleme ile çözme: (küçültme oranı, OpenCV bayrağı), büyükten küçüğe
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+def read_image_header(source):
+    """
+    Görselin formatını ve boyutlarını yalnızca başlığını okuyarak döndürür: (format, (genişlik, yükseklik)).
+    source bir dosya yolu ya da bayt dizisi olabilir. Okunamazsa (None, None) döner.
+    """
+    try:
+        info = read_image_info(source)
+    except OSError:
+        info = None
+    if info is None:
+        return None, None
+    return info.format, (info.width, info.height)
+
+def choose_reduced_decode_flag(source, size):
+    """
+    Hedef boyuttan küçük olmamak şartıyla en büyük JPEG küçültme oranının OpenCV bayrağını seçer.
+    Ölçekli çözme yapılamıyorsa (JPEG değil, başlık okunamadı, görsel zaten küçük) IMREAD_COLOR döner.
+    EXIF yönü görüntüyü döndürebileceği için kısa kenar, hedefin uzun kenarıyla karşılaştırılır.
+    """
+    image_format, image_size = read_image_header(source)
+    if image_format != 'JPEG' or image_size is None:
+        return cv2.IMREAD_COLOR
+    shortest_side = min(image_size)
+    for factor, flag in REDUCED_DECODE_FLAGS:
+        if shortest_side // factor >= max(size):
+            return flag
+    return cv2.IMREAD_COLOR
+
+def decode_memory_budget():
+    return getattr(settings, 'IMAGE_DECODE_MEMORY_BUDGET', None)
+
+def plan_decode(info, size):
+    """
+    Görselin nasıl çözüleceğini başlığa göre seçer: (mod, tahmini tepe bellek (bayt)).
+    'full' tam çözme, 'reduced' libjpeg'in ölçekli çözmesi, 'strips' şeritler halinde çözme (bkz. tiled_decode.py).
+    Tahmin IMAGE_DECODE_MEMORY_BUDGET'ı aşıyorsa tam çözme yerine şeritler seçilir; şeritler de mümkün değilse
+    görsel çözülmeden ValidationError fırlatılır. Başlık okunamadıysa (None) OpenCV'nin tam çözmesine bırakılır.
+    """
+    if info is None:
+        return 'full', None
+    check_image_pixels(info)
+    budget = decode_memory_budget()
+    pixels = info.width * info.height
+    # OpenCV'nin çözmede ölçülen tepe belleği BGR görüntünün yaklaşık iki katıdır (çözücü tamponu + görüntü)
+    if info.format == 'JPEG':
+        factor = next((factor for factor, _ in REDUCED_DECODE_FLAGS
+                       if min(info.width, info.height) // factor >= max(size)), 1)
+        mode, peak = ('reduced' if factor > 1 else 'full'), pixels // factor ** 2 * 6
+        if info.interlaced:  # progresif JPEG'de libjpeg, ölçekli çözmede bile bütün DCT katsayılarını (16 bit) tutar
+            peak += pixels * info.color_type * 2
+    else:
+        mode, peak = 'full', pixels * 6 * (2 if info.bit_depth == 16 else 1)  # 16 bitte önce 16 bitlik görüntü çözülür
+    if budget is None or peak <= budget:
+        return mode, peak
+    if can_decode_in_strips(info, size):
+        return 'strips', plan_strips(info, size, budget)[1]
+    raise ValidationError(
+        f'Görsel çözmek için çok büyük ({info.width}x{info.height}, yaklaşık {peak / 2 ** 20:.0f} MB bellek gerekir).'
+    )
+
+def decode_strips(file, info, size):
+    """Şeritler halinde çözüp size boyutuna alan ortalamasıyla küçültür; sonuç cv2.resize'ınkiyle aynı biçimdedir."""
+    strip_rows, _ = plan_strips(info, size, decode_memory_budget())
+    try:
+        return decode_png_in_strips(file, info, size, strip_rows)
+    except (ValueError, IndexError) as e:  # kesik ya da bozuk IDAT verisi
+        raise ValidationError('Geçersiz görsel formatı.') from e
+
+def decode_image(data, size=None): # bellekteki baytları tek seferde BGR numpy dizisine çözer
+    flag = choose_reduced_decode_flag(data, size) if size else cv2.IMREAD_COLOR
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flag)
+    if img is None and flag != cv2.IMREAD_COLOR:
+        img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR) # ölçekli çözme başarısızsa tam çözme
+    if img is None:
+        raise ValidationError('Geçersiz görsel formatı.')
+    return img
+
+@timed_stage('decode')
+def load_and_resize_image(image_path, size=WORKING_SIZE):  # görsel yükleme ve yeniden boyutlandırma fonks.
+    info = read_image_info(image_path) if os.path.exists(image_path) else None
+    mode, peak = plan_decode(info, size)  # bellek bütçesini aşan görseller tam boyutta hiç çözülmez
+    if peak is not None:
+        DECODE_MEMORY.observe(peak, mode=mode)
+    if mode == 'strips':
+        with open(image_path, 'rb') as file:
+            return decode_strips(file, info, size)
+    img = cv2.imread(image_path, choose_reduced_decode_flag(image_path, size)) # görsel okuma fonksiyonu ve yolu (mümkünse küçültülmüş çözme)
+    if img is None:
+        img = cv2.imread(image_path)
+    if img is None:
+        raise FileNotFoundError(f"Image not found: {image_path}") 
+    return cv2.resize(img, size)
+
+@timed_stage('decode')
+def decode_and_resize_image(data, size=WORKING_SIZE): # yüklenen dosyanın baytlarından diske uğramadan çalışma görüntüsü üretir
+    info = read_image_info(data)
+    mode, peak = plan_decode(info, size)
+    if peak is not None:
+        DECODE_MEMORY.observe(peak, mode=mode)
+    if mode == 'strips':
+        return decode_strips(BytesIO(data), info, size)
+    return cv2.resize(decode_image(data, size), size)
+
+@timed_stage('blur')
+def apply_gaussian_blur(image, kernel_size=(5, 5)): # gaussian blur fonks. kernel 5,5 parametresi alınmış test için değiştirilebilir
+    return cv2.GaussianBlur(image, kernel_size, 0)
+
+@timed_stage('lab')
+def convert_to_lab(image): # görseli RGB'den LAB renk uzayına çevirme
+    return cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+
+@timed_stage('quantize')
+def apply_kmeans(image, k=5):
+    """
+    Görüntüdeki baskın renkleri bulmak için KMeans algoritmasını uygular.
+    Pikseller önce nicemlenmiş bir LAB histogramına indirgenir, KMeans bu histogramın
+    kutuları üzerinde piksel sayılarıyla ağırlıklandırılarak çalışır (bkz. clustering.py).
+    
+    Parametreler:
+    - image: İşlenecek görüntü (numpy array formatında, LAB renk uzayında olmalı).
+    - k: KMeans algoritmasında kullanılacak küme sayısı (varsayılan 5).
+
+    Dönüş:
+    - centroids: Bulunan renk kümelerinin merkez koordinatları (LAB formatında).
+    """
+    centroids, _ = histogram_kmeans(image, k)  # küme ağırlıkları burada kullanılmıyor
+    return centroids
+
+def lab_to_rgb(centroids): # L(ight)AB (renk bileşenler) formatındaki renkleri RGB formatına dönüştürür. centroids: LAB formatında renk merkezleri her bir kümenin merkezini hesaplar renk değerlerinin ortalamasını temsil eder.
+    lab_image = np.uint8([centroids]) # LAB formatındaki renk merkezlerini uint8 türüne dönüştür (0-255 aralığında)
+    rgb_image = cv2.cvtColor(lab_image, cv2.COLOR_LAB2RGB)
+    return rgb_image[0]
+
+def visualize_palette(colors): # paleti görselleştirmek için fonksiyon
+    palette_width = 100 * len(colors) # paletin genişliği: Her renk için 100 piksel genişlik
+    palette_height = 100
+    palette_image = np.zeros((palette_height, palette_width, 3), dtype=np.uint8) # siyah bir arka plan oluştur (palet boyutlarında boş bir görsel)
+    """ 
+    Aşağıdaki for döngüsü her rengi görsele ekler, rengin başladığı ve bittiği yatay pixelleri alır renk değerlerini sınırlar
+    palet görseline göre yerleştirir
+    """
+    for idx, color in enumerate(colors):
+        start_x = idx * 100
+        end_x = start_x + 100
+        color = np.clip(color, 0, 255)
+        palette_image[:, start_x:end_x, :] = color
+
+    return palette_image
+
+@timed_stage('encode')
+def save_palette_to_base64(palette_image):
+    # Görseli base64 formatında kaydetme
+    _, buffer = cv2.imencode('.png', palette_image)
+    img_str = base64.b64encode(buffer).decode('utf-8')
+    return img_str
+
+def format_hex_codes(centroids_rgb): # RGB renkleri '#rrggbb' kodlarına çevirir
+    return ['#{:02x}{:02x}{:02x}'.format(int(c[0]), int(c[1]), int(c[2])) for c in centroids_rgb]
+
+def parse_hex_codes(rgb_codes): # '#rrggbb|#rrggbb' metnini (r, g, b) listesine çevirir
+    colors = []
+    for code in rgb_codes.split('|'):
+        code = code.strip().lstrip('#')
+        if len(code) == 6:
+            colors.append(tuple(int(code[i:i + 2], 16) for i in (0, 2, 4)))
+    return colors
+
+def hex_codes_to_lab(rgb_codes): # '#rrggbb|...' metnini lab_to_rgb'nin tersi olarak OpenCV LAB merkezlerine çevirir
+    colors = parse_hex_codes(rgb_codes)
+    if not colors:
+        return np.empty((0, 3), dtype=np.float64)
+    return cv2.cvtColor(np.uint8([colors]), cv2.COLOR_RGB2LAB)[0].astype(np.float64)
+
+@timed_stage('encode')
+def render_palette_png(rgb_codes):
+    # visualize_palette'e verilen renkler OpenCV'nin beklediği BGR sırasına çevrilir
+    colors = [(b, g, r) for r, g, b in parse_hex_codes(rgb_codes)]
+    _, buffer = cv2.imencode('.png', visualize_palette(colors))
+    return buffer.tobytes()
+
+@timed_stage('encode')
+def render_palette_svg(rgb_codes):
+    colors = parse_hex_codes(rgb_codes)
+    rects = ''.join(
+        f'<rect x="{idx * 100}" y="0" width="100" height="100" fill="#{r:02x}{g:02x}{b:02x}"/>'
+        for idx, (r, g, b) in enumerate(colors)
+    )
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{100 * len(colors)}" height="100" '
+            f'viewBox="0 0 {100 * len(colors)} 100">{rects}</svg>')
+
+PALETTE_IMAGE_RENDERERS = {  # format -> rgb kodlarından görsel üreten fonksiyon (içerik türleri views.py'de)
+    'png': render_palette_png,
+    'svg': render_palette_svg,
+}
+
+def run_palette_pipeline(img_resized, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER):
+    """
+    Yeniden boyutlandırılmış BGR görüntü üzerinde blur -> LAB -> nicemleme -> palet adımlarını çalıştırır.
+    process_image'ın kuyruğa eklediği işler palette_worker komutunda bu fonksiyonla işlenir.
+
+    Dönüş: ara görüntüleri, LAB merkezleri/ağırlıkları ve hex kodlarını içeren sözlük.
+    Palet görseli saklanmaz; palette_image_view tarafından rgb kodlarından istek anında üretilir.
+    """
+    img_blurred = apply_gaussian_blur(img_resized, (blur_kernel, blur_kernel))  # Kullanıcıdan alınan blur değeri
+    img_lab = convert_to_lab(img_blurred) # görüntü LAB formatına çevirme
+    with stage_timer('quantize'):
+        centroids_lab, weights = quantize(img_lab, k, algorithm) # LAB'a çevirilen görüntüye seçilen algoritmayı (varsayılan KMeans) uygulama
+    centroids_rgb = lab_to_rgb(centroids_lab) # LAB türünde olan görüntüyü RGB formatına çevirme.
+    return {
+        'img_blurred': img_blurred,
+        'img_lab': img_lab,
+        'centroids_lab': centroids_lab,
+        'weights': weights,
+        'rgb_codes': format_hex_codes(centroids_rgb),
+    }
+
+def preview_palette(image_data, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, size=PREVIEW_SIZE):
+    """
+    Tam kaliteli paletin hızlı bir yaklaşığı: görsel PREVIEW_SIZE'a küçültülerek çözülür, blur çekirdeği aynı
+    oranda küçültülür ve KMeans tek başlatmayla kısa çalışır (diğer algoritmalar zaten hızlıdır, aynen çalışır).
+    Süreç havuzunda da çalışır. Dönüş: centroids_lab, weights ve rgb_codes.
+    """
+    img_resized = decode_and_resize_image(image_data, size)
+    scaled_kernel = max(1, blur_kernel * size[0] // WORKING_SIZE[0]) | 1  # tek sayıya yuvarlanır
+    img_lab = convert_to_lab(apply_gaussian_blur(img_resized, (scaled_kernel, scaled_kernel)))
+    with stage_timer('quantize'):
+        if algorithm == 'kmeans':
+            centroids_lab, weights = histogram_kmeans(img_lab, k, n_init=1, max_iter=PREVIEW_MAX_ITER)
+        else:
+            centroids_lab, weights = quantize(img_lab, k, algorithm)
+    return {'centroids_lab': centroids_lab, 'weights': weights, 'rgb_codes': format_hex_codes(lab_to_rgb(centroids_lab))}
+
+def lookup_palette(image_data, k, blur_kernel, algorithm, size, digest=None):
+    """Önbellek anahtarını ve (varsa) önbellekteki sonucu döndürür: (key, cached)."""
+    K_VALUES.observe(k)
+    with stage_timer('cache'):
+        key = palette_cache_key(digest or image_digest(image_data), k, blur_kernel, size, algorithm)
+        cached = get_palette_cache().get(key)
+    CACHE_REQUESTS.inc(result='miss' if cached is None else 'hit')
+    if cached is None:
+        _, image_size = read_image_header(image_data)  # yalnızca başlık okunur, metrikler için özgün boyut
+        if image_size is not None:
+            observe_image_size(*image_size)
+    return key, cached
+
+def compute_palette(image_data, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, size=WORKING_SIZE, digest=None):
+    """
+    Görsel baytları için paleti önbellekten döndürür; önbellekte yoksa görseli çözüp
+    run_palette_pipeline ile hesaplar ve sonucu önbelleğe yazar.
+    Önbellek isabetinde görsel çözülmez ve kümeleme yapılmaz; ara görüntüler (img_blurred, img_lab) None olur.
+    digest verilirse (ör. ImageUpload.content_hash) görsel baytlarının özeti yeniden hesaplanmaz.
+    """
+    key, cached = lookup_palette(image_data, k, blur_kernel, algorithm, size, digest)
+    if cached is not None:
+        return dict(cached, img_blurred=None, img_lab=None, cached=True)
+
+    # çözme ve kümeleme süreç genelindeki eşzamanlılık sınırı altında çalışır; sınır ve sıra doluysa PipelineBusy
+    result = get_pipeline_executor().run(
+        lambda: run_palette_pipeline(decode_and_resize_image(image_data, size), k, blur_kernel, algorithm)
+    )
+    get_palette_cache().set(key, result)
+    return dict(result, cached=False)
+
+def compute_preview_palette(image_data, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, digest=None):
+    """
+    process_image'ın yanıt vermeden önce kaydettiği palet. Tam sonuç önbellekteyse o döner (preview=False);
+    yoksa preview_palette ile yaklaşık palet hesaplanır (preview=True), tam sonucu worker hesaplayıp önbelleğe yazar.
+    Önizleme önbelleğe yazılmaz.
+    """
+    _, cached = lookup_palette(image_data, k, blur_kernel, algorithm, WORKING_SIZE, digest)
+    if cached is not None:
+        return dict(cached, preview=False)
+    result = get_pipeline_executor().run(lambda: preview_palette(image_data, k, blur_kernel, algorithm))
+    return dict(result, preview=True)
+
+def run_palette_sweep(img_resized, k_values, blur_kernel=5, algorithm=DEFAULT_QUANTIZER):
+    """
+    Görüntüyü bir kez bulanıklaştırıp LAB'a çevirir ve tüm k değerlerinin paletlerini aynı veriden hesaplar.
+    Dönüş: {k: {'centroids_lab', 'weights', 'inertia', 'silhouette', 'rgb_codes'}}
+    """
+    img_lab = convert_to_lab(apply_gaussian_blur(img_resized, (blur_kernel, blur_kernel)))
+    with stage_timer('quantize'):
+        results = sweep_quantize(img_lab, k_values, algorithm)
+    for result in results.values():
+        result['rgb_codes'] = format_hex_codes(lab_to_rgb(result['centroids_lab']))
+    return results
+
+def compute_palette_sweep(image_data, k_values, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, size=WORKING_SIZE, digest=None):
+    """
+    k_values'daki her k için paleti ve skorlarını (inertia, silhouette) tek istekte döndürür:
+    {'palettes': [{'k', 'rgb_codes', 'weights', 'inertia', 'silhouette'}], 'suggested_k', 'cached'}.
+    Her k'nın sonucu ayrı önbellek kaydıdır; hepsi önbellekteyse görsel çözülmez. Eksik varsa tarama
+    eşzamanlılık sınırı altında baştan çalışır (sıcak başlangıç zinciri en küçük k'dan kurulur).
+    """
+    k_values = sorted(set(k_values))
+    digest = digest or image_digest(image_data)
+    cache = get_palette_cache()
+    keys = {k: palette_sweep_key(digest, k, k_values[0], blur_kernel, size, algorithm) for k in k_values}
+    with stage_timer('cache'):
+        results = {k: cache.get(key) for k, key in keys.items()}
+    cached = all(result is not None and 'inertia' in result for result in results.values())
+    CACHE_REQUESTS.inc(result='hit' if cached else 'miss')
+
+    if not cached:
+        results = get_pipeline_executor().run(
+            lambda: run_palette_sweep(decode_and_resize_image(image_data, size), k_values, blur_kernel, algorithm)
+        )
+        for k, key in keys.items():
+            cache.set(key, results[k])
+    return {
+        'palettes': [{
+            'k': k,
+            'rgb_codes': list(results[k]['rgb_codes']),
+            'weights': [float(w) for w in results[k]['weights']],
+            'inertia': float(results[k]['inertia']),
+            'silhouette': results[k]['silhouette'],
+        } for k in k_values],
+        'suggested_k': suggest_k(results),
+        'cached': cached,
+    }
+
+def palette_from_bytes(image_data, k, blur_kernel, algorithm, size=WORKING_SIZE):
+    """
+    Süreç havuzunda çalışan boru hattı: görseli çözer, paleti hesaplar ve yalnızca küçük sonuçları döndürür
+    (ara görüntüler süreçler arasında taşınmaz).
+    """
+    result = run_palette_pipeline(decode_and_resize_image(image_data, size), k, blur_kernel, algorithm)
+    return {'centroids_lab': result['centroids_lab'], 'weights': result['weights'], 'rgb_codes': result['rgb_codes']}
+
+def palette_from_file(path, k, blur_kernel, algorithm, size=WORKING_SIZE):
+    """
+    extract_palettes komutunun süreç havuzunda çalışan adımı: dosyayı okur, içerik özetini ve paleti hesaplar.
+    Okunamayan ya da çözülemeyen dosyada hata fırlatmak yerine error alanı dolu döner; tek dosya tüm çalışmayı durdurmaz.
+    """
+    row = {'path': path, 'content_hash': '', 'rgb_codes': [], 'weights': [], 'error': ''}
+    try:
+        with open(path, 'rb') as file:
+            image_data = file.read()
+        row['content_hash'] = image_digest(image_data)
+        result = palette_from_bytes(image_data, k, blur_kernel, algorithm, size)
+        row['rgb_codes'] = result['rgb_codes']
+        row['weights'] = [round(float(w), 6) for w in result['weights']]  # json çıktısı ve renk tablosu için
+    except (OSError, ValidationError) as e:
+        row['error'] = e.message if isinstance(e, ValidationError) else str(e)
+    except Exception as e:  # bozuk dosyalar OpenCV/numpy'dan farklı türde hatalar fırlatabilir
+        row['error'] = f'{type(e).__name__}: {e}'
+    return row
+
+def lab_histogram(img_resized, blur_kernel=5):
+    """Çalışma görüntüsünü bulanıklaştırıp LAB'a çevirir ve KMeans'in kümelediği renk histogramını döndürür: (colors, counts)."""
+    img_lab = convert_to_lab(apply_gaussian_blur(img_resized, (blur_kernel, blur_kernel)))
+    with stage_timer('quantize'):
+        return build_color_histogram(img_lab)
+
+def refine_palette(image_data, seed_codes, k, blur_kernel=5, size=WORKING_SIZE, histogram=None):
+    """
+    Var olan paletten (seed_codes, '#rrggbb|...') başlayarak k renklik paleti kısa bir KMeans ile yeniden hesaplar
+    (clustering.refine_kmeans). histogram verilirse görsel hiç çözülmez; verilmezse image_data'dan üretilir.
+    Süreç havuzunda da çalışır. Dönüş: centroids_lab, weights, rgb_codes; histogram burada üretildiyse
+    önbelleğe yazılmak üzere 'histogram' da döner (verilen histogram süreçler arasında geri taşınmaz).
+    """
+    result = {}
+    if histogram is None:
+        histogram = result['histogram'] = lab_histogram(decode_and_resize_image(image_data, size), blur_kernel)
+    colors, counts = histogram
+    with stage_timer('quantize'):
+        centroids_lab, weights, _ = refine_kmeans(colors, counts, hex_codes_to_lab(seed_codes), k,
+                                                  max_iter=EDIT_REFINE_ITERATIONS)
+    result.update(centroids_lab=centroids_lab, weights=weights, rgb_codes=format_hex_codes(lab_to_rgb(centroids_lab)))
+    return result
+
+def lookup_histogram(digest, blur_kernel, size):
+    """Görselin önbellekteki LAB histogramını döndürür; digest yoksa ya da önbellekte yoksa None."""
+    histogram = None
+    if digest:
+        with stage_timer('cache'):
+            histogram = get_palette_cache().get_histogram(lab_histogram_key(digest, blur_kernel, size))
+    CACHE_REQUESTS.inc(result='miss' if histogram is None else 'hit')
+    return histogram
+
+def compute_edited_palette(load_image, seed_codes, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, size=WORKING_SIZE, digest=None):
+    """
+    Palet düzenleme: KMeans paletleri var olan renklerinden (seed_codes) başlayarak, görselin önbellekteki
+    ön işlenmiş LAB histogramı üzerinde yeniden kümelenir. Histogram önbellekteyse görsel okunmaz ve çözülmez
+    (load_image yalnızca gerektiğinde çağrılan, görsel baytlarını döndüren fonksiyondur).
+    Diğer algoritmalar ve renk kodu olmayan paletler compute_palette ile baştan hesaplanır.
+    Dönüş: compute_palette ile aynı biçimde; cached, histogramın önbellekten gelip gelmediğidir.
+    """
+    if algorithm != 'kmeans' or not parse_hex_codes(seed_codes):
+        return compute_palette(load_image(), k, blur_kernel, algorithm, size, digest)
+    K_VALUES.observe(k)
+    histogram = lookup_histogram(digest, blur_kernel, size)
+    image_data = None
+    if histogram is None:
+        image_data = load_image()
+        digest = digest or image_digest(image_data)
+
+    result = get_pipeline_executor().run(
+        lambda: refine_palette(image_data, seed_codes, k, blur_kernel, size, histogram)
+    )
+    if 'histogram' in result:
+        get_palette_cache().set_histogram(lab_histogram_key(digest, blur_kernel, size), result.pop('histogram'))
+    return dict(result, img_blurred=None, img_lab=None, cached=histogram is not None)
+
+async def acompute_edited_palette(load_image, seed_codes, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, size=WORKING_SIZE, digest=None):
+    """compute_edited_palette'in async karşılığı: görsel iş parçacığında okunur, kümeleme süreç havuzunda çalışır."""
+    if algorithm != 'kmeans' or not parse_hex_codes(seed_codes):
+        image_data = await sync_to_async(load_image, thread_sensitive=False)()
+        return await acompute_palette(image_data, k, blur_kernel, algorithm, size, digest)
+    K_VALUES.observe(k)
+    histogram = await sync_to_async(lookup_histogram, thread_sensitive=False)(digest, blur_kernel, size)
+    image_data = None
+    if histogram is None:
+        image_data = await sync_to_async(load_image, thread_sensitive=False)()
+        digest = digest or image_digest(image_data)
+
+    with stage_timer('pipeline'):
+        result = await get_process_executor().run(refine_palette, image_data, seed_codes, k, blur_kernel, size, histogram)
+    if 'histogram' in result:
+        await sync_to_async(get_palette_cache().set_histogram, thread_sensitive=False)(
+            lab_histogram_key(digest, blur_kernel, size), result.pop('histogram'),
+        )
+    return dict(result, img_blurred=None, img_lab=None, cached=histogram is not None)
+
+async def acompute_preview_palette(image_data, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, digest=None):
+    """compute_preview_palette'in async karşılığı: önizleme süreç havuzunda hesaplanır."""
+    _, cached = await sync_to_async(lookup_palette, thread_sensitive=False)(
+        image_data, k, blur_kernel, algorithm, WORKING_SIZE, digest,
+    )
+    if cached is not None:
+        return dict(cached, preview=False)
+    with stage_timer('pipeline'):
+        result = await get_process_executor().run(preview_palette, image_data, k, blur_kernel, algorithm)
+    return dict(result, preview=True)
+
+async def acompute_palette(image_data, k=5, blur_kernel=5, algorithm=DEFAULT_QUANTIZER, size=WORKING_SIZE, digest=None):
+    """
+    compute_palette'in async görünümler için karşılığı: önbellek bir iş parçacığında okunur, önbellekte yoksa
+    çözme ve kümeleme süreç havuzunda (ayrı çekirdeklerde) çalışır; olay döngüsü bu sırada başka istekleri işler.
+    Havuz ve bekleme sırası doluysa PipelineBusy fırlatılır. Ara görüntüler her zaman None döner.
+    """
+    key, cached = await sync_to_async(lookup_palette, thread_sensitive=False)(
+        image_data, k, blur_kernel, algorithm, size, digest,
+    )
+    if cached is not None:
+        return dict(cached, img_blurred=None, img_lab=None, cached=True)
+
+    with stage_timer('pipeline'):  # aşama süreleri havuzdaki süreçte kalır, burada toplam süre ölçülür
+        result = await get_process_executor().run(palette_from_bytes, image_data, k, blur_kernel, algorithm, size)
+    await sync_to_async(get_palette_cache().set, thread_sensitive=False)(key, result)
+    return dict(result, img_blurred=None, img_lab=None, cached=False)
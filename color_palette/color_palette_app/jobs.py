@@ -0,0 +1,182 @@
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from .metrics import JOBS, stage_timer
+from .models import ColorPalette, PaletteJob
+from .palette_colors import replace_palette_colors
+
+# Veritabanı tablosu (PaletteJob) üzerinde çalışan palet iş kuyruğu.
+# Harici bir mesaj kuyruğu yoktur: worker'lar en eski 'queued' işi koşullu bir UPDATE ile
+# üstlenir, böylece aynı iş iki worker tarafından alınamaz.
+# Üstlenilen iş bir kiralama (lease) ile tutulur: worker iş sürerken heartbeat_at'i yeniler. Worker ölürse
+# kiralamanın süresi dolar ve iş bir sonraki claim_next_job'da yeniden kuyruğa alınır (deneme hakkı bittiyse 'failed' olur).
+
+UPLOAD_WAIT_SECONDS = 10  # yüklenen dosyanın arka planda diske yazılmasını bekleme süresi
+
+
+def default_worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def queue_depth():
+    """Kuyrukta bekleyen iş sayısı."""
+    return PaletteJob.objects.filter(status=PaletteJob.STATUS_QUEUED).count()
+
+
+def job_lease():
+    return timedelta(seconds=getattr(settings, 'PALETTE_JOB_LEASE_SECONDS', 120))
+
+
+def requeue_expired_jobs():
+    """
+    Kiralaması dolmuş (worker'ı ölmüş) 'running' işleri yeniden kuyruğa alır; PALETTE_JOB_MAX_ATTEMPTS kez
+    üstlenilmiş olanları 'failed' yapar. Dönüş: (yeniden kuyruğa alınan, başarısız sayılan) iş sayıları.
+    """
+    now = timezone.now()
+    expired = PaletteJob.objects.filter(status=PaletteJob.STATUS_RUNNING, heartbeat_at__lt=now - job_lease())
+    exhausted = expired.filter(attempts__gte=getattr(settings, 'PALETTE_JOB_MAX_ATTEMPTS', 3))
+    failed = exhausted.update(status=PaletteJob.STATUS_FAILED, finished_at=now, updated_at=now,
+                              error='Worker işi tamamlayamadı (deneme hakkı doldu).')
+    requeued = expired.update(status=PaletteJob.STATUS_QUEUED, worker='', started_at=None, heartbeat_at=None,
+                              updated_at=now)
+    if failed:
+        JOBS.inc(failed, status=PaletteJob.STATUS_FAILED)
+    return requeued, failed
+
+
+def claim_next_job(worker_name, batch=10):
+    """
+    Kuyruktaki en eski işi bu worker adına üstlenir ve döndürür; iş yoksa None döner.
+    Üstlenme, durum hâlâ 'queued' ise güncelleyen tek bir UPDATE sorgusudur. Önce kiralaması dolmuş işler
+    yeniden kuyruğa alınır.
+    """
+    requeue_expired_jobs()
+    candidates = (PaletteJob.objects.filter(status=PaletteJob.STATUS_QUEUED)
+                  .order_by('created_at', 'id').values_list('id', flat=True)[:batch])
+    for job_id in candidates:
+        now = timezone.now()
+        claimed = PaletteJob.objects.filter(id=job_id, status=PaletteJob.STATUS_QUEUED).update(
+            status=PaletteJob.STATUS_RUNNING, worker=worker_name, started_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return PaletteJob.objects.select_related('image', 'user', 'palette').get(id=job_id)
+    return None
+
+
+class JobHeartbeat:
+    """İş sürerken kiralamanın üçte biri aralıklarla işin heartbeat_at alanını ayrı bir iş parçacığında yeniler."""
+
+    def __init__(self, job):
+        self.job = job
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f'palette-job-{job.id}-heartbeat', daemon=True)
+
+    def run(self):
+        try:
+            while not self.stopped.wait(job_lease().total_seconds() / 3):
+                PaletteJob.objects.filter(id=self.job.id, status=PaletteJob.STATUS_RUNNING,
+                                          worker=self.job.worker).update(heartbeat_at=timezone.now())
+        finally:
+            connection.close()  # iş parçacığına ait veritabanı bağlantısı
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stopped.set()
+        self.thread.join()
+
+
+def read_job_image(job, timeout=UPLOAD_WAIT_SECONDS):
+    # process_image dosyayı arka planda yazar; worker işi dosya diske inmeden önce alabilir
+    field_file = job.image.image
+    deadline = time.monotonic() + timeout
+    while not field_file.storage.exists(field_file.name):
+        if time.monotonic() >= deadline:
+            raise FileNotFoundError(f"Image not found: {field_file.name}")
+        time.sleep(0.1)
+    with field_file.storage.open(field_file.name, 'rb') as file:
+        return file.read()
+
+
+def run_job(job):
+    """Üstlenilmiş bir işi çalıştırır, sonucu ColorPalette olarak kaydeder ve işin durumunu günceller."""
+    from .imaging import compute_palette # görüntü işleme yalnızca işi çalıştıran süreçte yüklenir (kuyruk derinliği okuyan /metrics yüklemez)
+
+    try:
+        with JobHeartbeat(job):  # iş sürdükçe kiralama yenilenir
+            with stage_timer('read'):
+                image_data = read_job_image(job)
+            result = compute_palette(image_data, job.k_value, job.blur_kernel, job.algorithm,
+                                     digest=job.image.content_hash)
+        # Gaussian Blur ve LAB önizlemeleri burada yazılmaz, palet sayfası istediğinde üretilir (previews.py)
+
+        with transaction.atomic():
+            # iş bu arada iptal edildiyse (önizleme paleti silindi, bkz. delete_palette) ya da kiralaması dolup
+            # başka bir worker'a geçtiyse sonuç yazılmaz
+            if not PaletteJob.objects.select_for_update().filter(id=job.id, status=PaletteJob.STATUS_RUNNING,
+                                                                 worker=job.worker).exists():
+                job.refresh_from_db()
+                return job
+            update_fields = ['status', 'finished_at', 'updated_at']
+            if job.palette is not None:
+                # process_image'ın kaydettiği önizleme paleti yerinde güncellenir; kullanıcı bu arada
+                # paleti düzenlediyse (renkler değiştiyse) düzenleme korunur, sildiyse yeniden oluşturulmaz
+                palette = ColorPalette.objects.select_for_update().filter(id=job.palette_id).only('rgb_codes').first()
+                if palette is None:
+                    job.palette = None  # veritabanında SET_NULL ile zaten boşaltıldı, palette alanı yazılmaz
+                elif palette.rgb_codes == job.palette.rgb_codes:
+                    ColorPalette.objects.filter(id=job.palette_id).update(
+                        rgb_codes='|'.join(result['rgb_codes']), updated_at=timezone.now(),
+                    )
+                    replace_palette_colors([(job.palette_id, result['rgb_codes'], result['weights'])])
+            else:
+                job.palette = ColorPalette.objects.create(
+                    user=job.user,
+                    image=job.image,
+                    rgb_codes='|'.join(result['rgb_codes']),
+                    k_value=job.k_value,
+                    blur_kernel=job.blur_kernel,
+                    algorithm=job.algorithm
+                )
+                replace_palette_colors([(job.palette_id, result['rgb_codes'], result['weights'])])
+                update_fields.append('palette')
+            job.status = PaletteJob.STATUS_DONE
+            job.finished_at = timezone.now()
+            job.save(update_fields=update_fields)
+        JOBS.inc(status=PaletteJob.STATUS_DONE)
+    except Exception as e:
+        job.status = PaletteJob.STATUS_FAILED
+        job.error = str(e)
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+        JOBS.inc(status=PaletteJob.STATUS_FAILED)
+    return job
+
+
+def work(worker_name=None, once=False, poll_interval=1.0, max_jobs=None):
+    """
+    Kuyruktan iş alıp çalıştıran worker döngüsü.
+    once=True ise kuyruk boşalınca döner; max_jobs verilirse o kadar işten sonra durur.
+    Dönüş: işlenen iş sayısı.
+    """
+    worker_name = worker_name or default_worker_name()
+    processed = 0
+    while max_jobs is None or processed < max_jobs:
+        job = claim_next_job(worker_name)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job)
+        processed += 1
+    return processed
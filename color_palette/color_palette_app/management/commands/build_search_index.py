@@ -0,0 +1,18 @@
+import time
+from django.core.management.base import BaseCommand
+from color_palette_app.color_search import get_search_index
+
+
+class Command(BaseCommand):
+    help = ('Renk araması indeksini PaletteColor tablosunun tamamından yeniden kurar ve PALETTE_SEARCH["INDEX_PATH"] '
+            'dosyasına kaydeder. Sunucular açılışta bu dosyayı yükler, yalnızca sonradan eklenen renkleri okur.')
+
+    def handle(self, *args, **options):
+        index = get_search_index()
+        started = time.perf_counter()
+        index.rebuild()
+        elapsed = time.perf_counter() - started
+        target = index.path or 'bellek (INDEX_PATH ayarlı değil, kaydedilmedi)'
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(index)} renk, {len(index.owners)} palet indekslendi ({elapsed:.2f} sn): {target}'
+        ))
@@ -0,0 +1,82 @@
+import hashlib
+from collections import defaultdict
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from color_palette_app.models import ColorPalette, ImageUpload, PaletteJob
+
+
+class Command(BaseCommand):
+    help = ('Özeti (content_hash) olmayan ImageUpload kayıtları için sha256 özetini hesaplar, '
+            'aynı içeriğe sahip kayıtları tek kayıtta birleştirir ve ref_count değerlerini yeniden hesaplar.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='toplu güncellemelerde kayıt sayısı')
+        parser.add_argument('--dry-run', action='store_true', help='değişiklik yapmadan yalnızca raporla')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        # 1) eksik özetleri hesapla (dosyalar parça parça okunur)
+        digests = {}
+        missing = 0
+        for image in ImageUpload.objects.filter(content_hash__isnull=True).only('id', 'image').iterator(chunk_size=batch_size):
+            try:
+                digests[image.id] = self.file_digest(image)
+            except (OSError, ValueError):
+                missing += 1
+
+        # 2) aynı özete sahip kayıtları grupla; en eski kayıt (ya da zaten özeti olan kayıt) korunur
+        groups = defaultdict(list)
+        for image_id, content_hash in ImageUpload.objects.filter(content_hash__isnull=False).values_list('id', 'content_hash'):
+            groups[content_hash].append(image_id)
+        for image_id in sorted(digests):
+            groups[digests[image_id]].append(image_id)
+
+        keepers = {}
+        duplicates = {}
+        for content_hash, image_ids in groups.items():
+            keeper, *others = image_ids
+            keepers[keeper] = content_hash
+            for duplicate in others:
+                duplicates[duplicate] = keeper
+
+        self.stdout.write(f'{len(digests)} özet hesaplandı, {missing} dosya okunamadı, '
+                          f'{len(duplicates)} kopya kayıt {len(set(duplicates.values()))} kayıtta birleştirilecek.')
+        if dry_run:
+            return
+
+        with transaction.atomic():
+            # paletleri ve işleri korunan kayda taşı, ardından kopyaları sil (dosyaları sinyal ile silinir)
+            by_keeper = defaultdict(list)
+            for duplicate, keeper in duplicates.items():
+                by_keeper[keeper].append(duplicate)
+            for keeper, duplicate_ids in by_keeper.items():
+                ColorPalette.objects.filter(image_id__in=duplicate_ids).update(image_id=keeper)
+                PaletteJob.objects.filter(image_id__in=duplicate_ids).update(image_id=keeper)
+            for image in list(ImageUpload.objects.filter(id__in=list(duplicates))):
+                image.delete()
+
+            # özetleri toplu olarak yaz
+            to_update = [ImageUpload(id=image_id, content_hash=content_hash)
+                         for image_id, content_hash in keepers.items() if image_id in digests]
+            ImageUpload.objects.bulk_update(to_update, ['content_hash'], batch_size=batch_size)
+
+            # referans sayılarını bağlı palet sayısından yeniden hesapla
+            ImageUpload.objects.update(ref_count=0)
+            counts = defaultdict(list)
+            for row in ColorPalette.objects.values('image_id').annotate(total=Count('id')):
+                counts[row['total']].append(row['image_id'])
+            for total, image_ids in counts.items():
+                ImageUpload.objects.filter(id__in=image_ids).update(ref_count=total)
+
+        self.stdout.write(self.style.SUCCESS(f'{len(duplicates)} kopya kayıt birleştirildi.'))
+
+    @staticmethod
+    def file_digest(image):
+        digest = hashlib.sha256()
+        with image.image.open('rb') as file:
+            for chunk in file.chunks():
+                digest.update(chunk)
+        return digest.hexdigest()
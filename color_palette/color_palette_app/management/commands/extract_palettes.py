@@ -0,0 +1,276 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from contextlib import ExitStack
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from color_palette_app.batch import bulk_create_palettes, store_images
+from color_palette_app.concurrency import PipelineBusy, ProcessPipelineExecutor
+from color_palette_app.models import PALETTE_ALGORITHMS
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def iter_image_files(root):
+    """
+    Dizin ağacındaki görsel dosyalarını kök dizine göre göreli yollarıyla, belirli bir sırada üretir.
+    Ağaç önceden listelenmez (os.scandir ile dizin dizin gezilir); sembolik bağlantılı dizinlere girilmez.
+    """
+    stack = ['']
+    while stack:
+        relative_dir = stack.pop()
+        with os.scandir(os.path.join(root, relative_dir)) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+        subdirs = []
+        for entry in entries:
+            relative_path = os.path.join(relative_dir, entry.name)
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(relative_path)
+            elif entry.is_file() and entry.name.lower().endswith(IMAGE_EXTENSIONS):
+                yield relative_path
+        stack.extend(reversed(subdirs))
+
+
+class Checkpoint:
+    """
+    Tamamlanan dosyaların (başarılı ya da hatalı) göreli yollarını tutan, satır satır büyüyen kontrol noktası dosyası.
+    İlk satır çalışma parametreleridir; farklı parametrelerle devam etmek CommandError verir.
+    Yollar yalnızca ait oldukları grup çıktıya yazıldıktan (veritabanında commit edildikten) sonra eklenir.
+    """
+
+    def __init__(self, path, params):
+        self.path = path
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                header = file.readline()
+                if header and json.loads(header) != params:
+                    raise CommandError(f'{path} farklı parametrelerle oluşturulmuş; baştan başlamak için --restart kullanın.')
+                self.done.update(line.rstrip('\n') for line in file if line.strip())
+            self.file = open(path, 'a', encoding='utf-8')
+        else:
+            self.file = open(path, 'w', encoding='utf-8')
+            self.file.write(json.dumps(params) + '\n')
+            self.file.flush()
+
+    @property
+    def resuming(self):
+        return bool(self.done)
+
+    def add(self, paths):
+        self.file.write(''.join(f'{path}\n' for path in paths))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.done.update(paths)
+
+    def close(self):
+        self.file.close()
+
+
+class CsvWriter:
+    fields = ('path', 'content_hash', 'rgb_codes', 'error')
+
+    def __init__(self, path, append):
+        self.file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        if self.file.tell() == 0:
+            self.writer.writerow(self.fields)
+
+    def write(self, rows):
+        self.writer.writerows([row['path'], row['content_hash'], '|'.join(row['rgb_codes']), row['error']] for row in rows)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class JsonLinesWriter:
+    """Her satırı bir json nesnesi olan çıktı (JSON Lines); kesilen bir çalışmaya ekleme yapılabilir."""
+
+    def __init__(self, path, append):
+        self.file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, rows):
+        self.file.write(''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class DatabaseWriter:
+    """Başarılı sonuçları verilen kullanıcının paletleri olarak ekler; her grup tek bir işlemde (transaction) yazılır."""
+
+    def __init__(self, root, user, k, algorithm, blur_kernel):
+        self.root = root
+        self.user = user
+        self.k = k
+        self.algorithm = algorithm
+        self.blur_kernel = blur_kernel
+
+    def write(self, rows):
+        rows = [row for row in rows if not row['error']]
+        with ExitStack() as stack:
+            files = {}
+            for row in rows:
+                if row['content_hash'] not in files:
+                    file = stack.enter_context(open(os.path.join(self.root, row['path']), 'rb'))
+                    files[row['content_hash']] = (os.path.basename(row['path']), File(file))
+            images = store_images(files)
+        bulk_create_palettes(self.user, [(images[row['content_hash']], row['rgb_codes'], row['weights']) for row in rows],
+                             self.k, self.algorithm, self.blur_kernel)
+
+    def close(self):
+        pass
+
+
+class Command(BaseCommand):
+    help = ('Diskteki bir dizin ağacındaki görsellerin paletlerini süreç havuzunda çıkarır ve sonuçları '
+            'CSV, JSON Lines ya da veritabanına gruplar halinde yazar. Kesilen çalışma kontrol noktasından devam eder.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='görsellerin bulunduğu dizin (alt dizinler dahil)')
+        parser.add_argument('--k', type=int, default=5, help='palet renk sayısı')
+        parser.add_argument('--blur-kernel', type=int, default=5, help='gaussian blur çekirdek boyutu (tek sayı)')
+        parser.add_argument('--algorithm', choices=PALETTE_ALGORITHMS, default=PALETTE_ALGORITHMS[0])
+        parser.add_argument('--format', choices=('csv', 'json', 'db'), default=None,
+                            help='çıktı türü (varsayılan: --output uzantısından, --output yoksa db)')
+        parser.add_argument('--output', default=None, help='csv/json çıktı dosyası')
+        parser.add_argument('--user', default=None, help='db çıktısında paletlerin sahibi olacak kullanıcı adı')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='süreç havuzundaki işçi sayısı')
+        parser.add_argument('--batch-size', type=int, default=200, help='tek seferde yazılan (commit edilen) sonuç sayısı')
+        parser.add_argument('--checkpoint', default=None,
+                            help='kontrol noktası dosyası (varsayılan: <output>.checkpoint ya da ./extract_palettes.checkpoint)')
+        parser.add_argument('--restart', action='store_true', help='kontrol noktasını yok sayıp baştan başla')
+        parser.add_argument('--progress-interval', type=float, default=5.0, help='ilerleme raporu aralığı (saniye)')
+
+    def handle(self, *args, **options):
+        root = os.path.abspath(options['directory'])
+        if not os.path.isdir(root):
+            raise CommandError(f'Dizin bulunamadı: {root}')
+        if options['blur_kernel'] % 2 == 0:
+            raise CommandError('Blur kernel değeri tek sayı olmalıdır.')
+        output_format = options['format'] or self.infer_format(options['output'])
+        if output_format != 'db' and not options['output']:
+            raise CommandError(f'{output_format} çıktısı için --output gerekli.')
+        user = None
+        if output_format == 'db':
+            if not options['user']:
+                raise CommandError('db çıktısı için --user gerekli.')
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'Kullanıcı bulunamadı: {options["user"]}')
+
+        params = {'directory': root, 'k': options['k'], 'blur_kernel': options['blur_kernel'],
+                  'algorithm': options['algorithm'], 'format': output_format}
+        checkpoint_path = options['checkpoint'] or (
+            f"{options['output']}.checkpoint" if output_format != 'db' else os.path.abspath('extract_palettes.checkpoint')
+        )
+        if options['restart'] and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        checkpoint = Checkpoint(checkpoint_path, params)
+        if checkpoint.resuming:
+            self.stdout.write(f'{checkpoint_path}: {len(checkpoint.done)} dosya zaten tamamlanmış, kalanlardan devam ediliyor.')
+
+        if output_format == 'csv':
+            writer = CsvWriter(options['output'], append=checkpoint.resuming)
+        elif output_format == 'json':
+            writer = JsonLinesWriter(options['output'], append=checkpoint.resuming)
+        else:
+            writer = DatabaseWriter(root, user, options['k'], options['algorithm'], options['blur_kernel'])
+
+        try:
+            processed, failed, elapsed = self.extract(root, checkpoint, writer, options)
+        finally:
+            writer.close()
+            checkpoint.close()
+        rate = processed / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'{processed} görsel işlendi ({failed} hatalı), {elapsed:.1f} sn, {rate:.1f} görsel/sn.'
+        ))
+
+    @staticmethod
+    def infer_format(output):
+        if not output:
+            return 'db'
+        extension = os.path.splitext(output)[1].lower()
+        if extension == '.csv':
+            return 'csv'
+        if extension in ('.json', '.jsonl'):
+            return 'json'
+        raise CommandError(f'Çıktı türü {output} uzantısından anlaşılamadı, --format verin.')
+
+    def extract(self, root, checkpoint, writer, options):
+        """
+        Dosyaları dizinden okundukça havuza gönderir. Havuzda en fazla 2 x workers dosya bekler, böylece
+        dizin ağacı ne kadar büyük olursa olsun bellek kullanımı sabit kalır. Sonuçlar batch_size'lık
+        gruplar halinde yazılır ve kontrol noktasına eklenir. Ctrl+C ile kesilirse biten sonuçlar yazılıp çıkılır.
+        """
+        from color_palette_app.imaging import palette_from_file # görüntü işleme yalnızca bu komutta yüklenir
+
+        workers = max(1, options['workers'])
+        executor = ProcessPipelineExecutor(
+            max_concurrency=workers, queue_size=workers,
+            threads_per_job=getattr(settings, 'PIPELINE_THREADS_PER_JOB', 1),
+            start_method=getattr(settings, 'PIPELINE_PROCESS_START_METHOD', 'spawn'),
+        )
+        pending_paths = (path for path in iter_image_files(root) if path not in checkpoint.done)
+        running = {}
+        results = []
+        processed = failed = 0
+        started = last_report = time.perf_counter()
+
+        def flush():
+            writer.write(results)
+            checkpoint.add([row['path'] for row in results])
+            results.clear()
+
+        try:
+            exhausted, path = False, None  # path: havuza henüz gönderilemeyen dosya
+            while running or path is not None or not exhausted:
+                while (path is not None or not exhausted) and len(running) < 2 * workers:
+                    if path is None:
+                        path = next(pending_paths, None)
+                        if path is None:
+                            exhausted = True
+                            break
+                    try:
+                        future = executor.submit(palette_from_file, os.path.join(root, path),
+                                                 options['k'], options['blur_kernel'], options['algorithm'])
+                    except PipelineBusy:
+                        # wait() biten işi havuzun sayacını azaltan geri çağrıdan önce döndürebilir;
+                        # dosya bir sonraki turda yeniden gönderilir (bkz. PaletteBatch.wait_next)
+                        break
+                    running[future] = path
+                    path = None
+                if not running:
+                    if path is None:
+                        break
+                    time.sleep(0.01)
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    row = dict(future.result(), path=running.pop(future))  # çıktıda kök dizine göre göreli yol
+                    processed += 1
+                    failed += bool(row['error'])
+                    results.append(row)
+                if len(results) >= options['batch_size']:
+                    flush()
+
+                now = time.perf_counter()
+                if now - last_report >= options['progress_interval']:
+                    self.stdout.write(f'{processed} görsel ({failed} hatalı), {processed / (now - started):.1f} görsel/sn')
+                    last_report = now
+        except KeyboardInterrupt:
+            self.stderr.write('Kesildi; tamamlanan sonuçlar yazılıyor. Aynı komutla kaldığı yerden devam edilir.')
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+            if results:
+                flush()
+        return processed, failed, time.perf_counter() - started
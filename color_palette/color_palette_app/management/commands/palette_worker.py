@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from color_palette_app.jobs import default_worker_name, work
+from color_palette_app.metrics import serve_metrics
+
+
+class Command(BaseCommand):
+    help = 'Kuyruktaki palet işlerini (PaletteJob) üstlenip işleyen worker süreci.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='kuyruk boşalınca çık')
+        parser.add_argument('--poll-interval', type=float, default=1.0, help='kuyruk boşken bekleme süresi (saniye)')
+        parser.add_argument('--max-jobs', type=int, default=None, help='bu kadar iş işledikten sonra çık')
+        parser.add_argument('--name', default=None, help='worker adı (varsayılan: host:pid)')
+        parser.add_argument('--metrics-port', type=int, default=None,
+                            help='worker metriklerini bu portta Prometheus metin formatında yayınla')
+
+    def handle(self, *args, **options):
+        worker_name = options['name'] or default_worker_name()
+        self.stdout.write(f'Worker {worker_name} başladı.')
+        if options['metrics_port']:
+            serve_metrics(options['metrics_port'])  # kümeleme worker'da çalıştığı için aşama metrikleri burada birikir
+        processed = work(
+            worker_name=worker_name,
+            once=options['once'],
+            poll_interval=options['poll_interval'],
+            max_jobs=options['max_jobs'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'{processed} iş işlendi.'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from color_palette_app.previews import sweep_previews
+
+
+class Command(BaseCommand):
+    help = 'Süresi (PREVIEW_TTL) dolmuş bulanık/LAB önizleme görsellerini depolamadan siler.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age', type=int, default=None,
+                            help='saniye cinsinden en fazla yaş (varsayılan: settings.PREVIEW_TTL)')
+
+    def handle(self, *args, **options):
+        removed = sweep_previews(options['max_age'])  # None ise settings.PREVIEW_TTL kullanılır
+        self.stdout.write(self.style.SUCCESS(f'{removed} önizleme silindi.'))
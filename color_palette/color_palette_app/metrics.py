@@ -0,0 +1,204 @@
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from django.db import connection
+
+# Süreç içi metrikler ve istek başına aşama süreleri
+# Boru hattı fonksiyonları timed_stage ile sarılır: her çağrının süresi hem süreç içi histograma
+# (/metrics uç noktasında Prometheus metin formatında yayınlanır) hem de o an işlenen isteğin
+# aşama listesine (ServerTimingMiddleware bunu Server-Timing başlığına yazar) eklenir.
+# Ölçüm maliyeti çağrı başına iki perf_counter okuması ve kilitli bir sayaç artışıdır.
+# Her süreç (web sunucusu worker'ları, palette_worker) kendi metriklerini tutar.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # saniye
+DIMENSION_BUCKETS = (256, 512, 1024, 2048, 3000, 4000, 6000, 8000, 12000)  # piksel
+K_BUCKETS = (2, 3, 4, 5, 6, 8, 10, 12, 16, 20)
+MEMORY_BUCKETS = tuple(2 ** power for power in range(20, 31))  # bayt, 1 MB - 1 GB
+
+_request_timings = ContextVar('palette_request_timings', default=None)
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f'{self.name}_total{format_labels(self.labelnames, key)} {format_value(value)}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, buckets, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+        self._values = {}  # etiketler -> [kova sayıları..., +Inf, toplam]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect_left(self.buckets, value)  # değerin düştüğü ilk kova (le sınırı dahil)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[index] += 1
+            counts[-1] += value
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            values = sorted((key, list(counts)) for key, counts in self._values.items())
+        for key, counts in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = '+Inf' if bound == float('inf') else format_value(bound)
+                labels = format_labels(self.labelnames + ('le',), key + (le,))
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            lines.append(f'{self.name}_sum{format_labels(self.labelnames, key)} {format_value(counts[-1])}')
+            lines.append(f'{self.name}_count{format_labels(self.labelnames, key)} {cumulative}')
+        return lines
+
+
+class Gauge:
+    """Değeri yayın anında bir fonksiyon çağrılarak okunan gösterge (ör. kuyruk derinliği)."""
+
+    def __init__(self, name, documentation, callback):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+
+    def collect(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} gauge']
+        try:
+            lines.append(f'{self.name} {format_value(self.callback())}')
+        except Exception:
+            pass  # değer okunamazsa (ör. veritabanı erişilemiyor) metrik boş yayınlanır
+        return lines
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for value in values)
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(names, escaped)) + '}'
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _queue_depth():
+    from .jobs import queue_depth  # jobs views'i içe aktarır, döngüsel içe aktarmayı önlemek için geç yüklenir
+    return queue_depth()
+
+
+STAGE_SECONDS = Histogram('palette_stage_seconds', 'Palet boru hattı aşamalarının süresi (saniye).',
+                          LATENCY_BUCKETS, ('stage',))
+IMAGE_WIDTH = Histogram('palette_image_width_pixels', 'İşlenen görsellerin özgün genişliği.', DIMENSION_BUCKETS)
+IMAGE_HEIGHT = Histogram('palette_image_height_pixels', 'İşlenen görsellerin özgün yüksekliği.', DIMENSION_BUCKETS)
+DECODE_MEMORY = Histogram('palette_decode_memory_bytes', 'Görsel çözmenin tahmini tepe belleği (bayt).',
+                          MEMORY_BUCKETS, ('mode',))
+K_VALUES = Histogram('palette_k', 'İstenen palet renk sayısı (k).', K_BUCKETS)
+CACHE_REQUESTS = Counter('palette_cache_requests', 'Palet sonuç önbelleği sorguları.', ('result',))
+JOBS = Counter('palette_jobs', 'Worker tarafından tamamlanan palet işleri.', ('status',))
+QUEUE_DEPTH = Gauge('palette_queue_depth', 'Kuyrukta bekleyen palet işi sayısı.', _queue_depth)
+
+REGISTRY = [STAGE_SECONDS, IMAGE_WIDTH, IMAGE_HEIGHT, DECODE_MEMORY, K_VALUES, CACHE_REQUESTS, JOBS, QUEUE_DEPTH]
+
+
+def record_stage(stage, seconds):
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds  # aynı aşama istekte birden çok kez çalışabilir
+
+
+@contextmanager
+def stage_timer(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def timed_stage(stage):
+    """Fonksiyonun her çağrısının süresini verilen aşama adıyla kaydeden dekoratör."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record_stage(stage, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def observe_image_size(width, height):
+    IMAGE_WIDTH.observe(width)
+    IMAGE_HEIGHT.observe(height)
+
+
+def start_request_timings():
+    """İstek için boş bir aşama sözlüğü başlatır; (sözlük, token) döndürür. token ile önceki durum geri yüklenir."""
+    timings = {}
+    return timings, _request_timings.set(timings)
+
+
+def finish_request_timings(token):
+    _request_timings.reset(token)
+
+
+def render_metrics():
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        try:
+            body = render_metrics().encode('utf-8')
+        finally:
+            connection.close()  # her istek yeni bir iş parçacığında çalışır, kuyruk sorgusunun bağlantısı kapatılır
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # her Prometheus taraması için log satırı yazılmaz
+
+
+def serve_metrics(port, address=''):
+    """
+    Metrikleri Django dışında, arka planda çalışan küçük bir HTTP sunucusuyla yayınlar
+    (palette_worker --metrics-port). Sunucu nesnesini döndürür.
+    """
+    server = ThreadingHTTPServer((address, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='palette-metrics', daemon=True).start()
+    return server
@@ -0,0 +1,67 @@
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+from .metrics import finish_request_timings, record_stage, start_request_timings
+
+
+class ServerTimingMiddleware:
+    """
+    İstek sırasında çalışan boru hattı aşamalarının (timed_stage) ve veritabanı sorgularının
+    sürelerini Server-Timing başlığına yazar, ör.:
+        Server-Timing: decode;dur=12.4, quantize;dur=80.1, db;dur=3.2;desc="5 sorgu", total;dur=101.7
+    Tarayıcının geliştirici araçları bu başlığı istek zaman çizelgesinde gösterir.
+    SERVER_TIMING_ENABLED=False ise başlık yazılmaz, metrikler yine toplanır.
+    Async zincirde (ASGI) de çalışır; orada ORM sorguları ayrı iş parçacıklarında çalıştığı için db süresi yazılmaz.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings, token = start_request_timings()
+        queries = [0]
+
+        def time_query(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                record_stage('db', time.perf_counter() - start)
+
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(time_query):
+                response = self.get_response(request)
+        finally:
+            finish_request_timings(token)
+        return self.add_header(response, timings, start, queries[0])
+
+    async def __acall__(self, request):
+        timings, token = start_request_timings()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            finish_request_timings(token)
+        return self.add_header(response, timings, start)
+
+    def add_header(self, response, timings, start, query_count=None):
+        if getattr(settings, 'SERVER_TIMING_ENABLED', True):
+            entries = []
+            for stage, seconds in timings.items():
+                entry = f'{stage};dur={seconds * 1000:.1f}'
+                if stage == 'db' and query_count is not None:
+                    entry += f';desc="{query_count} sorgu"'
+                entries.append(entry)
+            entries.append(f'total;dur={(time.perf_counter() - start) * 1000:.1f}')
+            response['Server-Timing'] = ', '.join(entries)
+        return response
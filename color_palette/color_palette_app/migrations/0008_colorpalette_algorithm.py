@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('color_palette_app', '0007_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='colorpalette',
+            name='algorithm',
+            field=models.CharField(default='kmeans', max_length=32),
+        ),
+    ]
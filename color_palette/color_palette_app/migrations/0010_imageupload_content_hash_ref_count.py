@@ -0,0 +1,31 @@
+from django.db import migrations, models
+
+
+def count_palette_references(apps, schema_editor):
+    # mevcut görsellerin referans sayısını bağlı palet sayısından hesapla
+    ImageUpload = apps.get_model('color_palette_app', 'ImageUpload')
+    ColorPalette = apps.get_model('color_palette_app', 'ColorPalette')
+    counts = ColorPalette.objects.values('image_id').annotate(total=models.Count('id'))
+    for row in counts.iterator():
+        ImageUpload.objects.filter(id=row['image_id']).update(ref_count=row['total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('color_palette_app', '0009_palettejob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imageupload',
+            name='content_hash',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='imageupload',
+            name='ref_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_palette_references, migrations.RunPython.noop),
+    ]
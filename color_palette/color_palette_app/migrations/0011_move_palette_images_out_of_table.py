@@ -0,0 +1,37 @@
+import base64
+import binascii
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+def move_base64_palettes_to_storage(apps, schema_editor):
+    """
+    palette_image sütununda base64 metni olarak saklanan palet görsellerini palettes/ klasörüne
+    dosya olarak yazar ve sütunda yalnızca dosya yolunu bırakır.
+    """
+    ColorPalette = apps.get_model('color_palette_app', 'ColorPalette')
+    rows = ColorPalette.objects.exclude(palette_image='').exclude(palette_image__startswith='palettes/')
+    for palette_id, value in rows.values_list('id', 'palette_image').iterator():
+        try:
+            content = base64.b64decode(value, validate=True)
+        except (binascii.Error, ValueError):
+            continue  # base64 değil, dokunma
+        name = default_storage.save(f'palettes/palette_{palette_id}.png', ContentFile(content))
+        ColorPalette.objects.filter(id=palette_id).update(palette_image=name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('color_palette_app', '0010_imageupload_content_hash_ref_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='colorpalette',
+            name='palette_image',
+            field=models.ImageField(blank=True, upload_to='palettes/'),
+        ),
+        migrations.RunPython(move_base64_palettes_to_storage, migrations.RunPython.noop),
+    ]
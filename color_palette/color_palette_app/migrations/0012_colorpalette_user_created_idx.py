@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('color_palette_app', '0011_move_palette_images_out_of_table'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='colorpalette',
+            index=models.Index(fields=['user', 'created_at'], name='colorpalette_user_created_idx'),
+        ),
+    ]
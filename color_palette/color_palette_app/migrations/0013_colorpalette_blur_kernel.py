@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+def copy_job_blur_kernels(apps, schema_editor):
+    # kuyruktan üretilen paletlerin blur değeri işlerinden alınır, diğerleri varsayılan 5'te kalır
+    ColorPalette = apps.get_model('color_palette_app', 'ColorPalette')
+    PaletteJob = apps.get_model('color_palette_app', 'PaletteJob')
+    jobs = PaletteJob.objects.filter(palette__isnull=False).exclude(blur_kernel=5)
+    for row in jobs.values('palette_id', 'blur_kernel').iterator():
+        ColorPalette.objects.filter(id=row['palette_id']).update(blur_kernel=row['blur_kernel'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('color_palette_app', '0012_colorpalette_user_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='colorpalette',
+            name='blur_kernel',
+            field=models.IntegerField(default=5),
+        ),
+        migrations.RunPython(copy_job_blur_kernels, migrations.RunPython.noop),
+    ]
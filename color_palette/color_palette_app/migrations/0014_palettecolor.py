@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+LAB_BIN_SIZE = 8  # palette_colors.LAB_BIN_SIZE ile aynı (migration uygulama kodundan bağımsız kalsın diye kopyalandı)
+
+
+def rgb_to_lab(red, green, blue):
+    # palette_colors.rgb_to_lab'ın kopyası: sRGB -> CIELAB (D65)
+    def linear(channel):
+        channel /= 255.0
+        return channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4
+
+    r, g, b = linear(red), linear(green), linear(blue)
+    xyz = (
+        (0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / 0.95047,
+        0.2126729 * r + 0.7151522 * g + 0.0721750 * b,
+        (0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / 1.08883,
+    )
+    fx, fy, fz = (t ** (1 / 3) if t > 216 / 24389 else (24389 / 27 * t + 16) / 116 for t in xyz)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def fill_palette_colors(apps, schema_editor):
+    # mevcut paletlerin rgb_codes metninden renk satırları üretilir; küme ağırlıkları bilinmediği için share boş kalır
+    ColorPalette = apps.get_model('color_palette_app', 'ColorPalette')
+    PaletteColor = apps.get_model('color_palette_app', 'PaletteColor')
+    rows = []
+    for palette_id, rgb_codes in ColorPalette.objects.values_list('id', 'rgb_codes').iterator():
+        codes = [code.strip().lstrip('#') for code in (rgb_codes or '').split('|')]
+        for position, code in enumerate(code for code in codes if len(code) == 6):
+            red, green, blue = (int(code[i:i + 2], 16) for i in (0, 2, 4))
+            lab_l, lab_a, lab_b = rgb_to_lab(red, green, blue)
+            rows.append(PaletteColor(
+                palette_id=palette_id, position=position, red=red, green=green, blue=blue,
+                lab_l=lab_l, lab_a=lab_a, lab_b=lab_b, l_bin=int(lab_l // LAB_BIN_SIZE),
+                a_bin=int(lab_a // LAB_BIN_SIZE), b_bin=int(lab_b // LAB_BIN_SIZE),
+            ))
+        if len(rows) >= 1000:
+            PaletteColor.objects.bulk_create(rows)
+            rows = []
+    PaletteColor.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('color_palette_app', '0013_colorpalette_blur_kernel'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaletteColor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('red', models.PositiveSmallIntegerField()),
+                ('green', models.PositiveSmallIntegerField()),
+                ('blue', models.PositiveSmallIntegerField()),
+                ('lab_l', models.FloatField()),
+                ('lab_a', models.FloatField()),
+                ('lab_b', models.FloatField()),
+                ('l_bin', models.SmallIntegerField()),
+                ('a_bin', models.SmallIntegerField()),
+                ('b_bin', models.SmallIntegerField()),
+                ('share', models.FloatField(blank=True, null=True)),
+                ('palette', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='colors', to='color_palette_app.colorpalette')),
+            ],
+            options={
+                'ordering': ['position'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='palettecolor',
+            index=models.Index(fields=['l_bin', 'a_bin', 'b_bin'], name='palettecolor_lab_bin_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='palettecolor',
+            constraint=models.UniqueConstraint(fields=('palette', 'position'), name='palettecolor_palette_position_uniq'),
+        ),
+        migrations.RunPython(fill_palette_colors, migrations.RunPython.noop),
+    ]
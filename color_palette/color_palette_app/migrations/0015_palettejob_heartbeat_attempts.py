@@ -0,0 +1,21 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('color_palette_app', '0014_palettecolor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='palettejob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='palettejob',
+            name='attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
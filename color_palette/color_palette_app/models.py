@@ -1,5 +1,17 @@
+import hashlib
 from django.db import models
 from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+# quantizers.QUANTIZERS'daki palet algoritmalarının adları; görünümler bu listeyi görüntü işleme
+# modüllerini (numpy, scikit-learn) yüklemeden kullanır. İlk eleman varsayılan algoritmadır.
+PALETTE_ALGORITHMS = ('kmeans', 'median_cut', 'octree')
+# palette_compare.py'deki palet uzaklıkları (ilk eleman varsayılan): Sinkhorn EMD ve en yakın renk ortalaması
+PALETTE_METRICS = ('emd', 'nearest')
+
+def palette_image_etag(rgb_codes, image_format): # palet görselinin içeriğini belirleyen değerlerden türetilen ETag
+    return hashlib.sha256(f'{image_format}:{rgb_codes}'.encode()).hexdigest()[:32]
 
 class BaseModel(models.Model):  # basemodel sınıfı: diğer modeller için ortak alanları tanımlar
     created_at = models.DateTimeField(auto_now_add=True)  # modelin oluşturulma zamanını otomatik kaydeder
@@ -11,6 +23,8 @@ class BaseModel(models.Model):  # basemodel sınıfı: diğer modeller için ort
 # imageupload modeli: resim yüklemek için kullanılan model
 class ImageUpload(BaseModel):
     image = models.ImageField(upload_to='uploads/') # yüklenen resmin depolanacağı klasör
+    content_hash = models.CharField(max_length=64, unique=True, null=True, blank=True) # dosya içeriğinin sha256 özeti, aynı dosya ikinci kez saklanmaz
+    ref_count = models.PositiveIntegerField(default=0) # bu görsele bağlı ColorPalette sayısı, 0'a düşünce görsel ve dosyası silinir
 
     def __str__(self):
         return f"Image {self.id} uploaded at {self.created_at}"
@@ -19,9 +33,91 @@ class ImageUpload(BaseModel):
 class ColorPalette(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE) # kullanıcıyla ilişki kurar, kullanıcı silinirse renk paleti de silinir
     image = models.ForeignKey(ImageUpload, on_delete=models.CASCADE) # imageupload ile ilişki kurar, resim silinirse palet de silinir
-    palette_image = models.ImageField(upload_to='palettes/') # oluşturulan renk paletinin saklanacağı klasör
+    palette_image = models.ImageField(upload_to='palettes/', blank=True) # eski paletlerin görsel dosyası; yeni paletlerin görseli palette_image_view ile rgb_codes'tan üretilir
     rgb_codes = models.TextField(blank=True)  # renk kodlarını saklamak için metin alanı (json string olarak kullanılabilir)
     k_value = models.IntegerField(default=5) # k-means algoritması için küme sayısını saklar eğer hiç bir değer girilmezse default olarak 5 girilir
+    algorithm = models.CharField(max_length=32, default='kmeans') # paleti üreten nicemleme algoritmasının adı (bkz. quantizers.py)
+    blur_kernel = models.IntegerField(default=5) # paletin çıkarıldığı gaussian blur çekirdeği; düzenlemede aynı bulanıklık kullanılır
+
+    class Meta:
+        indexes = [models.Index(fields=['user', 'created_at'], name='colorpalette_user_created_idx')] # ana sayfadaki sayfalama için
 
     def __str__(self):
         return f"Palette for Image {self.image.id} created by {self.user.username}"
+
+    @cached_property
+    def rgb_colors(self):
+        # colors önceden yüklendiyse (prefetch_related) renk tablosu kullanılır; yoksa ya da palet renk
+        # satırları olmadan oluşturulduysa hex kodları yalnızca erişildiğinde ayrıştırılır
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('colors')
+        if prefetched:
+            return [color.hex for color in prefetched]
+        return self.rgb_codes.split('|') if self.rgb_codes else []
+
+    @property
+    def palette_image_version(self): # rgb kodları değişince değişen sürüm (palet görseli url'sinin ?v= parametresi)
+        return palette_image_etag(self.rgb_codes, 'png')
+
+    @property
+    def palette_image_url(self):
+        return f"{reverse('palette_image', args=[self.id, 'png'])}?v={self.palette_image_version}"
+
+# palettecolor modeli: paletin her rengi için ayrı bir satır (rgb_codes'un veritabanında sorgulanabilir hali)
+class PaletteColor(models.Model):
+    palette = models.ForeignKey(ColorPalette, on_delete=models.CASCADE, related_name='colors')
+    position = models.PositiveSmallIntegerField() # rgb_codes içindeki sırası
+    red = models.PositiveSmallIntegerField()
+    green = models.PositiveSmallIntegerField()
+    blue = models.PositiveSmallIntegerField()
+    lab_l = models.FloatField() # CIELAB (D65) bileşenleri: L 0-100, a/b yaklaşık -128..127
+    lab_a = models.FloatField()
+    lab_b = models.FloatField()
+    l_bin = models.SmallIntegerField() # LAB_BIN_SIZE birimlik kutulara nicemlenmiş LAB, renk aralığı sorguları indeksi kullanır
+    a_bin = models.SmallIntegerField()
+    b_bin = models.SmallIntegerField()
+    share = models.FloatField(null=True, blank=True) # renge düşen piksel oranı; ağırlığı bilinmeyen eski paletlerde boş
+
+    class Meta:
+        ordering = ['position']
+        constraints = [models.UniqueConstraint(fields=['palette', 'position'], name='palettecolor_palette_position_uniq')]
+        indexes = [models.Index(fields=['l_bin', 'a_bin', 'b_bin'], name='palettecolor_lab_bin_idx')]
+
+    def __str__(self):
+        return f"{self.hex} ({self.position}) in Palette {self.palette_id}"
+
+    @property
+    def hex(self):
+        return f'#{self.red:02x}{self.green:02x}{self.blue:02x}'
+
+# palettejob modeli: process_image tarafından kuyruğa eklenen ve palette_worker komutu tarafından işlenen palet işleri
+class PaletteJob(BaseModel):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE) # işi başlatan kullanıcı
+    image = models.ForeignKey(ImageUpload, on_delete=models.CASCADE) # işlenecek görsel
+    k_value = models.IntegerField(default=5)
+    blur_kernel = models.IntegerField(default=5)
+    algorithm = models.CharField(max_length=32, default='kmeans')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    palette = models.ForeignKey(ColorPalette, null=True, blank=True, on_delete=models.SET_NULL) # iş bitince oluşan palet
+    error = models.TextField(blank=True) # iş başarısız olursa hata mesajı
+    worker = models.CharField(max_length=100, blank=True) # işi üstlenen worker süreci
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True) # çalışan worker'ın son yoklaması, süresi geçerse iş yeniden kuyruğa alınır
+    attempts = models.PositiveIntegerField(default=0) # işin kaç kez üstlenildiği
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created_at'], name='palettejob_status_created_idx')] # kuyruktan en eski işi hızlı bulmak için
+
+    def __str__(self):
+        return f"Job {self.id} ({self.status}) for Image {self.image_id}"
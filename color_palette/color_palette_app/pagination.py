@@ -0,0 +1,38 @@
+import base64
+from datetime import datetime
+from django.db.models import Q
+
+# (created_at, id) üzerinde anahtar kümesi (keyset/cursor) sayfalama.
+# OFFSET kullanılmaz: her sayfa, bir önceki sayfanın son kaydından daha eski kayıtları
+# (user, created_at) indeksini kullanarak okur; sayfa numarası büyüdükçe sorgu yavaşlamaz.
+
+
+def encode_cursor(created_at, pk):
+    return base64.urlsafe_b64encode(f'{created_at.isoformat()}|{pk}'.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """encode_cursor'ın ürettiği metni (created_at, id) çiftine çevirir; geçersizse ValueError fırlatır."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        created_at, pk = raw.rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError('Geçersiz sayfa imleci.') from e
+
+
+def keyset_page(queryset, cursor=None, page_size=24):
+    """
+    queryset'i en yeniden eskiye (created_at, id) sırasıyla sayfalar.
+    Dönüş: (bu sayfanın kayıtları, sonraki sayfanın imleci ya da None).
+    """
+    queryset = queryset.order_by('-created_at', '-id')
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+    items = list(queryset[:page_size + 1])  # bir fazla kayıt, sonraki sayfanın olup olmadığını gösterir
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].pk)
+    return items, next_cursor
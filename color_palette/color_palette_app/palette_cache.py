@@ -0,0 +1,264 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+# İçerik adresli palet sonuç önbelleği
+# Anahtar: (görsel içerik özeti, k, blur kernel, çalışma boyutu, algoritma ve sürümü).
+# Değer: LAB merkezleri, küme ağırlıkları ve hex kodları (palet görseli rgb kodlarından üretilir).
+# Önbellekte bulunan sonuçlar için kümeleme hiç çalıştırılmaz.
+
+PIPELINE_VERSION = 2  # boru hattının çıktısını değiştiren her değişiklikte artırılmalı (eski kayıtlar geçersizleşir)
+
+
+def image_digest(data):
+    """Görsel baytlarının sha256 özeti (hex)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def palette_cache_key(digest, k, blur_kernel, size, algorithm):
+    return f'palette:v{PIPELINE_VERSION}:{algorithm}:{digest}:k{k}:b{blur_kernel}:{size[0]}x{size[1]}'
+
+
+def palette_sweep_key(digest, k, k_start, blur_kernel, size, algorithm):
+    # çoklu k taramasındaki sonuç zincirin başladığı k'ya bağlıdır (her k bir öncekinden sıcak başlar)
+    return palette_cache_key(digest, k, blur_kernel, size, f'{algorithm}:sweep{k_start}')
+
+
+def lab_histogram_key(digest, blur_kernel, size):
+    # palet düzenlemede yeniden kullanılan ön işlenmiş LAB histogramı; k ve algoritmadan bağımsızdır
+    return f'histogram:v{PIPELINE_VERSION}:{digest}:b{blur_kernel}:{size[0]}x{size[1]}'
+
+
+class CacheStats:
+    """Süreç içi isabet/ıska sayaçları (izleme için)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'hit_ratio': self.hits / total if total else 0.0}
+
+
+class DjangoCacheBackend:
+    """
+    Django önbellek çerçevesi üzerinden çalışır. Boyut sınırı ve LRU tahliyesi yapılandırılan
+    önbelleğe aittir (LocMemCache MAX_ENTRIES ile LRU tahliye yapar).
+    """
+
+    def __init__(self, alias='default', timeout=None):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key):
+        return self.cache.get(key)
+
+    def set(self, key, value):
+        self.cache.set(key, value, self.timeout)
+
+    def clear(self):
+        self.cache.clear()
+
+
+class DiskCacheBackend:
+    """
+    Yerel diskte json dosyaları olarak saklayan LRU önbellek. Okunan kaydın erişim zamanı
+    güncellenir; toplam boyut max_bytes'ı ya da kayıt sayısı max_entries'i aşınca en uzun
+    süredir kullanılmayan kayıtlar silinir.
+    Toplam boyut ve kayıt sayısı bellekte tutulur; yazma yalnızca kendi dosyasını stat eder. Dizin yalnızca sınır
+    aşılınca ya da (aynı dizine yazan diğer süreçler için sayaçları düzeltmek üzere) her SWEEP_INTERVAL yazmada bir
+    taranır. Tahliye sınırların %90'ına kadar iner, böylece tarama her yazmada değil arada bir yapılır.
+    """
+
+    SWEEP_INTERVAL = 1000  # sınır aşılmasa da dizinin yeniden tarandığı yazma sayısı
+    TEMP_MAX_AGE = 600  # bundan eski (saniye) geçici dosyaların yazması yarıda kalmıştır, taramada silinir
+
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024, max_entries=10000):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._total_bytes, self._entries = 0, 0
+        self._writes = 0  # son taramadan beri yazılan kayıt
+        self._sweep(self.max_bytes, self.max_entries)
+
+    def _path(self, key):
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest() + '.json')
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path) as file:
+                value = json.load(file)
+            os.utime(path)  # LRU: son erişim zamanını güncelle
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            with open(temp_path, 'w') as file:
+                json.dump(value, file)
+                size = file.tell()
+            try:
+                replaced = os.stat(path).st_size
+            except OSError:
+                replaced = None
+            os.replace(temp_path, path)  # yarım yazılmış kayıt okunmasın
+        except BaseException:
+            # disk dolu ya da değer json'a çevrilemedi: geçici dosya dizinde kalıp sınırların dışında yer kaplamasın
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+            raise
+        with self._lock:
+            self._total_bytes += size - (replaced or 0)
+            self._entries += replaced is None
+            self._writes += 1
+            over_limit = self._total_bytes > self.max_bytes or self._entries > self.max_entries
+            if over_limit or self._writes >= self.SWEEP_INTERVAL:
+                self._sweep(self.max_bytes - self.max_bytes // 10, self.max_entries - self.max_entries // 10)
+
+    def _sweep(self, target_bytes, target_entries):
+        # dizini tarar, sayaçları düzeltir; sınır aşılmışsa en eski kayıtları hedeflerin altına inene kadar siler.
+        # Yazan süreç çöktüğü için kalmış eski geçici dosyalar da silinir
+        entries = []
+        stale_before = time.time() - self.TEMP_MAX_AGE
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.tmp'):
+                try:
+                    if entry.stat().st_mtime < stale_before:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+            elif entry.name.endswith('.json'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes or len(entries) > self.max_entries:
+            entries.sort()
+            evict = 0
+            while evict < len(entries) and (total > target_bytes or len(entries) - evict > target_entries):
+                _, size, path = entries[evict]
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+                evict += 1
+            entries = entries[evict:]
+        self._total_bytes, self._entries, self._writes = total, len(entries), 0
+
+    def clear(self):
+        with self._lock:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.json'):
+                    os.remove(entry.path)
+            self._total_bytes, self._entries, self._writes = 0, 0, 0
+
+
+class PaletteCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = CacheStats()
+
+    def get(self, key):
+        value = self.backend.get(key)
+        self.stats.record(value is not None)
+        return value
+
+    def set(self, key, result):
+        # numpy dizileri json/pickle uyumlu listelere çevrilir
+        value = {
+            'centroids_lab': [list(map(float, c)) for c in result['centroids_lab']],
+            'weights': [float(w) for w in result['weights']],
+            'rgb_codes': list(result['rgb_codes']),
+        }
+        for score in ('inertia', 'silhouette'):  # çoklu k taramasının skorları
+            if score in result:
+                value[score] = None if result[score] is None else float(result[score])
+        self.backend.set(key, value)
+
+    def get_histogram(self, key):
+        """Önbellekteki LAB histogramını (colors, counts) numpy dizileri olarak döndürür; yoksa None."""
+        import numpy as np # numpy yalnızca görüntü işleme modülüyle birlikte yüklenir
+
+        value = self.get(key)
+        if value is None:
+            return None
+        colors = np.frombuffer(base64.b64decode(value['colors']), dtype='<f4').astype(np.float64).reshape((-1, 3))
+        counts = np.frombuffer(base64.b64decode(value['counts']), dtype='<i4').astype(np.int64)
+        return colors, counts
+
+    def set_histogram(self, key, histogram):
+        # binlerce kutu json listesi yerine float32/int32 baytları olarak (base64) saklanır, kayıt küçük kalır
+        colors, counts = histogram
+        self.backend.set(key, {
+            'colors': base64.b64encode(colors.astype('<f4').tobytes()).decode('ascii'),
+            'counts': base64.b64encode(counts.astype('<i4').tobytes()).decode('ascii'),
+        })
+
+    def clear(self):
+        self.backend.clear()
+
+
+_palette_cache = None
+_palette_cache_lock = threading.Lock()
+
+
+def build_backend(config):
+    backend = config.get('BACKEND', 'django')
+    if backend == 'django':
+        return DjangoCacheBackend(config.get('ALIAS', 'default'), config.get('TIMEOUT'))
+    if backend == 'disk':
+        return DiskCacheBackend(
+            config.get('DIRECTORY', os.path.join(settings.BASE_DIR, 'palette_cache')),
+            max_bytes=config.get('MAX_BYTES', 64 * 1024 * 1024),
+            max_entries=config.get('MAX_ENTRIES', 10000),
+        )
+    raise ValueError(f'Bilinmeyen palet önbelleği arka ucu: {backend}')
+
+
+def get_palette_cache():
+    """settings.PALETTE_CACHE yapılandırmasına göre süreç genelinde tek bir PaletteCache döndürür."""
+    global _palette_cache
+    with _palette_cache_lock:
+        if _palette_cache is None:
+            _palette_cache = PaletteCache(build_backend(getattr(settings, 'PALETTE_CACHE', {})))
+        return _palette_cache
+
+
+def reset_palette_cache():
+    global _palette_cache
+    with _palette_cache_lock:
+        _palette_cache = None
+
+
+@receiver(setting_changed)
+def _reset_on_settings_change(setting, **kwargs): # testlerde override_settings ile yapılandırma değişince
+    if setting in ('PALETTE_CACHE', 'CACHES'):
+        reset_palette_cache()
@@ -0,0 +1,78 @@
+from django.db import transaction
+from .models import PaletteColor
+
+# Palet renk tablosu (PaletteColor): rgb_codes ile birlikte yazılan, her renk için bir satır.
+# LAB dönüşümü saf Python'dadır (birkaç renk için numpy/OpenCV yüklemeye değmez); görünümler ve
+# management komutları görüntü işleme modülünü yüklemeden renk satırı yazabilir ve sorgulayabilir.
+
+LAB_BIN_SIZE = 8  # l_bin/a_bin/b_bin kutu genişliği (CIELAB birimi)
+
+_WHITE_D65 = (0.95047, 1.0, 1.08883)
+
+
+def hex_to_rgb(code):
+    code = code.strip().lstrip('#')
+    return tuple(int(code[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def rgb_to_lab(red, green, blue):
+    """8 bitlik sRGB rengini CIELAB'a (D65 beyaz noktası) çevirir: (L, a, b)."""
+    def linear(channel):
+        channel /= 255.0
+        return channel / 12.92 if channel <= 0.04045 else ((channel + 0.055) / 1.055) ** 2.4
+
+    r, g, b = linear(red), linear(green), linear(blue)
+    xyz = (
+        (0.4124564 * r + 0.3575761 * g + 0.1804375 * b) / _WHITE_D65[0],
+        (0.2126729 * r + 0.7151522 * g + 0.0721750 * b) / _WHITE_D65[1],
+        (0.0193339 * r + 0.1191920 * g + 0.9503041 * b) / _WHITE_D65[2],
+    )
+    fx, fy, fz = (t ** (1 / 3) if t > 216 / 24389 else (24389 / 27 * t + 16) / 116 for t in xyz)
+    return 116 * fy - 16, 500 * (fx - fy), 200 * (fy - fz)
+
+
+def lab_bin(value):
+    return int(value // LAB_BIN_SIZE)
+
+
+def palette_color_rows(palette_id, rgb_codes, weights=None):
+    """Bir paletin hex kodları (ve varsa küme ağırlıkları) için kaydedilmemiş PaletteColor nesneleri."""
+    rows = []
+    for position, code in enumerate(rgb_codes):
+        red, green, blue = hex_to_rgb(code)
+        lab_l, lab_a, lab_b = rgb_to_lab(red, green, blue)
+        rows.append(PaletteColor(
+            palette_id=palette_id, position=position, red=red, green=green, blue=blue,
+            lab_l=lab_l, lab_a=lab_a, lab_b=lab_b, l_bin=lab_bin(lab_l), a_bin=lab_bin(lab_a), b_bin=lab_bin(lab_b),
+            share=None if weights is None else float(weights[position]),
+        ))
+    return rows
+
+
+def replace_palette_colors(entries):
+    """
+    (palet id, hex kodları listesi, ağırlıklar ya da None) üçlüleri için paletlerin renk satırlarını yeniden yazar.
+    Eski satırlar tek sorguyla silinir, yeniler tek bulk_create ile eklenir.
+    """
+    entries = list(entries)
+    with transaction.atomic():
+        PaletteColor.objects.filter(palette_id__in=[palette_id for palette_id, _, _ in entries]).delete()
+        PaletteColor.objects.bulk_create([
+            row for palette_id, rgb_codes, weights in entries for row in palette_color_rows(palette_id, rgb_codes, weights)
+        ])
+
+
+def colors_near(lab, radius):
+    """
+    CIELAB'da lab merkezli, kenarı 2 x radius olan kutudaki renkler. Önce nicemlenmiş kutular (indeksli),
+    sonra gerçek bileşenler filtrelenir. Delta E ile sıralama/eleme çağırana kalır.
+    """
+    lab_l, lab_a, lab_b = lab
+    return PaletteColor.objects.filter(
+        l_bin__range=(lab_bin(lab_l - radius), lab_bin(lab_l + radius)),
+        a_bin__range=(lab_bin(lab_a - radius), lab_bin(lab_a + radius)),
+        b_bin__range=(lab_bin(lab_b - radius), lab_bin(lab_b + radius)),
+        lab_l__range=(lab_l - radius, lab_l + radius),
+        lab_a__range=(lab_a - radius, lab_a + radius),
+        lab_b__range=(lab_b - radius, lab_b + radius),
+    )
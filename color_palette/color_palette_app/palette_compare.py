@@ -0,0 +1,144 @@
+import numpy as np
+from django.conf import settings
+from .metrics import stage_timer
+from .models import PALETTE_METRICS, PaletteColor
+
+# Palet karşılaştırma: bir paleti kullanıcının diğer tüm paletleriyle tek seferde karşılaştırır.
+# Kullanıcının renk satırları (PaletteColor) tek sorguda (P, K, 3) CIELAB dizisine ve (P, K) piksel payı dizisine
+# yüklenir; K en büyük palet boyudur, kısa paletlerin boş yerlerinin payı 0'dır. Renk uzaklıkları CIEDE2000 ile
+# bütün paletler için birden, palet uzaklıkları da Python döngüsü olmadan dizi işlemleriyle hesaplanır.
+
+SINKHORN_EPSILON = 1.0  # Delta E biriminde entropi düzenlemesi; küçüldükçe sonuç gerçek EMD'ye yaklaşır, yakınsama yavaşlar
+SINKHORN_ITERATIONS = 1000  # en fazla iterasyon; paletlerin çoğu birkaç on iterasyonda yakınsar
+SINKHORN_TOLERANCE = 1e-3  # taşınamayan toplam pay
+
+
+def load_palette_matrix(user_id):
+    """
+    Kullanıcının paletlerini diziye yükler: (palet id'leri (P,), CIELAB renkler (P, K, 3), piksel payları (P, K)).
+    Payı bilinmeyen (share NULL) paletlerin renkleri eşit ağırlıklıdır; paylar her palette 1'e normalize edilir.
+    K en fazla PALETTE_MAX_K'dır: sınır konmadan önce kaydedilmiş daha büyük paletlerin yalnızca ilk renkleri kullanılır.
+    """
+    max_k = getattr(settings, 'PALETTE_MAX_K', 20)
+    rows = (PaletteColor.objects.filter(palette__user_id=user_id, position__lt=max_k)
+            .values_list('palette_id', 'position', 'lab_l', 'lab_a', 'lab_b', 'share'))
+    data = np.array([row[:5] + (np.nan if row[5] is None else row[5],) for row in rows.iterator(chunk_size=10000)],
+                    dtype=np.float64).reshape((-1, 6))
+    palette_ids, rows_palette = np.unique(data[:, 0].astype(np.int64), return_inverse=True)
+    positions = data[:, 1].astype(np.int64)
+    size = int(positions.max()) + 1 if len(positions) else 0
+    labs = np.zeros((len(palette_ids), size, 3))
+    labs[rows_palette, positions] = data[:, 2:5]
+    weights = np.zeros((len(palette_ids), size))
+    weights[rows_palette, positions] = data[:, 5]
+
+    present = np.zeros(weights.shape, dtype=bool)
+    present[rows_palette, positions] = True
+    unknown = np.isnan(weights).any(axis=1)
+    weights[unknown] = present[unknown]
+    totals = weights.sum(axis=1, keepdims=True)
+    weights = np.divide(weights, totals, out=present / np.maximum(present.sum(axis=1, keepdims=True), 1), where=totals > 0)
+    return palette_ids, labs, weights
+
+
+def ciede2000(lab1, lab2):
+    """İki CIELAB renk dizisi arasındaki CIEDE2000 farkı (kL = kC = kH = 1); diziler numpy kurallarıyla yayınlanır."""
+    lab1, lab2 = np.asarray(lab1, dtype=np.float64), np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_mean = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25.0 ** 7)))
+    a1, a2 = a1 * (1 + g), a2 * (1 + g)
+    c1, c2 = np.hypot(a1, b1), np.hypot(a2, b2)
+    h1 = np.degrees(np.arctan2(b1, a1)) % 360
+    h2 = np.degrees(np.arctan2(b2, a2)) % 360
+
+    delta_l = L2 - L1
+    delta_c = c2 - c1
+    chroma_product = c1 * c2
+    delta_h = h2 - h1
+    delta_h = np.where(delta_h > 180, delta_h - 360, np.where(delta_h < -180, delta_h + 360, delta_h))
+    delta_h = np.where(chroma_product == 0, 0.0, delta_h)
+    delta_big_h = 2 * np.sqrt(chroma_product) * np.sin(np.radians(delta_h) / 2)
+
+    l_mean = (L1 + L2) / 2
+    c_mean = (c1 + c2) / 2
+    h_sum = h1 + h2
+    h_mean = np.where(np.abs(h1 - h2) > 180, np.where(h_sum < 360, h_sum + 360, h_sum - 360), h_sum) / 2
+    h_mean = np.where(chroma_product == 0, h_sum, h_mean)
+
+    t = (1 - 0.17 * np.cos(np.radians(h_mean - 30)) + 0.24 * np.cos(np.radians(2 * h_mean))
+         + 0.32 * np.cos(np.radians(3 * h_mean + 6)) - 0.20 * np.cos(np.radians(4 * h_mean - 63)))
+    s_l = 1 + 0.015 * (l_mean - 50) ** 2 / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * c_mean
+    s_h = 1 + 0.015 * c_mean * t
+    r_t = (-2 * np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25.0 ** 7))
+           * np.sin(np.radians(60 * np.exp(-(((h_mean - 275) / 25) ** 2)))))
+    return np.sqrt((delta_l / s_l) ** 2 + (delta_c / s_c) ** 2 + (delta_big_h / s_h) ** 2
+                   + r_t * (delta_c / s_c) * (delta_big_h / s_h))
+
+
+def nearest_distance(distances, query_weights, weights):
+    """
+    Her renk için diğer paletteki en yakın rengin uzaklığı, piksel paylarıyla ağırlıklı ortalanır; iki yönün ortalaması.
+    distances: (P, Kq, K) renk uzaklıkları. Payı 0 olan (boş) yerler en yakın renk olarak seçilmez.
+    """
+    forward = np.where(weights[:, None, :] > 0, distances, np.inf).min(axis=2)
+    backward = np.where(query_weights[None, :, None] > 0, distances, np.inf).min(axis=1)
+    backward = np.where(weights > 0, backward, 0.0)
+    return ((forward * query_weights).sum(axis=1) + (backward * weights).sum(axis=1)) / 2
+
+
+def sinkhorn_distance(distances, query_weights, weights, epsilon=SINKHORN_EPSILON, iterations=SINKHORN_ITERATIONS,
+                      tolerance=SINKHORN_TOLERANCE):
+    """
+    Earth Mover's Distance'ın entropi düzenlemeli yaklaşığı (Sinkhorn): sorgu paletinin piksel paylarını diğer paletin
+    paylarına taşımanın en düşük ortalama CIEDE2000 maliyeti. Bütün paletler (P, Kq, K) dizileri üzerinde birlikte
+    yinelenir; her 10 iterasyonda payları tolerance içinde taşınan paletler diziden çıkarılır, yalnızca yakınsamayanlar devam eder.
+    """
+    kernel = np.exp(-distances / epsilon)
+    u = np.ones(distances.shape[:2])
+    v = np.ones(distances.shape[::2])
+    active = np.arange(len(distances))
+    for _ in range(0, iterations, 10):
+        active_kernel, active_weights, active_v = kernel[active], weights[active], v[active]
+        for _ in range(10):
+            active_u = query_weights / np.maximum(np.einsum('pqk,pk->pq', active_kernel, active_v), 1e-300)
+            active_v = active_weights / np.maximum(np.einsum('pqk,pq->pk', active_kernel, active_u), 1e-300)
+        u[active], v[active] = active_u, active_v
+        # v güncellemesinden sonra sütun payları tamdır, satır paylarının sapmasına bakılır
+        error = np.abs(np.einsum('pqk,pk->pq', active_kernel, active_v) * active_u - query_weights).sum(axis=1)
+        active = active[error > tolerance]
+        if not len(active):
+            break
+    return np.einsum('pq,pqk,pk->p', u, kernel * distances, v)
+
+
+def palette_distances(query_labs, query_weights, labs, weights, metric='emd'):
+    """Bir paletin (Kq, 3) renklerinin ve paylarının (P, K, 3) paletlere uzaklıkları (P,)."""
+    if metric not in PALETTE_METRICS:
+        raise ValueError(f'Bilinmeyen palet uzaklığı: {metric}')
+    if not len(labs):
+        return np.empty(0)
+    distances = ciede2000(query_labs[None, :, None, :], labs[:, None, :, :])
+    if metric == 'nearest':
+        return nearest_distance(distances, query_weights, weights)
+    return sinkhorn_distance(distances, query_weights, weights)
+
+
+def rank_palettes(user_id, palette_id, metric='emd'):
+    """
+    Kullanıcının diğer paletlerini palette_id paletine uzaklığa göre sıralar: [(palet id, uzaklık)], en benzer önce.
+    Palette ait renk satırı yoksa KeyError fırlatır.
+    """
+    with stage_timer('compare'):
+        palette_ids, labs, weights = load_palette_matrix(user_id)
+        index = np.searchsorted(palette_ids, palette_id)
+        if index == len(palette_ids) or palette_ids[index] != palette_id:
+            raise KeyError(palette_id)
+        present = weights[index] > 0
+        others = np.arange(len(palette_ids)) != index
+        distances = palette_distances(labs[index][present], weights[index][present], labs[others], weights[others], metric)
+        order = np.argsort(distances, kind='stable')
+        return [(int(other), float(distance)) for other, distance in zip(palette_ids[others][order], distances[order])]
@@ -0,0 +1,134 @@
+import json
+import struct
+import zipfile
+from asgiref.sync import sync_to_async
+from .models import ColorPalette
+from .palette_colors import hex_to_rgb
+
+# Paletlerin dışa aktarımı: her palet GIMP (.gpl), Adobe Swatch Exchange (.ase), CSS özel değişkenleri, json ve
+# palet görseli (png) olarak bir ZIP arşivine yazılır. Arşiv bellekte biriktirilmez: zipfile, yalnızca write()
+# metodu olan (seek edilemeyen) bir tampona yazar, tamponda biriken baytlar EXPORT_CHUNK_BYTES'ı geçtikçe üretilir.
+# Paletler iterator(chunk_size=...) ile parça parça okunur; bellekte kalan yalnızca arşivin sonundaki merkezi
+# dizin (central directory) için dosya başına birkaç yüz baytlık kayıttır.
+
+EXPORT_CHUNK_BYTES = 64 * 1024  # yanıta yazılan parçaların yaklaşık boyutu
+EXPORT_QUERY_CHUNK = 200  # veritabanından tek seferde okunan palet sayısı (renkleri de bu gruplarla okunur)
+
+
+class StreamBuffer:
+    """zipfile'ın yazdığı baytları biriktirir; tell/seek olmadığından zipfile akış kipinde (data descriptor) yazar."""
+
+    def __init__(self):
+        self.chunks = []
+        self.size = 0
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self.chunks)
+        self.chunks, self.size = [], 0
+        return data
+
+
+def palette_name(palette):
+    return f'Palette {palette.id}'
+
+
+def palette_colors(palette):
+    """Paletin renkleri: [(hex, (r, g, b), pay ya da None)]. Renk satırı yoksa rgb_codes ayrıştırılır."""
+    rows = palette.colors.all()
+    if rows:
+        return [(color.hex, (color.red, color.green, color.blue), color.share) for color in rows]
+    codes = palette.rgb_codes.split('|') if palette.rgb_codes else []
+    return [(code, hex_to_rgb(code), None) for code in codes]
+
+
+def palette_gpl(palette, colors):
+    lines = ['GIMP Palette', f'Name: {palette_name(palette)}', f'Columns: {len(colors)}', '#']
+    lines += [f'{r:3d} {g:3d} {b:3d}\t{code}' for code, (r, g, b), _ in colors]
+    return '\n'.join(lines) + '\n'
+
+
+def ase_string(text):
+    # ASE metinleri: UTF-16BE, sondaki sıfır dahil karakter sayısıyla başlar
+    encoded = (text + '\0').encode('utf-16-be')
+    return struct.pack('>H', len(encoded) // 2) + encoded
+
+
+def ase_block(block_type, body):
+    return struct.pack('>HI', block_type, len(body)) + body
+
+
+def palette_ase(palette, colors):
+    """Adobe Swatch Exchange 1.0: paletin adıyla bir grup ve içinde her renk için RGB (0-1 float) bir blok."""
+    blocks = [ase_block(0xC001, ase_string(palette_name(palette)))]
+    for code, (r, g, b), _ in colors:
+        blocks.append(ase_block(0x0001, ase_string(code) + b'RGB ' + struct.pack('>fffH', r / 255, g / 255, b / 255, 2)))
+    blocks.append(ase_block(0xC002, b''))
+    return b'ASEF' + struct.pack('>HHI', 1, 0, len(blocks)) + b''.join(blocks)
+
+
+def palette_css(palette, colors):
+    lines = [f'/* {palette_name(palette)} */', ':root {']
+    lines += [f'  --palette-{palette.id}-{position + 1}: {code};' for position, (code, _, _) in enumerate(colors)]
+    return '\n'.join(lines + ['}']) + '\n'
+
+
+def palette_json(palette, colors):
+    return json.dumps({
+        'id': palette.id,
+        'name': palette_name(palette),
+        'created_at': palette.created_at.isoformat(),
+        'k_value': palette.k_value,
+        'algorithm': palette.algorithm,
+        'blur_kernel': palette.blur_kernel,
+        'colors': [{'hex': code, 'rgb': list(rgb), 'share': share} for code, rgb, share in colors],
+    }, indent=2)
+
+
+def palette_files(palette):
+    """Bir paletin arşivdeki dosyaları: (arşiv içi yol, içerik, sıkıştırılsın mı)."""
+    from .imaging import render_palette_png # görüntü işleme modülü yalnızca dışa aktarım başlayınca yüklenir
+
+    colors = palette_colors(palette)
+    base = f'palette-{palette.id}/palette-{palette.id}'
+    return [
+        (f'{base}.gpl', palette_gpl(palette, colors), True),
+        (f'{base}.ase', palette_ase(palette, colors), True),
+        (f'{base}.css', palette_css(palette, colors), True),
+        (f'{base}.json', palette_json(palette, colors), True),
+        (f'{base}.png', render_palette_png(palette.rgb_codes), False),  # png zaten sıkıştırılmıştır
+    ]
+
+
+def export_palettes_zip(user):
+    """Kullanıcının paletlerini içeren ZIP arşivini EXPORT_CHUNK_BYTES civarı parçalar halinde üreten generator."""
+    palettes = (ColorPalette.objects.filter(user=user).order_by('id')
+                .only('id', 'created_at', 'rgb_codes', 'k_value', 'algorithm', 'blur_kernel')
+                .prefetch_related('colors').iterator(chunk_size=EXPORT_QUERY_CHUNK))
+    buffer = StreamBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for palette in palettes:
+            for name, content, compress in palette_files(palette):
+                info = zipfile.ZipInfo(name, date_time=palette.created_at.timetuple()[:6])
+                info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+                archive.writestr(info, content)
+            if buffer.size >= EXPORT_CHUNK_BYTES:
+                yield buffer.pop()
+    yield buffer.pop()  # kalan dosyalar ve merkezi dizin
+
+
+async def aiter_in_thread(chunks):
+    """
+    ASGI'de senkron generator'ı parça parça sync_to_async ile ilerleten async generator. Django, async sunucuda
+    senkron bir akışı göndermeden önce tamamını listeye topladığından arşiv aksi halde bellekte birikirdi.
+    """
+    done = object()
+    while (chunk := await sync_to_async(next)(chunks, done)) is not done:
+        yield chunk
@@ -0,0 +1,111 @@
+import os
+import cv2
+import numpy as np
+from datetime import timedelta
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from .imaging import WORKING_SIZE, apply_gaussian_blur, convert_to_lab, decode_and_resize_image
+
+# Ara önizleme görselleri (bulanıklaştırılmış ve LAB görüntü)
+# Önizlemeler işlem sırasında değil, palet sayfası istediğinde üretilir ve Django depolama API'si
+# üzerinden içerik adresli adlarla saklanır: ad, görselin içerik özetinden ve parametrelerden
+# türetildiği için eşzamanlı istekler birbirinin dosyasının üzerine yazamaz.
+
+PREVIEW_KINDS = ('blurred', 'lab')
+PREVIEW_DIRECTORY = 'previews'
+PREVIEW_ENCODINGS = {  # format -> (uzantı, OpenCV kalite parametresi)
+    'webp': ('webp', cv2.IMWRITE_WEBP_QUALITY),
+    'jpeg': ('jpg', cv2.IMWRITE_JPEG_QUALITY),
+}
+
+
+def preview_settings():
+    image_format = getattr(settings, 'PREVIEW_FORMAT', 'webp')
+    if image_format not in PREVIEW_ENCODINGS:
+        raise ValueError(f'Desteklenmeyen önizleme formatı: {image_format}')
+    return image_format, int(getattr(settings, 'PREVIEW_QUALITY', 80))
+
+
+def preview_name(content_hash, kind, blur_kernel, size=WORKING_SIZE):
+    image_format, quality = preview_settings()
+    extension, _ = PREVIEW_ENCODINGS[image_format]
+    return f'{PREVIEW_DIRECTORY}/{content_hash}_{kind}_b{blur_kernel}_{size[0]}x{size[1]}_q{quality}.{extension}'
+
+
+def render_preview(image_data, kind, blur_kernel, size=WORKING_SIZE):
+    """Önizleme görüntüsünü üretir ve seçilen formatta kodlanmış baytlarını döndürür."""
+    image_format, quality = preview_settings()
+    _, quality_flag = PREVIEW_ENCODINGS[image_format]
+    image = apply_gaussian_blur(decode_and_resize_image(image_data, size), (blur_kernel, blur_kernel))
+    if kind == 'lab':
+        image = convert_to_lab(image)  # LAB kanalları olduğu gibi (BGR gibi) kodlanır, önceki önizlemelerle aynı görünüm
+    ok, buffer = cv2.imencode(f'.{PREVIEW_ENCODINGS[image_format][0]}', np.ascontiguousarray(image), [quality_flag, quality])
+    if not ok:
+        raise ValueError('Önizleme görseli kodlanamadı.')
+    return buffer.tobytes()
+
+
+def touch_preview(name):
+    """
+    Önizleme depolamada varsa son kullanım zamanını (mtime) günceller ve True döndürür.
+    Sık görüntülenen önizlemeler böylece sweep_previews'da silinmez; yeni güncellenmiş dosya, istemci yönlendirmeyi
+    izlemeden önce çalışan bir taramada da silinmez. Yerel yolu olmayan depolamalarda yaş oluşturulmadan itibaren ölçülür.
+    """
+    try:
+        os.utime(default_storage.path(name))
+        return True
+    except FileNotFoundError:
+        return False  # hiç üretilmemiş ya da taramada silinmiş, yeniden üretilir
+    except NotImplementedError:
+        return default_storage.exists(name)
+
+
+def get_or_create_preview(image_upload, kind, blur_kernel):
+    """
+    Görsel için istenen önizlemenin depolamadaki adını döndürür; yoksa üretip kaydeder.
+    """
+    if kind not in PREVIEW_KINDS:
+        raise ValueError(f'Bilinmeyen önizleme türü: {kind}')
+    image_data = None
+    content_hash = image_upload.content_hash
+    if not content_hash:  # içerik özeti olmayan eski kayıtlar için özet görselden hesaplanır
+        from .palette_cache import image_digest
+        with image_upload.image.open('rb') as image_file:
+            image_data = image_file.read()
+        content_hash = image_digest(image_data)
+
+    name = preview_name(content_hash, kind, blur_kernel)
+    if touch_preview(name):
+        return name  # önizleme daha önce üretilmiş, görsel okunmaz
+    if image_data is None:
+        with image_upload.image.open('rb') as image_file:
+            image_data = image_file.read()
+    saved_name = default_storage.save(name, ContentFile(render_preview(image_data, kind, blur_kernel)))
+    if saved_name != name:
+        default_storage.delete(saved_name)  # aynı önizleme eşzamanlı olarak üretildi, içerik aynıdır
+    return name
+
+
+def sweep_previews(max_age=None):
+    """
+    Son kullanımı (her istekte güncellenen mtime, bkz. touch_preview) max_age saniyeden eski önizlemeleri siler;
+    silinen dosya sayısını döndürür. Silinen önizleme bir daha istenirse yeniden üretilir.
+    """
+    if max_age is None:
+        max_age = getattr(settings, 'PREVIEW_TTL', 7 * 24 * 60 * 60)
+    if not default_storage.exists(PREVIEW_DIRECTORY):
+        return 0
+    cutoff = timezone.now() - timedelta(seconds=max_age)
+    removed = 0
+    _, files = default_storage.listdir(PREVIEW_DIRECTORY)
+    for filename in files:
+        name = f'{PREVIEW_DIRECTORY}/{filename}'
+        try:
+            if default_storage.get_modified_time(name) < cutoff:
+                default_storage.delete(name)
+                removed += 1
+        except (OSError, NotImplementedError):
+            continue
+    return removed
@@ -0,0 +1,166 @@
+import numpy as np
+from .clustering import build_color_histogram, histogram_kmeans, kmeans_sweep, palette_scores
+
+# Renk nicemleyici (quantizer) kayıt defteri
+# Her arka uç LAB görüntüyü ve k değerini alır, (centroids, weights) döndürür:
+# - centroids: k x 3 küme merkezleri, lab_to_rgb'nin beklediği OpenCV LAB formatında
+# - weights: her rengin görüntüdeki piksel payı (toplamı 1)
+# process_image ve edit_palette arka ucu ismiyle seçer, isim ColorPalette.algorithm alanında saklanır.
+
+QUANTIZERS = {}
+DEFAULT_QUANTIZER = 'kmeans'
+
+
+def register_quantizer(name):
+    """Bir fonksiyonu verilen isimle nicemleyici olarak kaydeden dekoratör."""
+    def decorator(func):
+        QUANTIZERS[name] = func
+        return func
+    return decorator
+
+
+def get_quantizer(name):
+    try:
+        return QUANTIZERS[name]
+    except KeyError:
+        raise ValueError(f'Bilinmeyen palet algoritması: {name}')
+
+
+def quantize(image, k=5, algorithm=DEFAULT_QUANTIZER):
+    return get_quantizer(algorithm)(image, k)
+
+
+def sweep_quantize(image, k_values, algorithm=DEFAULT_QUANTIZER):
+    """
+    Bir LAB görüntü için birden çok k değerinde palet ve skor hesaplar:
+    {k: {'centroids_lab', 'weights', 'inertia', 'silhouette'}} (skorlar: clustering.palette_scores).
+    KMeans'te her k bir öncekinden sıcak başlar; diğer algoritmalar her k için ayrı çalışır,
+    skorları aynı histogram üzerinden hesaplanır.
+    """
+    colors, counts = build_color_histogram(image)
+    if algorithm == 'kmeans':
+        return kmeans_sweep(colors, counts, k_values)
+    results = {}
+    for k in sorted(set(k_values)):
+        centroids, weights = quantize(image, k, algorithm)
+        inertia, silhouette = palette_scores(colors, counts, centroids)
+        results[k] = {'centroids_lab': centroids, 'weights': weights, 'inertia': inertia, 'silhouette': silhouette}
+    return results
+
+
+def _pad_palette(centroids, counts, k):
+    # k'dan az renk bulunduysa en kalabalık renk tekrarlanarak k'ya tamamlanır
+    order = np.argsort(-counts, kind='stable')
+    centroids = centroids[order]
+    weights = counts[order] / counts.sum()
+    if len(centroids) < k:
+        fill = np.resize(np.arange(len(centroids)), k)
+        centroids = centroids[fill]
+        weights = np.concatenate([weights, np.zeros(k - len(weights))])
+    return centroids, weights
+
+
+@register_quantizer('kmeans')
+def kmeans_quantizer(image, k=5):
+    return histogram_kmeans(image, k)
+
+
+@register_quantizer('median_cut')
+def median_cut_quantizer(image, k=5):
+    """
+    Ağırlıklı median-cut: histogram kutuları, hata kareler toplamı en büyük olan kutu
+    en geniş kanalı boyunca piksel sayısına göre ortadan ikiye bölünerek k kutuya ayrılır.
+    """
+    colors, counts = build_color_histogram(image)
+    weights = counts.astype(np.float64)
+    boxes = [np.arange(len(colors))]
+
+    def box_error(indices):
+        if len(indices) < 2:
+            return -1.0
+        w = weights[indices]
+        mean = np.average(colors[indices], axis=0, weights=w)
+        return float((w * ((colors[indices] - mean) ** 2).sum(axis=1)).sum())
+
+    errors = [box_error(boxes[0])]
+    while len(boxes) < k:
+        target = int(np.argmax(errors))
+        if errors[target] <= 0:
+            break  # bölünebilecek kutu kalmadı
+        indices = boxes[target]
+        box_colors = colors[indices]
+        channel = int(np.argmax(box_colors.max(axis=0) - box_colors.min(axis=0)))
+        order = indices[np.argsort(box_colors[:, channel], kind='stable')]
+        cumulative = np.cumsum(weights[order])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        split = min(max(split, 1), len(order) - 1)  # iki tarafta da en az bir kutu kalmalı
+        boxes[target:target + 1] = [order[:split], order[split:]]
+        errors[target:target + 1] = [box_error(order[:split]), box_error(order[split:])]
+
+    box_counts = np.array([weights[b].sum() for b in boxes])
+    centroids = np.array([np.average(colors[b], axis=0, weights=weights[b]) for b in boxes])
+    return _pad_palette(centroids, box_counts, k)
+
+
+OCTREE_DEPTH = 6  # yaprak seviyesi: her kanalın ilk 6 biti (4'lük hücreler)
+
+
+@register_quantizer('octree')
+def octree_quantizer(image, k=5):
+    """
+    Octree nicemleme: pikseller kanal bitlerine göre bir ağaca yerleştirilir, yaprak sayısı
+    k'ya inene kadar en az piksel içeren düğümlerin çocukları ebeveynde birleştirilir.
+    Her seviye tek seferde numpy ile işlenir.
+    """
+    pixels = np.asarray(image).reshape((-1, 3)).astype(np.int64)
+    prefixes = pixels >> (8 - OCTREE_DEPTH)
+    # düğüm anahtarı: üç kanalın bit önekleri tek tamsayıya paketlenir (her kanala 8 bit)
+    keys = (prefixes[:, 0] << 16) | (prefixes[:, 1] << 8) | prefixes[:, 2]
+
+    # yaprak düğümler: (düğüm anahtarı, renk toplamı, piksel sayısı)
+    nodes, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    inverse = inverse.reshape(-1)
+    sums = np.stack([np.bincount(inverse, weights=pixels[:, c], minlength=len(nodes)) for c in range(3)], axis=1)
+
+    level = OCTREE_DEPTH
+    while len(nodes) > k and level > 0:
+        # ebeveyn anahtarı: her kanal önekinin son biti atılır
+        parents, parent_of, children = np.unique((nodes >> 1) & 0x7F7F7F, return_inverse=True, return_counts=True)
+        parent_of = parent_of.reshape(-1)
+        parent_counts = np.bincount(parent_of, weights=counts, minlength=len(parents))
+        excess = len(nodes) - k
+
+        if (children - 1).sum() <= excess:
+            # bu seviyedeki tüm düğümler ebeveynlerine indirgenir
+            sums = np.stack([np.bincount(parent_of, weights=sums[:, c], minlength=len(parents)) for c in range(3)], axis=1)
+            nodes, counts = parents, parent_counts
+            level -= 1
+            continue
+
+        # en az piksel içeren ebeveynler sırayla indirgenir; son ebeveynin yalnızca en küçük
+        # çocukları birleştirilerek yaprak sayısı tam olarak k'ya indirilir
+        order = np.lexsort((np.arange(len(parents)), parent_counts))
+        reductions = np.cumsum(children[order] - 1)
+        last = int(np.searchsorted(reductions, excess))
+        merged = order[:last]
+        remaining = excess - (reductions[last - 1] if last > 0 else 0)
+
+        group = np.full(len(nodes), -1, dtype=np.int64)  # birleşecek düğümlerin hedef grubu
+        is_merged = np.isin(parent_of, merged)
+        group[is_merged] = parent_of[is_merged]
+        if remaining > 0:
+            partial = order[last]
+            candidates = np.flatnonzero(parent_of == partial)
+            candidates = candidates[np.argsort(counts[candidates], kind='stable')][:remaining + 1]
+            group[candidates] = partial
+
+        keep = group < 0
+        _, merged_of = np.unique(group[~keep], return_inverse=True)
+        merged_sums = np.stack([np.bincount(merged_of, weights=sums[~keep, c]) for c in range(3)], axis=1)
+        merged_counts = np.bincount(merged_of, weights=counts[~keep])
+        sums = np.concatenate([sums[keep], merged_sums])
+        counts = np.concatenate([counts[keep], merged_counts])
+        break
+
+    centroids = sums / counts[:, None]
+    return _pad_palette(centroids, np.asarray(counts, dtype=np.float64), k)
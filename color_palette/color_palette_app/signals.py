@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import ColorPalette, ImageUpload, PaletteJob
+
+# ImageUpload referans sayımı: her ColorPalette bağlı olduğu görselin ref_count değerini bir artırır.
+# Son palet silinince (ve görseli bekleyen bir iş yoksa) görsel kaydı ve dosyası silinir.
+# Not: bulk_create sinyal göndermez; toplu ekleme yapan kod adjust_image_refs'i kendisi çağırmalıdır.
+
+
+def adjust_image_refs(image_id, delta):
+    ImageUpload.objects.filter(id=image_id).update(ref_count=F('ref_count') + delta)
+
+
+def release_image_upload(image_id):
+    """Referansı kalmayan görseli siler; kuyrukta onu bekleyen iş varsa dokunmaz."""
+    pending_jobs = PaletteJob.objects.filter(
+        image_id=image_id, status__in=[PaletteJob.STATUS_QUEUED, PaletteJob.STATUS_RUNNING],
+    )
+    if pending_jobs.exists():
+        return
+    for image in ImageUpload.objects.filter(id=image_id, ref_count=0):
+        image.delete()
+
+
+@receiver(post_save, sender=ColorPalette)
+def palette_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_image_refs(instance.image_id, 1)
+
+
+@receiver(post_delete, sender=ColorPalette)
+def palette_deleted(sender, instance, origin=None, **kwargs):
+    if isinstance(origin, ImageUpload) or getattr(origin, 'model', None) is ImageUpload:
+        return  # görselin kendisi siliniyor (cascade), sayaç tutmaya gerek yok
+    ImageUpload.objects.filter(id=instance.image_id, ref_count__gt=0).update(ref_count=F('ref_count') - 1)
+    release_image_upload(instance.image_id)
+
+
+@receiver(post_delete, sender=ImageUpload)
+def image_upload_deleted(sender, instance, **kwargs):
+    # dosya yalnızca veritabanı işlemi başarıyla tamamlanırsa silinir
+    if instance.image:
+        storage, name = instance.image.storage, instance.image.name
+        transaction.on_commit(lambda: storage.delete(name))
@@ -1,6 +1,10 @@
 from django.test import TestCase
 import numpy as np
-from color_palette_app.views import apply_kmeans, convert_to_lab, lab_to_rgb
+from color_palette_app.imaging import apply_kmeans, convert_to_lab, format_hex_codes, hex_codes_to_lab, lab_to_rgb
+from color_palette_app.clustering import build_color_histogram, histogram_kmeans, kmeans_sweep, refine_kmeans, suggest_k, weighted_kmeans
+from color_palette_app.models import PALETTE_ALGORITHMS
+from color_palette_app.palette_compare import ciede2000, palette_distances
+from color_palette_app.quantizers import DEFAULT_QUANTIZER, QUANTIZERS, get_quantizer, sweep_quantize
 
 class AlgorithmTestCase(TestCase):
     """
@@ -33,3 +37,112 @@ class AlgorithmTestCase(TestCase):
         fake_lab = np.array([[50, 0, 0], [100, 0, 0], [150, 0, 0], [200, 0, 0], [255, 0, 0]], dtype=np.uint8)
         rgb_image = lab_to_rgb(fake_lab)
         self.assertEqual(rgb_image.shape, fake_lab.shape)
+
+    def test_build_color_histogram(self):
+        """
+        Histogramın tüm pikselleri kapsadığını ve tekrar eden renkleri tek kutuda topladığını kontrol eder.
+        """
+        fake_image = np.zeros((10, 10, 3), dtype=np.uint8)
+        fake_image[:5] = [200, 100, 50]
+        colors, counts = build_color_histogram(fake_image)
+        self.assertEqual(counts.sum(), 100)
+        self.assertEqual(len(colors), 2)
+        self.assertEqual(sorted(colors.tolist()), [[0, 0, 0], [200, 100, 50]])
+
+    def test_histogram_kmeans_weights(self):
+        """
+        Küme ağırlıklarının piksel paylarını verdiğini ve k'dan az renk olduğunda da k merkez döndüğünü kontrol eder.
+        """
+        fake_image = np.zeros((10, 10, 3), dtype=np.uint8)
+        fake_image[:3] = [255, 128, 128]
+        centroids, weights = histogram_kmeans(fake_image, k=2)
+        self.assertEqual(len(centroids), 2)
+        self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertEqual(sorted(np.round(weights, 2).tolist()), [0.3, 0.7])
+
+        centroids, weights = histogram_kmeans(fake_image, k=4)
+        self.assertEqual(len(centroids), 4)
+        self.assertAlmostEqual(weights.sum(), 1.0)
+
+    def test_quantizer_backends(self):
+        """
+        Kayıtlı tüm palet algoritmalarının k adet LAB merkezi ve toplamı 1 olan ağırlıklar döndürdüğünü kontrol eder.
+        """
+        fake_image = np.random.default_rng(0).integers(0, 255, (50, 50, 3), dtype=np.uint8)
+        self.assertEqual(set(PALETTE_ALGORITHMS), set(QUANTIZERS))  # görünümlerin kullandığı hafif liste kayıt defteriyle aynı olmalı
+        self.assertEqual(PALETTE_ALGORITHMS[0], DEFAULT_QUANTIZER)
+        for name, quantizer in QUANTIZERS.items():
+            for k in (1, 5, 10):
+                with self.subTest(algorithm=name, k=k):
+                    centroids, weights = quantizer(fake_image, k)
+                    self.assertEqual(centroids.shape, (k, 3))
+                    self.assertAlmostEqual(weights.sum(), 1.0)
+                    self.assertTrue(np.all(centroids >= 0) and np.all(centroids <= 255))
+                    self.assertEqual(lab_to_rgb(centroids).shape, (k, 3))
+
+        with self.assertRaises(ValueError):
+            get_quantizer('bilinmeyen')
+
+    def test_kmeans_sweep_warm_start(self):
+        """
+        Çoklu k taramasında her k'nın k merkez döndürdüğünü, en küçük k'nın normal KMeans ile aynı olduğunu,
+        sıcak başlangıç sayesinde inertia'nın k arttıkça azalmadığını ve önerilen k'nın en yüksek skorlu k olduğunu kontrol eder.
+        """
+        fake_image = np.random.default_rng(1).integers(0, 255, (60, 60, 3), dtype=np.uint8)
+        colors, counts = build_color_histogram(fake_image)
+        results = kmeans_sweep(colors, counts, range(3, 9))
+        self.assertEqual(sorted(results), list(range(3, 9)))
+        for k, result in results.items():
+            self.assertEqual(result['centroids_lab'].shape, (k, 3))
+            self.assertAlmostEqual(result['weights'].sum(), 1.0)
+            self.assertTrue(-1.0 <= result['silhouette'] <= 1.0)
+
+        centroids, _, inertia = weighted_kmeans(colors, counts, 3)
+        np.testing.assert_allclose(results[3]['centroids_lab'], centroids)
+        self.assertAlmostEqual(results[3]['inertia'], inertia, delta=inertia * 1e-6)
+        inertias = [results[k]['inertia'] for k in range(3, 9)]
+        self.assertEqual(inertias, sorted(inertias, reverse=True))
+
+        best = max(range(3, 9), key=lambda k: results[k]['silhouette'])
+        self.assertEqual(suggest_k(results), best)
+        for name in QUANTIZERS:  # diğer algoritmalar da aynı biçimde sonuç döndürür
+            self.assertEqual(sorted(sweep_quantize(fake_image, [2, 4], name)), [2, 4])
+
+    def test_refine_kmeans_from_existing_palette(self):
+        """
+        Var olan paletten başlayan kısa KMeans'in k değiştiğinde merkezleri tamamladığını/azalttığını,
+        hex kodlarının LAB'a geri çevrilebildiğini ve yakınsamış bir paletin kendisine yakın kaldığını kontrol eder.
+        """
+        fake_image = np.random.default_rng(2).integers(0, 255, (60, 60, 3), dtype=np.uint8)
+        colors, counts = build_color_histogram(convert_to_lab(fake_image))  # hex kodlarına çevrilebilen gerçek LAB renkleri
+        centroids, _, inertia = weighted_kmeans(colors, counts, 5)
+        codes = '|'.join(format_hex_codes(lab_to_rgb(centroids)))
+        np.testing.assert_allclose(hex_codes_to_lab(codes), centroids, atol=3)
+
+        refined, weights, refined_inertia = refine_kmeans(colors, counts, hex_codes_to_lab(codes), 5)
+        np.testing.assert_allclose(np.sort(refined, axis=0), np.sort(centroids, axis=0), atol=3)
+        self.assertLess(refined_inertia, inertia * 1.05)
+        for k in (2, 8):
+            refined, weights, _ = refine_kmeans(colors, counts, hex_codes_to_lab(codes), k)
+            self.assertEqual(refined.shape, (k, 3))
+            self.assertAlmostEqual(weights.sum(), 1.0)
+        self.assertEqual(refine_kmeans(colors, counts, np.empty((0, 3)), 3)[0].shape, (3, 3))  # seed yoksa tam kümeleme
+
+    def test_palette_distances(self):
+        """
+        CIEDE2000'in Sharma vd. (2005) referans değerlerini verdiğini, Sinkhorn EMD'nin elle çözülebilen bir taşıma
+        problemini ve farklı boydaki paletleri (boş yerler payı 0) doğru hesapladığını kontrol eder.
+        """
+        first = [[50, 2.6772, -79.7751], [50, 0, 0], [50, 2.5, 0], [60.2574, -34.0099, 36.2677]]
+        second = [[50, 0, -82.7485], [50, -1, 2], [73, 25, -18], [60.4626, -34.1751, 39.4387]]
+        np.testing.assert_allclose(ciede2000(first, second), [2.0425, 2.3669, 27.1492, 1.2644], atol=1e-4)
+
+        # sorgu: %75 siyah + %25 beyaz; ikinci palet %50 siyah + %50 beyaz -> payın %25'i siyahtan beyaza taşınır
+        black, white = [0, 0, 0], [100, 0, 0]
+        query_labs, query_weights = np.array([black, white], dtype=float), np.array([0.75, 0.25])
+        labs = np.array([[black, white, black], [black, white, black]], dtype=float)
+        weights = np.array([[0.75, 0.25, 0.0], [0.5, 0.5, 0.0]])
+        emd = palette_distances(query_labs, query_weights, labs, weights, 'emd')
+        np.testing.assert_allclose(emd, [0, 0.25 * ciede2000(black, white)], atol=0.1)
+        nearest = palette_distances(query_labs, query_weights, labs, weights, 'nearest')
+        np.testing.assert_allclose(nearest, [0, 0], atol=1e-9)  # en yakın renk ortalaması paylardaki farkı görmez
@@ -0,0 +1,81 @@
+import json
+import tempfile
+from asgiref.sync import sync_to_async
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.contrib.auth.models import User
+from django.utils.functional import SimpleLazyObject
+from django.core.files.uploadedfile import SimpleUploadedFile
+from color_palette_app.concurrency import reset_process_executor
+from color_palette_app.models import ColorPalette, PaletteJob
+from color_palette_app.palette_cache import get_palette_cache
+from color_palette_app.views import edit_palette_async, process_batch_async, process_image_async, store_upload
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_WRITE_IN_BACKGROUND=False, PIPELINE_MAX_CONCURRENCY=1)
+class AsyncViewsTestCase(TestCase):
+    """
+    ASGI dağıtımında kullanılan process_image_async ve edit_palette_async görünümlerini test eder.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.factory = AsyncRequestFactory()
+        with open('media/test_images/small.jpg', 'rb') as img:
+            self.image_data = img.read()
+        get_palette_cache().clear()
+
+    def tearDown(self):
+        reset_process_executor()  # testte açılan süreç havuzunu kapat
+
+    def make_request(self, method, path, data=None):
+        request = getattr(self.factory, method)(path, data or {})
+        # AuthenticationMiddleware gibi tembel kullanıcı: async bağlamda çözülürse SynchronousOnlyOperation fırlatır
+        request.user = SimpleLazyObject(lambda: User.objects.get(pk=self.user.pk))
+
+        async def auser():
+            return self.user
+        request.auser = auser
+        return request
+
+    async def test_process_image_async_enqueues_job(self):
+        request = self.make_request('post', '/process_image/', {
+            'image': SimpleUploadedFile('small.jpg', self.image_data, content_type='image/jpeg'),
+            'k': 4,
+            'blur_kernel': 5,
+        })
+        response = await process_image_async(request)
+        self.assertEqual(response.status_code, 302)
+        job = await PaletteJob.objects.aget()
+        self.assertEqual((job.k_value, job.status), (4, PaletteJob.STATUS_QUEUED))
+        preview = await ColorPalette.objects.aget(id=job.palette_id)  # önizleme süreç havuzunda hesaplandı
+        self.assertEqual(len(preview.rgb_codes.split('|')), 4)
+        self.assertEqual(response['Location'], f'/palette_job/{job.id}/')
+
+        request = self.make_request('post', '/process_image/', {
+            'image': SimpleUploadedFile('small.jpg', self.image_data, content_type='image/jpeg'),
+            'blur_kernel': 4,
+        })
+        response = await process_image_async(request)
+        self.assertContains(response, 'tek sayı')  # senkron görünümle aynı doğrulama mesajı
+
+    async def test_edit_palette_async_uses_process_pool(self):
+        image = await sync_to_async(store_upload)('small.jpg', self.image_data)
+        palette = await ColorPalette.objects.acreate(user=self.user, image=image, rgb_codes='#000000|#000000|#000000', k_value=3)
+
+        response = await edit_palette_async(self.make_request('get', f'/edit_palette/{palette.id}/'), palette.id)
+        self.assertEqual(response.status_code, 200)
+        await palette.arefresh_from_db()
+        self.assertEqual(len(palette.rgb_codes.split('|')), 3)
+        self.assertNotEqual(palette.rgb_codes, '#000000|#000000|#000000')
+
+    async def test_process_batch_async_streams_events(self):
+        request = self.make_request('post', '/process_batch/', {
+            'images': [SimpleUploadedFile('small.jpg', self.image_data, content_type='image/jpeg')],
+            'k': 3,
+        })
+        response = await process_batch_async(request)
+        self.assertTrue(response.is_async)
+        events = [json.loads(line) async for line in response.streaming_content]
+        self.assertEqual([event['event'] for event in events], ['accepted', 'image', 'done'])
+        palette = await ColorPalette.objects.select_related('image').aget(id=events[-1]['palettes'][0]['palette_id'])
+        self.assertEqual(palette.image.ref_count, 1)
@@ -0,0 +1,147 @@
+import csv
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from color_palette_app.concurrency import reset_process_executor
+from color_palette_app.models import ColorPalette, ImageUpload
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), PIPELINE_MAX_CONCURRENCY=1)
+class BatchUploadTestCase(TestCase):
+    """
+    /process_batch/ toplu yükleme uç noktasının testleri: ilerleme akışı, toplu eklenen kayıtlar
+    ve bulk_create'in atladığı sinyaller yerine elle güncellenen referans sayıları.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+    def tearDown(self):
+        reset_process_executor()  # testte açılan süreç havuzunu kapat
+
+    def upload(self, name):
+        with open(f'media/test_images/{name}', 'rb') as img:
+            return SimpleUploadedFile(name, img.read(), content_type='image/jpeg')
+
+    def read_events(self, response):
+        body = b''.join(response.streaming_content).decode()
+        return [json.loads(line) for line in body.splitlines()]
+
+    def test_batch_streams_progress_and_bulk_creates(self):
+        response = self.client.post('/process_batch/', {
+            'images': [
+                self.upload('small.jpg'),
+                self.upload('image2.jpg'),
+                self.upload('small.jpg'),  # aynı içerik bir kez işlenir, iki palet oluşur
+                SimpleUploadedFile('notes.txt', b'not an image', content_type='text/plain'),
+            ],
+            'k': 4,
+            'blur_kernel': 5,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        events = self.read_events(response)
+
+        self.assertEqual(events[0], {'event': 'accepted', 'total': 4})
+        progress = [event for event in events if event['event'] == 'image']
+        self.assertEqual([event['completed'] for event in progress], [1, 2, 3, 4])
+        statuses = {event['index']: event['status'] for event in progress}
+        self.assertEqual(statuses, {0: 'done', 1: 'done', 2: 'done', 3: 'failed'})
+        self.assertTrue(all(len(event['rgb_codes']) == 4 for event in progress if event['status'] == 'done'))
+
+        summary = events[-1]
+        self.assertEqual((summary['event'], summary['failed']), ('done', 1))
+        self.assertEqual(sorted(row['index'] for row in summary['palettes']), [0, 1, 2])
+        self.assertEqual(ColorPalette.objects.filter(user=self.user, k_value=4).count(), 3)
+        self.assertEqual(sorted(ImageUpload.objects.values_list('ref_count', flat=True)), [1, 2])
+        # renk tablosu da toplu eklenir, piksel payları her palette 1'e tamamlanır
+        for palette in ColorPalette.objects.prefetch_related('colors'):
+            self.assertEqual(palette.rgb_colors, palette.rgb_codes.split('|'))
+            self.assertAlmostEqual(sum(color.share for color in palette.colors.all()), 1.0, places=5)
+
+    def test_batch_reuses_existing_upload(self):
+        self.read_events(self.client.post('/process_batch/', {'images': [self.upload('small.jpg')], 'k': 3}))
+        image = ImageUpload.objects.get()
+
+        events = self.read_events(self.client.post('/process_batch/', {'images': [self.upload('small.jpg')], 'k': 3}))
+        self.assertEqual(events[-1]['failed'], 0)
+        image.refresh_from_db()
+        self.assertEqual(ImageUpload.objects.count(), 1)  # aynı içerik yeniden saklanmaz
+        self.assertEqual(image.ref_count, 2)
+
+    @override_settings(PALETTE_BATCH_MAX_FILES=1)
+    def test_batch_rejects_invalid_requests(self):
+        response = self.client.post('/process_batch/', {'k': 5})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/process_batch/', {'images': [self.upload('small.jpg'), self.upload('image2.jpg')]})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('en fazla 1', response.json()['error'])
+        response = self.client.post('/process_batch/', {'images': [self.upload('small.jpg')], 'blur_kernel': 4})
+        self.assertEqual(response.json()['error'], 'Blur kernel değeri tek sayı olmalıdır.')
+        self.assertFalse(ColorPalette.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExtractPalettesCommandTestCase(TestCase):
+    """
+    extract_palettes komutunun testleri: CSV çıktısı, kontrol noktasından devam etme ve veritabanına toplu yazma.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.directory, 'sub'))
+        shutil.copy('media/test_images/small.jpg', os.path.join(self.directory, 'small.jpg'))
+        shutil.copy('media/test_images/small.jpg', os.path.join(self.directory, 'sub', 'copy.JPG'))
+        with open(os.path.join(self.directory, 'sub', 'broken.png'), 'wb') as file:
+            file.write(b'not an image')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def extract(self, *args):
+        stdout = StringIO()
+        call_command('extract_palettes', self.directory, '--workers', '1', '--k', '3', *args, stdout=stdout)
+        return stdout.getvalue()
+
+    def test_csv_output_resumes_from_checkpoint(self):
+        output = os.path.join(self.directory, 'palettes.csv')
+        self.assertIn('3 görsel işlendi (1 hatalı)', self.extract('--output', output))
+
+        # yeni eklenen dosya dışındakiler kontrol noktasında kayıtlı, yeniden işlenmez
+        shutil.copy('media/test_images/image2.jpg', os.path.join(self.directory, 'sub', 'new.jpg'))
+        result = self.extract('--output', output)
+        self.assertIn('3 dosya zaten tamamlanmış', result)
+        self.assertIn('1 görsel işlendi (0 hatalı)', result)
+
+        with open(output, newline='') as file:
+            rows = {row['path']: row for row in csv.DictReader(file)}
+        self.assertEqual(sorted(rows), ['small.jpg', 'sub/broken.png', 'sub/copy.JPG', 'sub/new.jpg'])
+        self.assertEqual(len(rows['small.jpg']['rgb_codes'].split('|')), 3)
+        self.assertEqual(rows['small.jpg']['rgb_codes'], rows['sub/copy.JPG']['rgb_codes'])
+        self.assertTrue(rows['sub/broken.png']['error'])
+
+    def test_more_files_than_pool_slots(self):
+        # havuzda 2 x workers yer var; biten işin sayacı wait() döndükten sonra azaldığından gönderim PipelineBusy alabilir
+        for index in range(40):
+            with open(os.path.join(self.directory, f'broken{index:02}.png'), 'wb') as file:
+                file.write(b'not an image')
+        stdout = StringIO()
+        call_command('extract_palettes', self.directory, '--workers', '2', '--k', '3', '--batch-size', '7',
+                     '--output', os.path.join(self.directory, 'palettes.jsonl'), stdout=stdout)
+        self.assertIn('43 görsel işlendi (41 hatalı)', stdout.getvalue())
+
+    def test_database_output(self):
+        user = User.objects.create_user(username='archive', password='testpassword')
+        checkpoint = os.path.join(self.directory, 'db.checkpoint')
+        self.extract('--user', 'archive', '--batch-size', '1', '--checkpoint', checkpoint)
+
+        self.assertEqual(ColorPalette.objects.filter(user=user, k_value=3).count(), 2)
+        image = ImageUpload.objects.get()  # aynı içerikli iki dosya tek görsel kaydı paylaşır
+        self.assertEqual(image.ref_count, 2)
@@ -0,0 +1,93 @@
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+from django.test import TestCase, override_settings
+from color_palette_app.palette_cache import (
+    DiskCacheBackend, get_palette_cache, image_digest, palette_cache_key,
+)
+from color_palette_app.imaging import compute_palette
+
+TEST_PALETTE_CACHE = {'BACKEND': 'django', 'ALIAS': 'palettes'}
+
+
+class PaletteCacheTestCase(TestCase):
+    """
+    Palet sonuç önbelleğini test eden sınıf.
+    """
+
+    def setUp(self):
+        get_palette_cache().clear()
+
+    def test_cache_key_depends_on_parameters(self):
+        """
+        Anahtarın görsel özeti, k, blur kernel, boyut ve algoritmaya göre değiştiğini kontrol eder.
+        """
+        digest = image_digest(b'gorsel')
+        base = palette_cache_key(digest, 5, 5, (200, 200), 'kmeans')
+        self.assertEqual(base, palette_cache_key(image_digest(b'gorsel'), 5, 5, (200, 200), 'kmeans'))
+        self.assertNotEqual(base, palette_cache_key(image_digest(b'baska'), 5, 5, (200, 200), 'kmeans'))
+        self.assertNotEqual(base, palette_cache_key(digest, 6, 5, (200, 200), 'kmeans'))
+        self.assertNotEqual(base, palette_cache_key(digest, 5, 7, (200, 200), 'kmeans'))
+        self.assertNotEqual(base, palette_cache_key(digest, 5, 5, (64, 64), 'kmeans'))
+        self.assertNotEqual(base, palette_cache_key(digest, 5, 5, (200, 200), 'octree'))
+
+    @override_settings(PALETTE_CACHE=TEST_PALETTE_CACHE)
+    def test_compute_palette_hit_skips_clustering(self):
+        """
+        Aynı görsel ve parametrelerle ikinci çağrının önbellekten döndüğünü ve sayaçların güncellendiğini kontrol eder.
+        """
+        with open('media/test_images/test_images_small.jpg', 'rb') as img:
+            data = img.read()
+        first = compute_palette(data, k=3, blur_kernel=5)
+        second = compute_palette(data, k=3, blur_kernel=5)
+        self.assertFalse(first['cached'])
+        self.assertTrue(second['cached'])
+        self.assertIsNone(second['img_lab'])
+        self.assertEqual(first['rgb_codes'], second['rgb_codes'])
+        self.assertEqual(np.round(first['centroids_lab'], 6).tolist(), np.round(second['centroids_lab'], 6).tolist())
+
+        stats = get_palette_cache().stats.as_dict()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+        self.assertFalse(compute_palette(data, k=4, blur_kernel=5)['cached'])
+
+    def test_disk_backend_lru_eviction(self):
+        """
+        Disk önbelleğinin kayıt sınırı aşıldığında en uzun süredir kullanılmayan kaydı sildiğini kontrol eder.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            backend = DiskCacheBackend(directory, max_entries=2)
+            backend.set('a', {'value': 1})
+            backend.set('b', {'value': 2})
+            os.utime(backend._path('a'), (1, 1))
+            os.utime(backend._path('b'), (2, 2))
+            self.assertEqual(backend.get('a'), {'value': 1})  # 'a' yeniden kullanıldı, 'b' en eski oldu
+            backend.set('c', {'value': 3})
+
+            self.assertIsNone(backend.get('b'))
+            self.assertEqual(backend.get('a'), {'value': 1})
+            self.assertEqual(backend.get('c'), {'value': 3})
+
+            # sınır aşılmadıkça yazma dizini taramaz (kayıt güncellemesi sayıyı artırmaz)
+            with mock.patch('color_palette_app.palette_cache.os.scandir', wraps=os.scandir) as scandir:
+                backend.set('a', {'value': 4})
+            self.assertEqual((scandir.call_count, backend._entries), (0, 2))
+
+    def test_disk_backend_failed_write_leaves_no_temp_file(self):
+        """
+        Yazması başarısız olan kaydın geçici dosyasının silindiğini, yarıda kalmış eski geçici dosyaların taramada
+        temizlendiğini kontrol eder.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            backend = DiskCacheBackend(directory)
+            with self.assertRaises(TypeError):
+                backend.set('a', {'value': object()})  # json'a çevrilemez
+            self.assertEqual(os.listdir(directory), [])
+
+            stale, fresh = os.path.join(directory, 'x.json.1.1.tmp'), os.path.join(directory, 'y.json.1.1.tmp')
+            for path in (stale, fresh):
+                open(path, 'w').close()
+            os.utime(stale, (1, 1))
+            DiskCacheBackend(directory)  # açılışta dizin taranır
+            self.assertEqual(os.listdir(directory), ['y.json.1.1.tmp'])  # başka süreçte sürmekte olan yazma korunur
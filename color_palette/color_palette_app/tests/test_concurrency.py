@@ -0,0 +1,69 @@
+import threading
+import time
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth.models import User
+from color_palette_app.concurrency import PipelineBusy, PipelineExecutor
+from color_palette_app.models import PaletteJob
+
+
+class PipelineExecutorTestCase(SimpleTestCase):
+    """
+    Eşzamanlılık sınırının, sınırlı bekleme sırasının ve sıra dolunca hemen reddetmenin testleri.
+    """
+
+    def occupy(self, executor):
+        # yuvayı tutan bir iş başlatır; release.set() çağrılınca iş biter
+        started, release = threading.Event(), threading.Event()
+
+        def job():
+            started.set()
+            release.wait(5)
+
+        thread = threading.Thread(target=executor.run, args=(job,))
+        thread.start()
+        started.wait(5)
+        return thread, release
+
+    def test_full_queue_fails_fast(self):
+        executor = PipelineExecutor(max_concurrency=1, queue_size=1, queue_timeout=5)
+        thread, release = self.occupy(executor)
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(executor.run(lambda: 'bekleyen')))
+        waiter.start()
+        while executor.waiting == 0:
+            time.sleep(0.001)  # ikinci iş sıraya girene kadar bekle
+        with self.assertRaises(PipelineBusy) as context:
+            executor.run(lambda: 'reddedilen')  # sınır ve sıra dolu
+        self.assertEqual(context.exception.retry_after, 5)
+
+        release.set()
+        thread.join()
+        waiter.join()
+        self.assertEqual(results, ['bekleyen'])
+        self.assertEqual((executor.running, executor.waiting), (0, 0))
+
+    def test_queue_timeout(self):
+        executor = PipelineExecutor(max_concurrency=1, queue_size=1, queue_timeout=0.05)
+        thread, release = self.occupy(executor)
+        with self.assertRaises(PipelineBusy):
+            executor.run(lambda: None)
+        release.set()
+        thread.join()
+        self.assertEqual(executor.run(lambda: 42), 42)
+
+
+class JobQueueLimitTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+    @override_settings(PALETTE_JOB_QUEUE_LIMIT=0, PIPELINE_RETRY_AFTER=7)
+    def test_process_image_returns_503_when_queue_full(self):
+        with open('media/test_images/small.jpg', 'rb') as img:
+            uploaded_file = SimpleUploadedFile('small.jpg', img.read(), content_type='image/jpeg')
+        response = self.client.post('/process_image/', {'image': uploaded_file, 'k': 5, 'blur_kernel': 5})
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertFalse(PaletteJob.objects.exists())
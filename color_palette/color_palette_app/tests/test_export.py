@@ -0,0 +1,54 @@
+import io
+import json
+import struct
+import zipfile
+from unittest import mock
+from django.test import TestCase
+from django.contrib.auth.models import User
+from color_palette_app import palette_export
+from color_palette_app.models import ColorPalette, ImageUpload
+from color_palette_app.palette_colors import replace_palette_colors
+
+
+class PaletteExportTestCase(TestCase):
+    """/export_palettes/ uç noktasının testleri: akış halinde ZIP, dosya formatları ve kullanıcı ayrımı."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.image = ImageUpload.objects.create(image='test_image.jpg')
+
+    def create_palette(self, rgb_codes, weights=None, user=None):
+        palette = ColorPalette.objects.create(user=user or self.user, image=self.image, rgb_codes='|'.join(rgb_codes),
+                                              k_value=len(rgb_codes))
+        if weights is not None:
+            replace_palette_colors([(palette.id, rgb_codes, weights)])
+        return palette
+
+    def test_export_streams_zip(self):
+        first = self.create_palette(['#1e90ff', '#ffffff'], [0.75, 0.25])
+        second = self.create_palette(['#000000', '#ff0000', '#00ff00'])  # renk satırı yok, rgb_codes kullanılır
+        self.create_palette(['#123456'], user=User.objects.create_user(username='other', password='x'))
+
+        with mock.patch.object(palette_export, 'EXPORT_CHUNK_BYTES', 1):  # her paletten sonra bir parça
+            response = self.client.get('/export_palettes/')
+            chunks = list(response.streaming_content)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn('palettes-testuser.zip', response['Content-Disposition'])
+        self.assertEqual(len(chunks), 3)
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        self.assertIsNone(archive.testzip())
+        self.assertEqual(len(archive.namelist()), 10)
+        base = f'palette-{first.id}/palette-{first.id}'
+        self.assertIn(' 30 144 255\t#1e90ff', archive.read(f'{base}.gpl').decode())
+        self.assertIn(f'--palette-{first.id}-2: #ffffff;', archive.read(f'{base}.css').decode())
+        data = json.loads(archive.read(f'{base}.json'))
+        self.assertEqual([(color['hex'], color['share']) for color in data['colors']], [('#1e90ff', 0.75), ('#ffffff', 0.25)])
+        self.assertTrue(archive.read(f'{base}.png').startswith(b'\x89PNG'))
+
+        ase = archive.read(f'palette-{second.id}/palette-{second.id}.ase')
+        self.assertEqual(ase[:4], b'ASEF')
+        self.assertEqual(struct.unpack('>HHI', ase[4:12]), (1, 0, 5))  # grup başı + 3 renk + grup sonu
+        red = ase.index('#ff0000'.encode('utf-16-be'))
+        self.assertEqual(struct.unpack('>fff', ase[red + 16 + 4:red + 16 + 16]), (1.0, 0.0, 0.0))
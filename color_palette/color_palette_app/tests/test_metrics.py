@@ -0,0 +1,57 @@
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.contrib.auth.models import User
+from color_palette_app.metrics import Histogram, stage_timer
+from color_palette_app.models import ImageUpload, ColorPalette, PaletteJob
+
+
+class HistogramTestCase(SimpleTestCase):
+    def test_prometheus_text_format(self):
+        histogram = Histogram('test_seconds', 'Test histogramı.', (0.1, 1.0), ('stage',))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, stage='decode')
+        lines = histogram.collect()
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{stage="decode",le="0.1"} 2', lines)  # le sınırı kovaya dahildir
+        self.assertIn('test_seconds_bucket{stage="decode",le="1.0"} 3', lines)
+        self.assertIn('test_seconds_bucket{stage="decode",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_count{stage="decode"} 4', lines)
+
+
+class MetricsViewTestCase(TestCase):
+    """
+    Server-Timing başlığını ve /metrics uç noktasını test eder.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+
+    def test_server_timing_header(self):
+        image = ImageUpload.objects.create(image='test_image.jpg')
+        palette = ColorPalette.objects.create(user=self.user, image=image, rgb_codes="#123456|#654321", k_value=2)
+        response = self.client.get(f'/palette_image/{palette.id}.png')
+        timing = response['Server-Timing']
+        self.assertIn('encode;dur=', timing)
+        self.assertIn('db;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_metrics_endpoint(self):
+        image = ImageUpload.objects.create(image='test_image.jpg')
+        PaletteJob.objects.create(user=self.user, image=image, k_value=5, blur_kernel=5)
+        with stage_timer('quantize'):
+            pass
+        self.client.logout()  # Prometheus oturum açmadan tarar
+        self.assertEqual(self.client.get('/metrics/').status_code, 403)  # token yokken varsayılan olarak kapalı
+        with override_settings(INTERNAL_IPS=['127.0.0.1']):
+            response = self.client.get('/metrics/')
+        self.assertEqual(response.status_code, 200)
+        body = response.content.decode()
+        self.assertIn('palette_queue_depth 1', body)
+        self.assertIn('palette_stage_seconds_count{stage="quantize"}', body)
+
+    @override_settings(METRICS_TOKEN='gizli')
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get('/metrics/').status_code, 401)
+        self.assertEqual(self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer yanlis').status_code, 401)
+        response = self.client.get('/metrics/', HTTP_AUTHORIZATION='Bearer gizli')
+        self.assertEqual(response.status_code, 200)
@@ -1,6 +1,15 @@
-from django.test import TestCase
+import os
+import tempfile
+from io import StringIO
+from django.test import TestCase, override_settings
 from django.contrib.auth.models import User
-from color_palette_app.models import ImageUpload, ColorPalette
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from color_palette_app.background import run_in_background
+from color_palette_app.models import ImageUpload, ColorPalette, PaletteColor
+from color_palette_app.palette_cache import image_digest
+from color_palette_app.palette_colors import colors_near, replace_palette_colors, rgb_to_lab
+from color_palette_app.views import store_upload
 
 class ModelsTestCase(TestCase):
     def setUp(self):
@@ -25,3 +34,100 @@ class ModelsTestCase(TestCase):
         self.assertEqual(palette.k_value, 3)
         self.assertIn("#FF0000", palette.rgb_codes)
         self.assertEqual(palette.user, self.user)
+
+    def test_palette_color_table(self):
+        # renk satırları sıra, CIELAB değerleri ve piksel paylarıyla yazılır, LAB aralığıyla sorgulanabilir
+        image = ImageUpload.objects.create(image='test_image.jpg')
+        palette = ColorPalette.objects.create(user=self.user, image=image, rgb_codes='#ff0000|#ffffff', k_value=2)
+        replace_palette_colors([(palette.id, ['#ff0000', '#ffffff'], [0.25, 0.75])])
+        replace_palette_colors([(palette.id, ['#ff0000', '#ffffff'], [0.3, 0.7])])  # eski satırların yerine geçer
+
+        red, white = palette.colors.all()
+        self.assertEqual((red.hex, red.position, red.share), ('#ff0000', 0, 0.3))
+        self.assertEqual([round(value, 2) for value in (red.lab_l, red.lab_a, red.lab_b)], [53.24, 80.09, 67.2])
+        self.assertAlmostEqual(white.lab_l, 100.0, places=3)
+        self.assertEqual(list(colors_near(rgb_to_lab(250, 5, 5), 5)), [red])
+        self.assertFalse(colors_near((50.0, 0.0, 0.0), 10).exists())
+
+        palette = ColorPalette.objects.prefetch_related('colors').get(id=palette.id)
+        self.assertEqual(palette.rgb_colors, ['#ff0000', '#ffffff'])
+        palette.delete()
+        self.assertFalse(PaletteColor.objects.exists())
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_WRITE_IN_BACKGROUND=False)
+class ImageDeduplicationTestCase(TestCase):
+    """
+    Yüklenen görsellerin içerik özetine göre tekilleştirilmesini ve referans sayımını test eder.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+
+    def test_store_upload_reuses_identical_content(self):
+        first = store_upload('a.jpg', b'ayni icerik')
+        second = store_upload('b.jpg', b'ayni icerik')
+        third = store_upload('a.jpg', b'farkli icerik')
+        self.assertEqual(first.id, second.id)
+        self.assertNotEqual(first.id, third.id)
+        self.assertEqual(first.content_hash, image_digest(b'ayni icerik'))
+        self.assertEqual(ImageUpload.objects.count(), 2)
+
+    def test_store_upload_rewrites_missing_file(self):
+        """
+        Dosyası yazılamamış (depolamada olmayan) bir kayıt yeniden kullanılırken dosyanın yeniden yazıldığını,
+        arka plan yazmasının hatasının kaybolmadan loglandığını kontrol eder.
+        """
+        image = store_upload('a.jpg', b'icerik')
+        os.remove(image.image.path)  # arka plan yazması başarısız olmuş gibi
+        again = store_upload('b.jpg', b'icerik')
+        self.assertEqual(again.id, image.id)
+        with open(again.image.path, 'rb') as file:
+            self.assertEqual(file.read(), b'icerik')
+
+        def fail():
+            raise OSError('disk dolu')
+
+        with self.settings(UPLOAD_WRITE_IN_BACKGROUND=True), self.assertLogs('color_palette_app.background', 'ERROR'):
+            future = run_in_background(fail)
+            self.assertIsInstance(future.exception(timeout=5), OSError)
+
+    def test_last_palette_deletion_removes_upload(self):
+        image = store_upload('a.jpg', b'icerik')
+        path = image.image.path
+        palettes = [ColorPalette.objects.create(user=self.user, image=image, rgb_codes="#000000", k_value=1) for _ in range(2)]
+        image.refresh_from_db()
+        self.assertEqual(image.ref_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            palettes[0].delete()
+        image.refresh_from_db()
+        self.assertEqual(image.ref_count, 1)
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            palettes[1].delete()
+        self.assertFalse(ImageUpload.objects.filter(id=image.id).exists())
+        self.assertFalse(os.path.exists(path))
+
+    def test_dedupe_uploads_command(self):
+        """
+        Özeti olmayan eski kayıtların özetinin hesaplandığını ve kopyaların birleştirildiğini kontrol eder.
+        """
+        legacy = []
+        for name in ('eski1.jpg', 'eski2.jpg', 'eski3.jpg'):
+            image = ImageUpload()
+            image.image.save(name, ContentFile(b'farkli' if name == 'eski3.jpg' else b'kopya'), save=True)
+            legacy.append(image)
+        ColorPalette.objects.create(user=self.user, image=legacy[0], rgb_codes="#000000", k_value=1)
+        ColorPalette.objects.create(user=self.user, image=legacy[1], rgb_codes="#ffffff", k_value=1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_uploads', stdout=StringIO())
+
+        self.assertEqual(ImageUpload.objects.count(), 2)
+        keeper = ImageUpload.objects.get(content_hash=image_digest(b'kopya'))
+        self.assertEqual(keeper.id, legacy[0].id)
+        self.assertEqual(keeper.ref_count, 2)
+        self.assertEqual(ColorPalette.objects.filter(image=keeper).count(), 2)
+        self.assertFalse(os.path.exists(legacy[1].image.path))
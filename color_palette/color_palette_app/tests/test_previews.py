@@ -0,0 +1,66 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from color_palette_app.models import ColorPalette
+from color_palette_app.previews import get_or_create_preview, preview_name, sweep_previews
+from color_palette_app.views import store_upload
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_WRITE_IN_BACKGROUND=False)
+class PreviewTestCase(TestCase):
+    """
+    Bulanık/LAB önizlemelerinin istek anında, içerik adresli adlarla üretilmesini test eder.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        with open('media/test_images/small.jpg', 'rb') as img:
+            self.image = store_upload('small.jpg', img.read())
+        self.palette = ColorPalette.objects.create(user=self.user, image=self.image, rgb_codes="#000000", k_value=1)
+
+    def test_preview_name_depends_on_parameters(self):
+        name = get_or_create_preview(self.image, 'blurred', 5)
+        self.assertEqual(name, preview_name(self.image.content_hash, 'blurred', 5))
+        self.assertTrue(default_storage.exists(name))
+        # farklı tür ya da çekirdek farklı dosyaya yazılır, aynı istek aynı dosyayı döndürür
+        self.assertNotEqual(name, get_or_create_preview(self.image, 'lab', 5))
+        self.assertNotEqual(name, get_or_create_preview(self.image, 'blurred', 3))
+        self.assertEqual(name, get_or_create_preview(self.image, 'blurred', 5))
+
+    def test_palette_preview_view(self):
+        response = self.client.get(f'/palette_preview/{self.palette.id}/lab/?blur=3')
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(response['Location'].endswith(preview_name(self.image.content_hash, 'lab', 3)))
+        self.assertIn('max-age', response['Cache-Control'])
+
+        self.assertEqual(self.client.get(f'/palette_preview/{self.palette.id}/lab/?blur=4').status_code, 400)
+        self.assertEqual(self.client.get(f'/palette_preview/{self.palette.id}/hsv/').status_code, 404)
+
+    def test_sweep_previews(self):
+        name = get_or_create_preview(self.image, 'blurred', 5)
+        self.assertEqual(sweep_previews(max_age=60), 0)  # yeni önizleme silinmez
+
+        old = time.time() - 120
+        os.utime(default_storage.path(name), (old, old))
+        call_command('sweep_previews', '--max-age', '60', stdout=StringIO())
+        self.assertFalse(default_storage.exists(name))
+
+    def test_preview_hit_refreshes_age(self):
+        # önbellekteki önizleme her istekte yeniden kullanılmış sayılır, taramada silinmez; silindiyse yeniden üretilir
+        name = get_or_create_preview(self.image, 'blurred', 5)
+        old = time.time() - 120
+        os.utime(default_storage.path(name), (old, old))
+        self.assertEqual(get_or_create_preview(self.image, 'blurred', 5), name)
+        self.assertEqual(sweep_previews(max_age=60), 0)
+        self.assertTrue(default_storage.exists(name))
+
+        default_storage.delete(name)  # istekler arasında başka bir taramada silindi
+        response = self.client.get(f'/palette_preview/{self.palette.id}/blurred/?blur=5')
+        self.assertTrue(response['Location'].endswith(name))
+        self.assertTrue(default_storage.exists(name))
@@ -0,0 +1,164 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from django.test import TestCase, override_settings
+from django.contrib.auth.models import User
+from color_palette_app.background import start_search_index_warmup
+from color_palette_app.color_search import (
+    ColorGrid, PaletteSearchIndex, get_search_index, nearest_per_palette, reset_search_index, warm_search_index,
+)
+from color_palette_app.models import ColorPalette, ImageUpload
+from color_palette_app.palette_colors import replace_palette_colors
+
+
+class ColorGridTestCase(TestCase):
+    """Izgara indeksinin en yakın renk araması kaba kuvvet taramasıyla aynı sonucu vermeli, ekleme/silme tutarlı olmalı."""
+
+    def test_nearest_matches_brute_force(self):
+        rng = np.random.default_rng(0)
+        labs = np.column_stack([rng.uniform(0, 100, 3000), rng.uniform(-80, 80, 3000), rng.uniform(-80, 80, 3000)]).astype(np.float32)
+        palette_ids = np.repeat(np.arange(1, 601, dtype=np.int64), 5)
+        positions = np.tile(np.arange(5, dtype=np.int16), 600)
+        grid = ColorGrid.from_arrays(palette_ids, positions, labs)
+
+        for target in ([50, 0, 0], [95, -70, 75], [5, 60, -60], [150, 0, 0]):  # sonuncusu indeksin dışında
+            ids, distances, _ = grid.nearest(target, 10)
+            expected_ids, expected, _ = nearest_per_palette(palette_ids, np.linalg.norm(labs - target, axis=1), positions)
+            np.testing.assert_allclose(distances, expected[:10], atol=1e-4)
+            self.assertEqual(list(ids), list(expected_ids[:10]))
+
+        grid.remove(int(ids[0]))
+        self.assertNotIn(ids[0], grid.nearest([150, 0, 0], 10)[0])
+        grid.add(9999, [[150, 0, 0]])
+        self.assertEqual(grid.nearest([150, 0, 0], 1)[0][0], 9999)
+        self.assertEqual(len(grid), 3000 - 5 + 1)
+
+
+class PaletteSearchViewTestCase(TestCase):
+    """/palette_search/ uç noktasının testleri: renge ve palete göre sıralama, kullanıcı ayrımı, silme ve kalıcılık."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.settings_override = override_settings(PALETTE_SEARCH={
+            'INDEX_PATH': os.path.join(self.directory, 'index.npz'), 'SAVE_INTERVAL': 0,
+        })
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.image = ImageUpload.objects.create(image='test_image.jpg')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        reset_search_index()
+        shutil.rmtree(self.directory)
+
+    def create_palette(self, rgb_codes, user=None):
+        palette = ColorPalette.objects.create(user=user or self.user, image=self.image, rgb_codes='|'.join(rgb_codes),
+                                              k_value=len(rgb_codes))
+        replace_palette_colors([(palette.id, rgb_codes, None)])
+        return palette
+
+    def search(self, **params):
+        return self.client.get('/palette_search/', params).json()
+
+    def test_color_search_orders_by_delta_e(self):
+        blue = self.create_palette(['#1e90ff', '#ffffff'])
+        navy = self.create_palette(['#000080', '#ffff00'])
+        self.create_palette(['#ff0000', '#00ff00'])
+        self.create_palette(['#1e90ff'], user=User.objects.create_user(username='other', password='x'))  # başka kullanıcı
+
+        results = self.search(color='#1e8fff', n=2)['results']
+        self.assertEqual([row['palette_id'] for row in results], [blue.id, navy.id])
+        self.assertEqual((results[0]['color'], results[0]['position']), ('#1e90ff', 0))
+        self.assertLess(results[0]['delta_e'], 1)
+
+        # sonradan eklenen palet bir sonraki aramada bulunur, silinen palet sonuçlardan çıkar
+        exact = self.create_palette(['#1e8fff'])
+        self.assertEqual(self.search(color='1e8fff', n=1)['results'][0]['palette_id'], exact.id)
+        self.client.post(f'/delete_palette/{exact.id}/')
+        self.assertEqual(self.search(color='1e8fff', n=1)['results'][0]['palette_id'], blue.id)
+
+        self.assertEqual(self.client.get('/palette_search/', {'color': 'blue'}).status_code, 400)
+        self.assertEqual(self.client.get('/palette_search/', {'color': '#1e90ff', 'n': 500}).status_code, 400)
+
+    def test_similar_palettes_and_persistence(self):
+        query = self.create_palette(['#1e90ff', '#ffffff', '#000000'])
+        close = self.create_palette(['#2090f0', '#fafafa', '#101010'])
+        self.create_palette(['#ff0000', '#00ff00'])
+        results = self.search(palette=query.id, n=5)['results']
+        self.assertEqual(results[0]['palette_id'], close.id)
+        self.assertNotIn(query.id, [row['palette_id'] for row in results])
+        self.assertEqual(self.client.get('/palette_search/', {'palette': 999999}).status_code, 404)
+
+        # yeni bir süreç indeksi dosyadan yükler, yalnızca sonradan yazılan renkleri okur
+        path = get_search_index().path
+        self.assertTrue(os.path.exists(path))
+        later = self.create_palette(['#1e90ff'])
+        index = PaletteSearchIndex(path)
+        self.assertTrue(index.load())
+        self.assertNotIn(later.id, index.owners)
+        index.sync()
+        self.assertEqual(set(index.owners), set(ColorPalette.objects.values_list('id', flat=True)))
+
+
+    def test_warm_search_index(self):
+        """Açılışta ısıtılan indeksin ilk aramadan önce yüklendiğini, ayar kapalıysa ısıtmanın başlamadığını kontrol eder."""
+        palette = self.create_palette(['#1e90ff', '#ffffff'])
+        self.assertIsNone(start_search_index_warmup())  # testin PALETTE_SEARCH'ünde WARM_ON_STARTUP yok
+        index = warm_search_index()
+        self.assertIs(index, get_search_index())
+        self.assertTrue(index.loaded)
+        self.assertIn(palette.id, index.owners)
+        self.assertTrue(os.path.exists(index.path))
+
+
+class PaletteCompareViewTestCase(TestCase):
+    """/palette_compare/ uç noktasının ve ana sayfadaki benzerlik sıralamasının testleri."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.client.login(username='testuser', password='testpassword')
+        self.image = ImageUpload.objects.create(image='test_image.jpg')
+
+    def create_palette(self, rgb_codes, weights=None, user=None):
+        palette = ColorPalette.objects.create(user=user or self.user, image=self.image, rgb_codes='|'.join(rgb_codes),
+                                              k_value=len(rgb_codes))
+        replace_palette_colors([(palette.id, rgb_codes, weights)])
+        return palette
+
+    def test_compare_ranks_by_distance(self):
+        query = self.create_palette(['#000000', '#ffffff'], [0.8, 0.2])
+        same_colors = self.create_palette(['#000000', '#ffffff'], [0.7, 0.3])  # aynı renkler, farklı paylar
+        duplicate = self.create_palette(['#010101', '#fefefe'], [0.8, 0.2])
+        other = self.create_palette(['#ff0000', '#00ff00', '#0000ff'])
+        self.create_palette(['#000000', '#ffffff'], user=User.objects.create_user(username='other', password='x'))
+
+        data = self.client.get(f'/palette_compare/{query.id}/').json()
+        self.assertEqual((data['metric'], data['compared']), ('emd', 3))
+        self.assertEqual([row['palette_id'] for row in data['results']], [duplicate.id, same_colors.id, other.id])
+        self.assertLess(data['results'][0]['distance'], 1)
+
+        nearest = self.client.get(f'/palette_compare/{query.id}/', {'metric': 'nearest', 'max_distance': 1}).json()
+        self.assertEqual(sorted(row['palette_id'] for row in nearest['results']), sorted([duplicate.id, same_colors.id]))
+        self.assertEqual(self.client.get(f'/palette_compare/{query.id}/', {'metric': 'cosine'}).status_code, 400)
+
+        # ana sayfa aynı sıralamayı sayfa sayfa gösterir, ilk sırada seçilen palet vardır
+        with self.settings(PALETTES_PER_PAGE=2):
+            response = self.client.get('/home/', {'similar_to': query.id})
+            self.assertEqual([palette.id for palette in response.context['palettes']], [query.id, duplicate.id])
+            page = self.client.get('/home/palettes.json', {'similar_to': query.id, 'cursor': response.context['next_cursor']}).json()
+            self.assertEqual([row['id'] for row in page['palettes']], [same_colors.id, other.id])
+            self.assertIsNone(page['next_cursor'])
+        self.assertEqual(self.client.get('/home/', {'similar_to': 999999}).status_code, 404)
+
+    def test_compare_clips_oversized_palettes(self):
+        """Sınırdan önce kaydedilmiş çok büyük bir palet karşılaştırma dizilerini PALETTE_MAX_K'nın ötesine büyütmemeli."""
+        from color_palette_app.palette_compare import load_palette_matrix
+
+        self.create_palette(['#000000', '#ffffff'])
+        self.create_palette([f'#{i:06x}' for i in range(50)])
+        with self.settings(PALETTE_MAX_K=10):
+            _, labs, weights = load_palette_matrix(self.user.id)
+        self.assertEqual(labs.shape[1:], (10, 3))
+        np.testing.assert_allclose(weights.sum(axis=1), 1)
@@ -1,8 +1,45 @@
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.exceptions import ValidationError
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from io import BytesIO
+import struct
+import subprocess
+import sys
+import zlib
+import cv2
+import numpy as np
+from PIL import Image
+from color_palette_app.image_header import read_image_info
+from color_palette_app.imaging import decode_and_resize_image, choose_reduced_decode_flag, plan_decode
+from color_palette_app.tiled_decode import PngStripDecoder
 from color_palette_app.views import validate_image_format
 
+
+def png_with_all_filters(rows, color_type, palette=None):
+    """
+    Satırları sırayla None/Sub/Up/Average/Paeth filtreleriyle kodlanmış 8 bitlik bir PNG döndürür.
+    rows: (yükseklik, genişlik, kanal) uint8 dizi; Pillow kaydederken filtreleri kendisi seçtiği için elle kodlanır.
+    """
+    height, width, bands = rows.shape
+    raw = rows.reshape((height, width * bands)).astype(np.int64)
+    filtered, prior = [], np.zeros(width * bands, dtype=np.int64)
+    for y, x in enumerate(raw):
+        a = np.concatenate([np.zeros(bands, dtype=np.int64), x[:-bands]])  # soldaki piksel
+        c = np.concatenate([np.zeros(bands, dtype=np.int64), prior[:-bands]])  # sol üstteki piksel
+        p = a + prior - c
+        pa, pb, pc = np.abs(p - a), np.abs(p - prior), np.abs(p - c)
+        paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, prior, c))
+        predictor = [0, a, prior, (a + prior) // 2, paeth][y % 5]
+        filtered.append(bytes([y % 5]) + ((x - predictor) % 256).astype(np.uint8).tobytes())
+        prior = x
+
+    def chunk(chunk_type, data):
+        return struct.pack('>I', len(data)) + chunk_type + data + struct.pack('>I', zlib.crc32(chunk_type + data))
+
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))
+            + (chunk(b'PLTE', palette.tobytes()) if palette is not None else b'')
+            + chunk(b'IDAT', zlib.compress(b''.join(filtered), 9)) + chunk(b'IEND', b''))
+
 class UtilsTestCase(TestCase):
     """
     Yardımcı (utility) fonksiyonları test eden sınıf.
@@ -42,3 +79,115 @@ class UtilsTestCase(TestCase):
         corrupt_file = SimpleUploadedFile("corrupt_image.jpg", b"", content_type="image/jpeg")
         with self.assertRaises(ValidationError):  # ValidationError atmalı
             validate_image_format(corrupt_file)
+
+    def test_validate_image_format_reads_header_only(self):
+        """
+        Format kontrolünün başlık baytlarına göre yapıldığını ve dosya konumunu başa aldığını kontrol eder.
+        """
+        with open('media/test_images/small.jpg', 'rb') as img:
+            data = img.read()
+        uploaded_file = SimpleUploadedFile("small.jpg", data, content_type="image/jpeg")
+        self.assertIsNone(validate_image_format(uploaded_file))
+        self.assertEqual(uploaded_file.read(), data)
+
+        png_header = SimpleUploadedFile("header.png", b"\x89PNG\r\n\x1a\n" + b"\x00" * 8, content_type="image/png")
+        self.assertIsNone(validate_image_format(png_header))
+
+    def test_decode_and_resize_image(self):
+        """
+        Bellekteki görsel baytlarının tek seferde çözülüp çalışma boyutuna getirildiğini kontrol eder.
+        """
+        with open('media/test_images/small.jpg', 'rb') as img:
+            resized = decode_and_resize_image(img.read())
+        self.assertEqual(resized.shape, (200, 200, 3))
+
+        with self.assertRaises(ValidationError):
+            decode_and_resize_image(b"\xff\xd8\xff bozuk veri")
+
+    def test_choose_reduced_decode_flag(self):
+        """
+        Büyük JPEG'ler için hedef boyutun altına inmeyen en büyük küçültme oranının seçildiğini,
+        PNG ve küçük görsellerde tam çözmeye dönüldüğünü kontrol eder.
+        """
+        with open('media/test_images/small.jpg', 'rb') as img:  # 3456x3456
+            data = img.read()
+        self.assertEqual(choose_reduced_decode_flag(data, (200, 200)), cv2.IMREAD_REDUCED_COLOR_8)
+        self.assertEqual(choose_reduced_decode_flag(data, (1000, 1000)), cv2.IMREAD_REDUCED_COLOR_2)
+        self.assertEqual(choose_reduced_decode_flag(data, (2000, 2000)), cv2.IMREAD_COLOR)
+
+        _, png = cv2.imencode('.png', np.zeros((1000, 1000, 3), dtype=np.uint8))
+        self.assertEqual(choose_reduced_decode_flag(png.tobytes(), (200, 200)), cv2.IMREAD_COLOR)
+        self.assertEqual(decode_and_resize_image(png.tobytes()).shape, (200, 200, 3))
+
+    def test_read_image_info_and_pixel_limit(self):
+        """
+        Boyutların başlıktan okunduğunu ve sınırı aşan görsellerin (decompression bomb) çözülmeden reddedildiğini kontrol eder.
+        """
+        with open('media/test_images/small.jpg', 'rb') as img:
+            data = img.read()
+        self.assertEqual(read_image_info(data)[:3], ('JPEG', 3456, 3456))
+        _, png = cv2.imencode('.png', np.zeros((300, 500, 3), dtype=np.uint8))
+        self.assertEqual(read_image_info(png.tobytes())[:3], ('PNG', 500, 300))
+
+        # birkaç yüz baytlık, başlığında 100000x100000 yazan bir PNG
+        ihdr = b'IHDR' + struct.pack('>IIBBBBB', 100000, 100000, 8, 2, 0, 0, 0)
+        bomb = b"\x89PNG\r\n\x1a\n" + struct.pack('>I', 13) + ihdr + struct.pack('>I', zlib.crc32(ihdr))
+        with self.assertRaises(ValidationError):
+            validate_image_format(SimpleUploadedFile("bomb.png", bomb, content_type="image/png"))
+        with self.assertRaises(ValidationError):
+            decode_and_resize_image(bomb)
+        with override_settings(IMAGE_MAX_PIXELS=1000000), self.assertRaises(ValidationError):
+            validate_image_format(SimpleUploadedFile("small.jpg", data, content_type="image/jpeg"))
+
+    def test_png_strip_decoding(self):
+        """
+        PNG'nin şeritler halinde çözülmesinin, filtreler şeritler arasında taşınarak tam çözmeyle aynı pikselleri verdiğini
+        her renk tipi ve her satır filtresi (None/Sub/Up/Average/Paeth) için kontrol eder.
+        """
+        rng = np.random.default_rng(0)
+        pixels = cv2.resize(rng.integers(0, 256, (12, 16, 4), dtype=np.uint8), (160, 120))
+        palette = rng.integers(0, 256, (256, 3), dtype=np.uint8)
+        indices = pixels[..., :1]
+        cases = [
+            (0, pixels[..., :1], np.repeat(pixels[..., :1], 3, axis=2)),  # L
+            (2, pixels[..., :3], pixels[..., :3]),  # RGB
+            (3, indices, palette[indices[..., 0]]),  # P
+            (4, pixels[..., :2], np.repeat(pixels[..., :1], 3, axis=2)),  # LA, alfa yok sayılır
+            (6, pixels, pixels[..., :3]),  # RGBA
+        ]
+        for color_type, rows, expected in cases:
+            data = png_with_all_filters(rows, color_type, palette if color_type == 3 else None)
+            self.assertTrue(np.array_equal(np.asarray(Image.open(BytesIO(data)).convert('RGB')), expected))
+            for strip_rows in (1, 7, 120):
+                strips = PngStripDecoder(BytesIO(data), read_image_info(data)).strips(strip_rows)
+                self.assertTrue(np.array_equal(np.concatenate([rows for _, rows in strips]), expected))
+
+    def test_decode_in_strips_over_memory_budget(self):
+        """
+        Bellek bütçesini aşan PNG'lerin şeritler halinde çözülüp aynı biçimde (200, 200, 3) çalışma görüntüsüne
+        alan ortalamasıyla küçültüldüğünü, şeritlere uygun olmayanların reddedildiğini kontrol eder.
+        """
+        rng = np.random.default_rng(0)
+        pixels = cv2.resize(rng.integers(0, 256, (30, 40, 3), dtype=np.uint8), (1200, 800))
+        _, png = cv2.imencode('.png', pixels)
+        _, png16 = cv2.imencode('.png', pixels.astype(np.uint16) * 257)
+        with override_settings(IMAGE_DECODE_MEMORY_BUDGET=2 * 2 ** 20):
+            self.assertEqual(plan_decode(read_image_info(png.tobytes()), (200, 200))[0], 'strips')
+            resized = decode_and_resize_image(png.tobytes())
+            with self.assertRaises(ValidationError):
+                decode_and_resize_image(png16.tobytes())
+        self.assertEqual(resized.shape, (200, 200, 3))
+        expected = cv2.resize(pixels, (200, 200), interpolation=cv2.INTER_AREA)
+        self.assertTrue(np.array_equal(resized, expected))  # oranlar tam sayı: OpenCV'nin alan ortalamasıyla aynı
+
+    def test_views_import_is_lightweight(self):
+        """
+        URL yapılandırması ve görünümlerin yüklenmesinin OpenCV/numpy/scikit-learn'ü içe aktarmadığını kontrol eder
+        (görüntü işleme imaging.py'de, ilk kullanımda yüklenir). Temiz bir süreçte çalıştırılır.
+        """
+        code = (
+            "import os, sys, django; os.environ['DJANGO_SETTINGS_MODULE'] = 'color_palette.settings'; django.setup(); "
+            "import color_palette_app.urls; print(','.join(m for m in ('cv2', 'numpy', 'sklearn') if m in sys.modules))"
+        )
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.strip(), '')
@@ -1,7 +1,15 @@
-from django.test import TestCase
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from django.test import TestCase, override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import User
-from color_palette_app.models import ImageUpload, ColorPalette
+from django.core.management import call_command
+from django.utils import timezone
+from color_palette_app.jobs import claim_next_job, work
+from color_palette_app.models import ImageUpload, ColorPalette, PaletteColor, PaletteJob
+from color_palette_app.palette_cache import get_palette_cache
+from color_palette_app.views import store_upload
 
 class ViewsTestCase(TestCase):
     """
@@ -18,26 +26,57 @@ class ViewsTestCase(TestCase):
         """
         self.user = User.objects.create_user(username='testuser', password='testpassword')
         self.client.login(username='testuser', password='testpassword')
+        get_palette_cache().clear()  # önceki testlerin tam sonuçları önizleme yerine kullanılmasın
 
     def test_process_image_view(self):
         """
         /process_image/ görünümünü test eder:
-        - Geçerli bir görselin POST ile yüklenmesini ve işlenmesini kontrol eder.
-        - Renk paletinin oluşturulduğunu doğrular.
+        - Geçerli bir görselin POST ile yüklenmesini ve işin kuyruğa eklendiğini kontrol eder.
+        - Worker işi işledikten sonra renk paletinin oluşturulduğunu doğrular.
         """
         # Örnek bir test görseli oluştur
         with open('media/test_images/small.jpg', 'rb') as img:
             uploaded_file = SimpleUploadedFile('small.jpg', img.read(), content_type='image/jpeg')
 
-        # POST isteği ile görseli yükleyin ve işleyin
+        # POST isteği ile görseli yükleyin; istek yalnızca işi kuyruğa ekler
         response = self.client.post('/process_image/', {
             'image': uploaded_file,
             'k': 5,  # KMeans için kümelerin sayısı
             'blur_kernel': 5  # Gaussian Blur için kernel boyutu
         })
 
-        # Yanıtın başarılı olduğunu doğrula (200 OK)
+        # İş sayfasına yönlendirildiğini doğrula (302 Found)
+        job = PaletteJob.objects.get()
+        self.assertRedirects(response, f'/palette_job/{job.id}/', fetch_redirect_response=False)
+        self.assertEqual(job.status, PaletteJob.STATUS_QUEUED)
+
+        # Tam palet hesaplanmadan önce hızlı önizleme paleti kaydedilir ve iş sayfasında gösterilir
+        preview = ColorPalette.objects.get()
+        self.assertEqual((job.palette_id, len(preview.rgb_colors)), (preview.id, 5))
+        status = self.client.get(f'/palette_job/{job.id}/status/').json()
+        self.assertEqual((status['status'], status['rgb_codes']), ('queued', preview.rgb_colors))
+
+        # Worker işi işler, önizleme paleti yerinde güncellenir
+        call_command('palette_worker', '--once', stdout=StringIO())
+        job.refresh_from_db()
+        self.assertEqual(job.status, PaletteJob.STATUS_DONE)
+        self.assertEqual(job.palette_id, preview.id)
+
+        # Aynı görselin tam sonucu önbellekte: yeni iş kuyruğa girmeden tamamlanır
+        with open('media/test_images/small.jpg', 'rb') as img:
+            self.client.post('/process_image/', {'image': SimpleUploadedFile('small.jpg', img.read()), 'k': 5, 'blur_kernel': 5})
+        cached_job = PaletteJob.objects.latest('id')
+        self.assertEqual(cached_job.status, PaletteJob.STATUS_DONE)
+        self.assertEqual(cached_job.palette.rgb_codes, ColorPalette.objects.get(id=preview.id).rgb_codes)
+
+        # Durum uç noktası ve iş sayfası paleti döndürür
+        status = self.client.get(f'/palette_job/{job.id}/status/').json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(len(status['rgb_codes']), 5)
+        response = self.client.get(f'/palette_job/{job.id}/')
         self.assertEqual(response.status_code, 200)
+        colors = [color.hex for color in PaletteColor.objects.filter(palette_id=job.palette_id)]  # renkler renk tablosundan okunur
+        self.assertEqual((response.context['rgb_codes'], status['rgb_codes']), (colors, colors))
 
         # Yanıtta 'palette_image' değişkeninin bulunduğunu doğrula
         self.assertIn('palette_image', response.context)
@@ -45,6 +84,82 @@ class ViewsTestCase(TestCase):
         # Veritabanında bir ColorPalette nesnesi oluşturulduğunu doğrula
         self.assertTrue(ColorPalette.objects.exists())
 
+    def test_process_image_view_with_algorithm(self):
+        """
+        /process_image/ görünümünde seçilen palet algoritmasının kullanıldığını ve kaydedildiğini doğrular.
+        """
+        with open('media/test_images/small.jpg', 'rb') as img:
+            uploaded_file = SimpleUploadedFile('small.jpg', img.read(), content_type='image/jpeg')
+
+        self.client.post('/process_image/', {
+            'image': uploaded_file,
+            'k': 4,
+            'blur_kernel': 5,
+            'algorithm': 'octree'
+        })
+        call_command('palette_worker', '--once', stdout=StringIO())
+
+        palette = ColorPalette.objects.get()
+        self.assertEqual(palette.algorithm, 'octree')
+        self.assertEqual(len(palette.rgb_codes.split('|')), 4)
+
+    def test_palette_job_failure(self):
+        """
+        Çözülemeyen bir görselin işinin 'failed' durumuna geçtiğini ve hatanın kaydedildiğini doğrular.
+        """
+        uploaded_file = SimpleUploadedFile('broken.jpg', b'\xff\xd8\xff bozuk veri', content_type='image/jpeg')
+        self.client.post('/process_image/', {'image': uploaded_file, 'k': 3, 'blur_kernel': 5})
+        call_command('palette_worker', '--once', stdout=StringIO())
+
+        job = PaletteJob.objects.get()
+        self.assertEqual(job.status, PaletteJob.STATUS_FAILED)
+        self.assertTrue(job.error)
+        self.assertEqual(self.client.get(f'/palette_job/{job.id}/status/').json()['status'], 'failed')
+
+    def test_dead_worker_job_is_reclaimed(self):
+        """
+        Worker'ı ölmüş (heartbeat'i kiralama süresince yenilenmemiş) 'running' işin yeniden kuyruğa alınıp başka
+        bir worker'da tamamlandığını, deneme hakkı dolan işin 'failed' olduğunu doğrular.
+        """
+        with open('media/test_images/small.jpg', 'rb') as img:
+            self.client.post('/process_image/', {'image': SimpleUploadedFile('small.jpg', img.read()), 'k': 3, 'blur_kernel': 5})
+        job = claim_next_job('olu-worker')
+        self.assertIsNone(claim_next_job('diger-worker'))  # kiralama sürüyor, iş alınamaz
+
+        expired = timezone.now() - timedelta(seconds=121)
+        PaletteJob.objects.filter(id=job.id).update(heartbeat_at=expired)
+        self.assertEqual(work(worker_name='diger-worker', once=True), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.worker, job.attempts), (PaletteJob.STATUS_DONE, 'diger-worker', 2))
+
+        PaletteJob.objects.filter(id=job.id).update(status=PaletteJob.STATUS_RUNNING, heartbeat_at=expired, attempts=3)
+        self.assertIsNone(claim_next_job('diger-worker'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, PaletteJob.STATUS_FAILED)
+
+    def test_preview_deleted_while_job_running(self):
+        """
+        Önizleme paleti iş çalışırken silinirse işin iptal edildiğini, silinen paletin yeniden yazılmadığını ve
+        palet başka yoldan silindiyse işin paletsiz tamamlandığını doğrular.
+        """
+        from color_palette_app.jobs import run_job
+
+        for _ in range(2):
+            with open('media/test_images/small.jpg', 'rb') as img:
+                self.client.post('/process_image/', {'image': SimpleUploadedFile('small.jpg', img.read()), 'k': 3, 'blur_kernel': 5})
+        cancelled, orphaned = claim_next_job('worker'), claim_next_job('worker')
+
+        self.client.post(f'/delete_palette/{cancelled.palette_id}/')
+        run_job(cancelled)
+        self.assertEqual((cancelled.status, cancelled.palette_id), (PaletteJob.STATUS_FAILED, None))
+        self.assertIn('iptal', cancelled.error)
+
+        orphaned.palette.delete()  # SET_NULL, iş hâlâ 'running'
+        run_job(orphaned)
+        orphaned.refresh_from_db()
+        self.assertEqual((orphaned.status, orphaned.palette_id, orphaned.error), (PaletteJob.STATUS_DONE, None, ''))
+        self.assertFalse(ColorPalette.objects.exists())
+
     def test_edit_palette_view(self):
         """
         /edit_palette/<palette_id>/ görünümünü test eder:
@@ -74,6 +189,125 @@ class ViewsTestCase(TestCase):
         print("Güncellenen RGB Kodları:", updated_palette.rgb_codes)  # Hata ayıklama çıktısı
         self.assertIn("#123456", updated_palette.rgb_codes)  # Yeni renk kodlarının kaydedildiğini kontrol et
 
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_WRITE_IN_BACKGROUND=False)
+    def test_palette_sweep_view(self):
+        """
+        /palette_sweep/<palette_id>/ görünümünü test eder:
+        - Aralıktaki her k için palet ve skorların ve önerilen k'nın tek yanıtta döndüğünü,
+        - POST ile seçilen k'nın palete kaydedildiğini ve geçersiz aralığın reddedildiğini kontrol eder.
+        """
+        with open('media/test_images/small.jpg', 'rb') as img:
+            image = store_upload('small.jpg', img.read())
+        palette = ColorPalette.objects.create(user=self.user, image=image, rgb_codes='#000000', k_value=1)
+
+        data = self.client.get(f'/palette_sweep/{palette.id}/', {'k_min': 2, 'k_max': 5}).json()
+        self.assertEqual([row['k'] for row in data['palettes']], [2, 3, 4, 5])
+        self.assertEqual([len(row['rgb_codes']) for row in data['palettes']], [2, 3, 4, 5])
+        self.assertIn(data['suggested_k'], [2, 3, 4, 5])
+        self.assertFalse(data['cached'])
+        self.assertTrue(self.client.get(f'/palette_sweep/{palette.id}/', {'k_min': 2, 'k_max': 5}).json()['cached'])
+
+        response = self.client.post(f'/palette_sweep/{palette.id}/', {'k_min': 2, 'k_max': 5, 'k': 4})
+        self.assertEqual(response.json()['k'], 4)
+        palette.refresh_from_db()
+        self.assertEqual((palette.k_value, palette.rgb_colors), (4, data['palettes'][2]['rgb_codes']))
+
+        self.assertEqual(self.client.get(f'/palette_sweep/{palette.id}/', {'k_min': 6, 'k_max': 5}).status_code, 400)
+        self.assertEqual(self.client.post(f'/palette_sweep/{palette.id}/', {'k_min': 2, 'k_max': 5, 'k': 9}).status_code, 400)
+
+    @override_settings(MEDIA_ROOT=tempfile.mkdtemp(), UPLOAD_WRITE_IN_BACKGROUND=False)
+    def test_edit_palette_reclusters_from_cached_histogram(self):
+        """
+        edit_palette'in paletin blur değerini kullandığını, k değişince mevcut renklerden yeniden kümelediğini
+        ve ikinci düzenlemede görseli okumadan önbellekteki LAB histogramını kullandığını kontrol eder.
+        """
+        from unittest import mock
+        from color_palette_app import views
+
+        with open('media/test_images/small.jpg', 'rb') as img:
+            image = store_upload('small.jpg', img.read())
+        palette = ColorPalette.objects.create(user=self.user, image=image, rgb_codes='#000000|#ffffff|#ff0000',
+                                              k_value=3, blur_kernel=7)
+
+        response = self.client.post(f'/edit_palette/{palette.id}/', {'k': 5})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('blur=7', response.context['blurred_image_url'])
+        palette.refresh_from_db()
+        self.assertEqual((palette.k_value, palette.blur_kernel, len(palette.rgb_colors)), (5, 7, 5))
+
+        with mock.patch.object(views, 'read_field_file', side_effect=AssertionError('görsel okunmamalı')):
+            response = self.client.post(f'/edit_palette/{palette.id}/', {'k': 2})
+        self.assertEqual(len(response.context['rgb_codes']), 2)
+        palette.refresh_from_db()
+        self.assertEqual(palette.k_value, 2)
+
+        response = self.client.post(f'/edit_palette/{palette.id}/', {'blur_kernel': 4})
+        self.assertEqual(response.context['error'], 'Blur kernel değeri tek sayı olmalıdır.')
+        for k in (0, 1000):  # sınır dışındaki k hiçbir şey hesaplanmadan reddedilir
+            response = self.client.post(f'/edit_palette/{palette.id}/', {'k': k})
+            self.assertEqual(response.context['error'], '"k" değeri 1 ile 20 arasında olmalıdır.')
+
+    def test_palette_image_view(self):
+        """
+        /palette_image/<palette_id>.<format> görünümünü test eder:
+        - Palet görselinin rgb kodlarından üretildiğini, ETag ve Cache-Control başlıklarını,
+        - If-None-Match ile koşullu GET'te 304 döndüğünü kontrol eder.
+        """
+        image = ImageUpload.objects.create(image='test_image.jpg')
+        palette = ColorPalette.objects.create(user=self.user, image=image, rgb_codes="#ff0000|#00ff00", k_value=2)
+
+        response = self.client.get(f'/palette_image/{palette.id}.png')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response.content.startswith(b'\x89PNG'))
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get(f'/palette_image/{palette.id}.png', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(f'/palette_image/{palette.id}.svg')
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+        self.assertIn(b'fill="#00ff00"', response.content)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # palet düzenlenince ETag ve görsel url'si değişir
+        old_url = palette.palette_image_url
+        palette.rgb_codes = "#0000ff"
+        palette.save()
+        self.assertNotEqual(palette.palette_image_url, old_url)
+        self.assertEqual(self.client.get(f'/palette_image/{palette.id}.png', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        # başka kullanıcının paleti ve bilinmeyen format 404 döner
+        other = User.objects.create_user(username='other', password='testpassword')
+        other_palette = ColorPalette.objects.create(user=other, image=image, rgb_codes="#ffffff", k_value=1)
+        self.assertEqual(self.client.get(f'/palette_image/{other_palette.id}.png').status_code, 404)
+        self.assertEqual(self.client.get(f'/palette_image/{palette.id}.gif').status_code, 404)
+
+    @override_settings(PALETTES_PER_PAGE=2)
+    def test_home_keyset_pagination(self):
+        """
+        Ana sayfanın ve json listesinin paletleri en yeniden eskiye, imleçle sayfaladığını doğrular.
+        """
+        image = ImageUpload.objects.create(image='test_image.jpg')
+        palettes = [ColorPalette.objects.create(user=self.user, image=image, rgb_codes=f"#00000{i}", k_value=1) for i in range(5)]
+        ColorPalette.objects.update(created_at=palettes[0].created_at)  # aynı zaman damgasında id sırası belirleyicidir
+        expected = [p.id for p in reversed(palettes)]
+
+        response = self.client.get('/home/')
+        self.assertEqual([p.id for p in response.context['palettes']], expected[:2])
+        self.assertEqual(response.context['palettes'][0].rgb_colors, ['#000004'])
+
+        seen, cursor = [], None
+        while True:
+            data = self.client.get('/home/palettes.json', {'cursor': cursor} if cursor else {}).json()
+            seen += [p['id'] for p in data['palettes']]
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+        self.assertEqual(self.client.get('/home/palettes.json', {'cursor': 'bozuk'}).status_code, 400)
+
     def test_delete_palette_view(self):
         """
         /delete_palette/<palette_id>/ görünümünü test eder:
@@ -0,0 +1,223 @@
+import struct
+import zlib
+from io import BytesIO
+import numpy as np
+from PIL import Image
+
+# Çok büyük PNG'lerin sınırlı bellekle çözülmesi: görsel baştan sona yatay şeritler (strip) halinde çözülür ve her
+# şerit hemen çalışma boyutuna alan ortalamasıyla (area average) küçültülüp bir toplayıcıya eklenir. Bellekte aynı
+# anda en fazla bir şerit ve çalışma boyutunda bir toplam dizisi bulunur; tam boyutlu görüntü hiç oluşturulmaz.
+# Satırların filtresi (PNG filter) Pillow'un herkese açık API'siyle (Image.open) açılır: her şeridin filtreli satırları,
+# bir önceki şeridin son satırı filtresiz (None) bir satır olarak başa eklenip bellekte ayrı, küçük bir PNG'ye
+# (sıkıştırmasız zlib) konur; böylece Up/Average/Paeth filtrelerinin ihtiyaç duyduğu önceki satır şeritler arasında
+# taşınır. Bunun için çözülen satır ham PNG satırıyla aynı baytlara sahip olmalıdır: yalnızca 8 bitlik, taramasız
+# (non-interlaced) PNG'ler şeritler halinde çözülebilir.
+
+READ_SIZE = 64 * 1024  # dosyadan tek seferde okunan sıkıştırılmış veri
+INFLATE_SIZE = 256 * 1024  # tek seferde açılan filtreli veri
+ACCUMULATE_BYTES = 4 * 2 ** 20  # toplayıcının uint64'e çevirdiği satır bloğunun en büyük boyutu
+STRIP_MODES = {0: ('L', 1), 2: ('RGB', 3), 3: ('P', 1), 4: ('LA', 2), 6: ('RGBA', 4)}  # IHDR renk tipi -> (mod, kanal)
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+STORED_BLOCK = 0xffff  # sıkıştırmasız bir deflate bloğunun en büyük boyu
+
+
+def can_decode_in_strips(info, size):
+    """Görsel şeritler halinde çözülebilir mi: 8 bit, taramasız PNG ve her çıkış pikseline en az bir kaynak pikseli."""
+    return (info.format == 'PNG' and info.bit_depth == 8 and not info.interlaced and info.color_type in STRIP_MODES
+            and info.width >= size[0] and info.height >= size[1])
+
+
+def strip_row_bytes(info):
+    """
+    Şeritteki bir satırın tahmini bellek maliyeti: açılmış filtreli satır ve şeridin PNG'sindeki kopyası, Pillow
+    görüntüsü (gri/paletli piksel başına 1, diğerleri 4 bayt), görüntünün numpy kopyası ve RGB hali.
+    """
+    _, bands = STRIP_MODES[info.color_type]
+    pillow_bytes = 1 if bands == 1 else 4
+    return 2 * (info.width * bands + 1) + info.width * (pillow_bytes + bands + 3)
+
+
+def plan_strips(info, size, budget):
+    """Bellek bütçesine sığan şerit yüksekliği ve çözmenin tahmini tepe belleği: (şerit satır sayısı, bayt)."""
+    # toplam dizisi, uint64 satır bloğu, okuma ve açma tamponları, zlib penceresi
+    fixed = size[0] * size[1] * 3 * 8 + 2 * ACCUMULATE_BYTES + 2 * READ_SIZE + 2 * INFLATE_SIZE + 64 * 1024
+    rows = int(min(info.height, max(1, (budget - fixed) // strip_row_bytes(info))))
+    return rows, fixed + rows * strip_row_bytes(info)
+
+
+class AreaAccumulator:
+    """
+    Şeritleri (y0, RGB satırları) alıp size = (genişlik, yükseklik) boyutunda alan ortalaması üreten toplayıcı.
+    Her kaynak sütunu/satırı tek bir çıkış pikseline düşer (x * genişlik // kaynak genişliği), çıkış pikseli
+    kendisine düşen kaynak piksellerinin ortalamasıdır.
+    """
+
+    def __init__(self, width, height, size):
+        self.height = height
+        self.out_width, self.out_height = size
+        self.column_starts = -(-np.arange(self.out_width) * width // self.out_width)  # her çıkış sütununun ilk kaynak sütunu
+        self.column_counts = np.diff(np.append(self.column_starts, width))
+        self.sums = np.zeros((self.out_height, self.out_width, 3))
+        self.row_counts = np.zeros(self.out_height)
+
+    def add(self, y0, rows):
+        # reduceat girdiyi uint64'e çevirir; şeridin tamamı yerine ACCUMULATE_BYTES'lık satır blokları çevrilir
+        block = max(1, ACCUMULATE_BYTES // (rows.shape[1] * 3 * 8))
+        for start in range(0, len(rows), block):
+            self._add_block(y0 + start, rows[start:start + block])
+
+    def _add_block(self, y0, rows):
+        columns = np.add.reduceat(rows, self.column_starts, axis=1, dtype=np.uint64)  # (şerit, çıkış genişliği, 3)
+        targets = np.arange(y0, y0 + len(rows)) * self.out_height // self.height
+        starts = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]])
+        self.sums[targets[starts]] += np.add.reduceat(columns, starts, axis=0)
+        self.row_counts += np.bincount(targets, minlength=self.out_height)
+
+    def result(self):
+        counts = self.row_counts[:, None, None] * self.column_counts[None, :, None]
+        return np.rint(self.sums / counts).astype(np.uint8)
+
+
+class PngStripDecoder:
+    """8 bitlik taramasız bir PNG'yi dosyadan okuyarak satır şeritleri halinde RGB uint8 dizilere çözer."""
+
+    def __init__(self, file, info):
+        self.file = file
+        self.width, self.height = info.width, info.height
+        self.mode, self.bands = STRIP_MODES[info.color_type]
+        self.row_length = self.width * self.bands + 1  # filtre tipi baytı + piksel baytları
+        self.palette = None
+        self.previous = None  # bir önceki şeridin son satırının ham baytları
+        self.inflater = zlib.decompressobj()
+        self.idat_remaining = self._find_first_idat()
+
+    def _read_chunk_header(self):
+        header = self.file.read(8)
+        if len(header) < 8:
+            raise ValueError('PNG verisi beklenenden önce bitti.')
+        return struct.unpack('>I4s', header)
+
+    def _find_first_idat(self):
+        self.file.seek(8)
+        while True:
+            length, chunk_type = self._read_chunk_header()
+            if chunk_type == b'IDAT':
+                return length
+            if chunk_type == b'PLTE':
+                colors = np.frombuffer(self.file.read(length), dtype=np.uint8).reshape((-1, 3))
+                self.palette = np.zeros((256, 3), dtype=np.uint8)
+                self.palette[:len(colors)] = colors
+                self.file.seek(4, 1)  # crc
+            else:
+                self.file.seek(length + 4, 1)
+
+    def _compressed(self):
+        """Sıradaki sıkıştırılmış veri parçası; ardışık IDAT chunk'ları tek bir zlib akışıdır. Veri bittiyse b''."""
+        while self.idat_remaining == 0:
+            self.file.seek(4, 1)  # önceki IDAT'ın crc'si
+            length, chunk_type = self._read_chunk_header()
+            if chunk_type != b'IDAT':
+                self.idat_remaining = None
+                return b''
+            self.idat_remaining = length
+        if self.idat_remaining is None:
+            return b''
+        data = self.file.read(min(READ_SIZE, self.idat_remaining))
+        self.idat_remaining -= len(data)
+        return data
+
+    def _filtered_rows(self, count):
+        """Sıradaki count satırın filtreli baytları, en fazla INFLATE_SIZE'lık parçalar listesi halinde."""
+        parts, remaining = [], count * self.row_length
+        while remaining:
+            data = self.inflater.unconsumed_tail or self._compressed()
+            if not data:
+                raise ValueError('PNG verisi beklenenden önce bitti.')
+            part = self.inflater.decompress(data, min(remaining, INFLATE_SIZE))
+            if part:
+                parts.append(part)
+            remaining -= len(part)
+        return parts
+
+    def _strip_png(self, parts, rows):
+        """
+        Filtreli satır parçalarını tek başına çözülebilen bir PNG'ye koyar; verilen parçalar hemen bırakılır.
+        Satırlar sıkıştırılmadan (stored) deflate bloklarına yazılır, böylece PNG'nin boyu baştan bilinir ve bellek
+        bir kez ayrılır.
+        """
+        data_length = sum(len(part) for part in parts)
+        blocks = sum(-(-len(part) // STORED_BLOCK) for part in parts)
+        idat_length = 2 + 5 * blocks + data_length + 4  # zlib başlığı, blok başlıkları, veri, adler32
+        png = BytesIO()
+        png.seek(len(PNG_SIGNATURE) + 25 + 12 + idat_length + 12 - 1)
+        png.write(b'\0')
+        png.seek(0)
+        # paletli görsellerde renk tablosu burada uygulanır, şerit indeksleri gri tonlu (renk tipi 0) bir PNG olarak çözülür
+        color_type = {'L': 0, 'P': 0, 'RGB': 2, 'LA': 4, 'RGBA': 6}[self.mode]
+        png.write(PNG_SIGNATURE)
+        write_png_chunk(png, b'IHDR', struct.pack('>IIBBBBB', self.width, rows, 8, color_type, 0, 0, 0))
+        png.write(struct.pack('>I', idat_length) + b'IDAT')
+        crc, adler = zlib.crc32(b'IDAT'), zlib.adler32(b'')
+        written = 0
+
+        def put(data):
+            nonlocal crc
+            png.write(data)
+            crc = zlib.crc32(data, crc)
+
+        put(b'\x78\x01')
+        for index in range(len(parts)):
+            view = memoryview(parts[index])
+            for start in range(0, len(view), STORED_BLOCK):
+                block = view[start:start + STORED_BLOCK]
+                written += len(block)
+                put(struct.pack('<BHH', written == data_length, len(block), 0xffff ^ len(block)))  # son blok işaretlenir
+                put(block)
+            adler = zlib.adler32(view, adler)
+            view.release()
+            parts[index] = None
+        put(struct.pack('>I', adler))
+        png.write(struct.pack('>I', crc))
+        write_png_chunk(png, b'IEND', b'')
+        png.seek(0)
+        return png
+
+    def _decode(self, parts, rows):
+        # önceki şeridin son satırı filtresiz bir satır olarak başa eklenir, çözücü onu Up/Average/Paeth için kullanır
+        if self.previous is not None:
+            parts.insert(0, b'\x00' + self.previous)  # yeni liste yapılmaz: parçalar çağıranın listesinde de bırakılmalı
+            rows += 1
+        with Image.open(self._strip_png(parts, rows), formats=['PNG']) as image:
+            pixels = np.asarray(image)
+        if self.previous is not None:
+            pixels = pixels[1:]
+        self.previous = pixels[-1].tobytes()  # 8 bitte görüntü satırı ham PNG satırıyla aynı baytlardır
+        return pixels
+
+    def _to_rgb(self, pixels):
+        if self.mode == 'P':
+            return self.palette[pixels]
+        if self.mode in ('L', 'LA'):  # alfa, OpenCV'nin IMREAD_COLOR'ı gibi yok sayılır
+            gray = pixels if pixels.ndim == 2 else pixels[..., 0]
+            return np.repeat(gray[..., None], 3, axis=2)
+        return pixels[..., :3]
+
+    def strips(self, strip_rows):
+        """(ilk satır, RGB uint8 satırlar) şeritleri üretir."""
+        for y0 in range(0, self.height, strip_rows):
+            rows = min(strip_rows, self.height - y0)
+            yield y0, self._to_rgb(self._decode(self._filtered_rows(rows), rows))
+
+
+def write_png_chunk(file, chunk_type, data):
+    file.write(struct.pack('>I', len(data)) + chunk_type)
+    file.write(data)
+    file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+
+def decode_png_in_strips(file, info, size, strip_rows):
+    """PNG'yi şeritler halinde çözüp size boyutuna alan ortalamasıyla küçültür: cv2.resize ile aynı biçimde BGR uint8."""
+    accumulator = AreaAccumulator(info.width, info.height, size)
+    for y0, rows in PngStripDecoder(file, info).strips(strip_rows):
+        accumulator.add(y0, rows)
+    return np.ascontiguousarray(accumulator.result()[..., ::-1])
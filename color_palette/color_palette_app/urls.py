@@ -1,15 +1,35 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 from django.contrib.auth import views as auth_views
 
+# ASGI dağıtımında (asgi.py) yükleme, düzenleme ve toplu yükleme görünümlerinin async sürümleri kullanılır
+if getattr(settings, 'PALETTE_ASYNC_VIEWS', False):
+    process_image_view, edit_palette_view = views.process_image_async, views.edit_palette_async
+    process_batch_view = views.process_batch_async
+else:
+    process_image_view, edit_palette_view = views.process_image, views.edit_palette
+    process_batch_view = views.process_batch
+
 urlpatterns = [
     path('', views.register, name='register'),  # İlk olarak register açılsın
     path('register/', views.register, name='register'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),  # Logout işlemi GET ve POST destekler
     path('home/', views.home, name='home'),
-    path('process_image/', views.process_image, name='process_image'), # Görsellerin işlemesi
+    path('home/palettes.json', views.palette_list_json, name='palette_list_json'), # Sonsuz kaydırma için palet listesi
+    path('process_image/', process_image_view, name='process_image'), # Görsellerin işlemesi
+    path('process_batch/', process_batch_view, name='process_batch'), # Çoklu görsel yükleme (ilerleme akışı)
+    path('palette_job/<int:job_id>/', views.palette_job, name='palette_job'), # Kuyruğa eklenen işin sayfası
+    path('palette_job/<int:job_id>/status/', views.palette_job_status, name='palette_job_status'), # İş durumu (json)
+    path('palette_image/<int:palette_id>.<str:image_format>', views.palette_image_view, name='palette_image'), # Palet görseli (png/svg)
+    path('palette_preview/<int:palette_id>/<str:kind>/', views.palette_preview, name='palette_preview'), # Bulanık/LAB önizleme
+    path('palette_sweep/<int:palette_id>/', views.palette_sweep, name='palette_sweep'), # Çoklu k taraması (json)
+    path('palette_search/', views.palette_search, name='palette_search'), # Renge/palete göre palet araması (json)
+    path('palette_compare/<int:palette_id>/', views.palette_compare, name='palette_compare'), # Paleti diğer paletlerle karşılaştırma (json)
+    path('export_palettes/', views.export_palettes, name='export_palettes'), # Tüm paletlerin ZIP olarak dışa aktarımı
     path('delete_palette/<int:palette_id>/', views.delete_palette, name='delete_palette'),
-    path('edit_palette/<int:palette_id>/', views.edit_palette, name='edit_palette'),
+    path('edit_palette/<int:palette_id>/', edit_palette_view, name='edit_palette'),
+    path('metrics/', views.metrics_view, name='metrics'), # Prometheus metrikleri
     path('update_profile/', views.update_profile, name='update_profile'),
 ]
\ No newline at end of file
@@ -1,103 +1,143 @@
+import json
 import os
-import cv2 # opencv'nin kütüphanesi
-import numpy as np
-from django.shortcuts import render, redirect, get_object_or_404
+import re
+import secrets
+import threading
+from asgiref.sync import sync_to_async
+from django.shortcuts import render, redirect, get_object_or_404, aget_object_or_404
 from .forms import ImageUploadForm, UserRegisterForm, UserUpdateForm
-from .models import ImageUpload, ColorPalette
+from .models import ImageUpload, ColorPalette, PaletteColor, PaletteJob, PALETTE_ALGORITHMS, PALETTE_METRICS, palette_image_etag
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect
-from io import BytesIO
-import base64
-from sklearn.cluster import KMeans # KMeans algoritması için kullanılan kütüphane
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.conf import settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import content_disposition_header, urlencode
 from django.core.exceptions import ValidationError
-from PIL import Image
+from django.db import IntegrityError, transaction
+from django.db.models import Prefetch
 from django.core.files.base import ContentFile
-
-# Ortak kullanılan fonksiyonlar
+from django.core.files.storage import default_storage
+from .background import run_in_background
+from .batch import PaletteBatch
+from .concurrency import PipelineBusy
+from .image_header import check_image_pixels, read_image_info
+from .pagination import keyset_page
+from .palette_cache import image_digest
+from .palette_colors import hex_to_rgb, replace_palette_colors, rgb_to_lab
+from .palette_export import aiter_in_thread, export_palettes_zip
+from .metrics import render_metrics, timed_stage # Server-Timing ve /metrics için aşama süreleri
+# Görüntü işleme (OpenCV, numpy, scikit-learn) imaging.py'dedir ve yalnızca gerektiği görünümlerde içe aktarılır.
+
+IMAGE_SIGNATURES = {  # dosya başlığındaki sihirli baytlar (magic bytes) ve karşılık gelen formatlar
+    b'\xff\xd8\xff': 'JPEG',
+    b'\x89PNG\r\n\x1a\n': 'PNG',
+}
+
+def detect_image_format(header):
+    for signature, image_format in IMAGE_SIGNATURES.items():
+        if header.startswith(signature):
+            return image_format
+    return None
+
+@timed_stage('validate')
 def validate_image_format(uploaded_file): # görsellerin formatını doğrulayan fonksiyon 
     """
     Yüklenen görselin formatını kontrol eder. 
     Sadece JPEG ve PNG formatlarını kabul eder.
+    Görsel çözülmez, yalnızca dosyanın ilk baytları (başlık) okunur. Başlıktaki boyut IMAGE_MAX_PIXELS'ı
+    aşıyorsa (decompression bomb) görsel reddedilir; boyut okunamıyorsa karar çözmeye bırakılır.
     """
     try:
-        image = Image.open(uploaded_file)
-        if image.format not in ['JPEG', 'PNG']:
-            raise ValidationError('Sadece JPEG ve PNG formatındaki görseller desteklenir.')
+        uploaded_file.seek(0)
+        header = uploaded_file.read(16)
+        uploaded_file.seek(0)
+        info = read_image_info(uploaded_file)
+        uploaded_file.seek(0)
     except Exception:
         raise ValidationError('Geçersiz görsel formatı.')
+    if detect_image_format(header) is None:
+        raise ValidationError('Sadece JPEG ve PNG formatındaki görseller desteklenir.' if header else 'Geçersiz görsel formatı.')
+    check_image_pixels(info)
+
+_upload_writes = {}  # bu süreçte arka planda yazılmakta olan yüklemeler: ImageUpload id -> Future
+_upload_writes_lock = threading.Lock()
+
+def upload_file_missing(image_instance):
+    """Kaydın dosyası depolamada yoksa ve bu süreçte yazılmakta da değilse True döner."""
+    with _upload_writes_lock:
+        if image_instance.pk in _upload_writes:
+            return False
+    return not image_instance.image.storage.exists(image_instance.image.name)
+
+def write_upload_file(image_instance, name, data):
+    """
+    Yüklemenin dosyasını depolamaya arka planda yazar. Yazma hatası background.py'de loglanır; kayıt kalır ama
+    aynı içerik yeniden yüklendiğinde store_upload eksik dosyayı fark edip yeniden yazar.
+    """
+    field = ImageUpload._meta.get_field('image')
+
+    def write_file():
+        saved_name = field.storage.save(name, ContentFile(data), max_length=field.max_length)
+        if saved_name != image_instance.image.name:
+            ImageUpload.objects.filter(pk=image_instance.pk).update(image=saved_name)
+
+    future = run_in_background(write_file)
+    with _upload_writes_lock:
+        _upload_writes[image_instance.pk] = future
+
+    def forget(done):
+        with _upload_writes_lock:
+            if _upload_writes.get(image_instance.pk) is done:
+                del _upload_writes[image_instance.pk]
 
-def load_and_resize_image(image_path, size=(200, 200)):  # görsel yükleme ve yeniden boyutlandırma fonks.
-    img = cv2.imread(image_path) # görsel okuma fonksiyonu ve yolu
-    if img is None:
-        raise FileNotFoundError(f"Image not found: {image_path}") 
-    return cv2.resize(img, size)
-
-def apply_gaussian_blur(image, kernel_size=(5, 5)): # gaussian blur fonks. kernel 5,5 parametresi alınmış test için değiştirilebilir
-    return cv2.GaussianBlur(image, kernel_size, 0)
-
-def convert_to_lab(image): # görseli RGB'den LAB renk uzayına çevirme
-    return cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-
-def apply_kmeans(image, k=5):
-    """
-    Görüntüdeki baskın renkleri bulmak için KMeans algoritmasını uygular.
-    
-    Parametreler:
-    - image: İşlenecek görüntü (numpy array formatında, LAB renk uzayında olmalı).
-    - k: KMeans algoritmasında kullanılacak küme sayısı (varsayılan 5).
-
-    Dönüş:
-    - kmeans.cluster_centers_: Bulunan renk kümelerinin merkez koordinatları (LAB formatında).
-    """
-    pixels = image.reshape((-1, 3))  # Görüntüyü 2 boyutlu bir matris haline getir (piksel sayısı x 3 renk kanalı)
-    """KMeans algoritmasını başlat:
-        - n_clusters: k değeri, yani kaç renk kümesi oluşturulacak
-        - random_state: Tekrar edilebilirlik için sabit rastgelelik
-        - max_iter: Maksimum yineleme sayısı
-        - n_init: Algoritma farklı başlangıç noktalarıyla kaç kez çalıştırılacak
-    """
-    kmeans = KMeans(n_clusters=k, random_state=42, max_iter=1000, n_init=10) 
-    kmeans.fit(pixels) # algoritmayı pikseller üzerinde çalıştırır. 
-    return kmeans.cluster_centers_  # küme merkezlerini (baskın renkler) döndürür.
-
-def lab_to_rgb(centroids): # L(ight)AB (renk bileşenler) formatındaki renkleri RGB formatına dönüştürür. centroids: LAB formatında renk merkezleri her bir kümenin merkezini hesaplar renk değerlerinin ortalamasını temsil eder.
-    lab_image = np.uint8([centroids]) # LAB formatındaki renk merkezlerini uint8 türüne dönüştür (0-255 aralığında)
-    rgb_image = cv2.cvtColor(lab_image, cv2.COLOR_LAB2RGB)
-    return rgb_image[0]
-
-def visualize_palette(colors): # paleti görselleştirmek için fonksiyon
-    palette_width = 100 * len(colors) # paletin genişliği: Her renk için 100 piksel genişlik
-    palette_height = 100
-    palette_image = np.zeros((palette_height, palette_width, 3), dtype=np.uint8) # siyah bir arka plan oluştur (palet boyutlarında boş bir görsel)
-    """ 
-    Aşağıdaki for döngüsü her rengi görsele ekler, rengin başladığı ve bittiği yatay pixelleri alır renk değerlerini sınırlar
-    palet görseline göre yerleştirir
-    """
-    for idx, color in enumerate(colors):
-        start_x = idx * 100
-        end_x = start_x + 100
-        color = np.clip(color, 0, 255)
-        palette_image[:, start_x:end_x, :] = color
-
-    return palette_image
-
-def save_palette_to_base64(palette_image):
-    # Görseli base64 formatında kaydetme
-    _, buffer = cv2.imencode('.png', palette_image)
-    img_str = base64.b64encode(buffer).decode('utf-8')
-    return img_str
-
-def save_image_to_file(image, filename):
-    # Görseli kaydetme fonksiyonu
-    output_path = os.path.join('media', filename)
-    cv2.imwrite(output_path, image)
-    return output_path
+    future.add_done_callback(forget)  # future zaten bittiyse hemen çağrılır
+
+@timed_stage('store')
+def store_upload(filename, data):
+    """
+    Yüklenen dosya için ImageUpload kaydını döndürür. Aynı içerik daha önce yüklendiyse
+    (content_hash eşleşirse) mevcut kayıt ve dosya yeniden kullanılır; önceki yazma başarısız olduysa
+    (dosya depolamada yoksa) dosya yeniden yazılır.
+    Yeni dosyalarda kayıt hemen oluşturulur, dosyanın depolamaya yazılması arka plana bırakılır.
+    Dosya adı önceden ayrılır; yazma sırasında ad çakışırsa kayıt güncellenir.
+    """
+    digest = image_digest(data)
+    existing = ImageUpload.objects.filter(content_hash=digest).first()
+    if existing is not None:
+        if upload_file_missing(existing):
+            write_upload_file(existing, existing.image.name, data)
+        return existing
+
+    field = ImageUpload._meta.get_field('image')
+    name = field.storage.get_available_name(field.generate_filename(None, filename), max_length=field.max_length)
+    try:
+        with transaction.atomic():
+            image_instance = ImageUpload.objects.create(image=name, content_hash=digest)
+    except IntegrityError:
+        # aynı içerik eşzamanlı başka bir istekte kaydedildi
+        return ImageUpload.objects.get(content_hash=digest)
+
+    write_upload_file(image_instance, name, data)
+    return image_instance
+
+PALETTE_IMAGE_MAX_AGE = 365 * 24 * 60 * 60  # palet görseli uç noktasının önbellek süresi (saniye)
+PALETTE_IMAGE_CONTENT_TYPES = {  # palet görseli formatları, çiziciler imaging.PALETTE_IMAGE_RENDERERS'dadır
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
 
 def handle_error(request, error_message): # hataları döndürmek için kullanılan fonksiyon
     return render(request, 'error.html', {'error': error_message})
 
+def busy_response(request, error): # eşzamanlılık sınırı/kuyruk dolu: istek bekletilmeden 503 ile reddedilir
+    response = render(request, 'error.html', {'error': str(error)}, status=503)
+    response['Retry-After'] = str(error.retry_after)
+    return response
+
 @login_required 
 def home(request):
     if request.method == 'POST':
@@ -108,11 +148,152 @@ def home(request):
     else:
         form = ImageUploadForm()
 
-    palettes = ColorPalette.objects.filter(user=request.user).select_related('image')
-    for palette in palettes:
-        palette.rgb_colors = palette.rgb_codes.split('|') if hasattr(palette, 'rgb_codes') else []
+    try:
+        palettes, next_cursor = palette_list_page(request)
+    except ValueError:
+        palettes, next_cursor = palette_list_page(request, cursor=None)  # geçersiz imleçte ilk sayfaya dön
+
+    list_params = {key: request.GET[key] for key in ('similar_to', 'metric') if request.GET.get(key)}
+    return render(request, 'home.html', {
+        'form': form,
+        'palettes': palettes,
+        'next_cursor': next_cursor,
+        'algorithms': sorted(PALETTE_ALGORITHMS),
+        'similar_to': list_params.get('similar_to'),
+        'list_query': urlencode(list_params) + '&' if list_params else '', # sonraki sayfalar aynı sıralamayla yüklenir
+    })
+
+def palette_colors_prefetch(lookup='colors'):
+    # paletlerin renkleri (rgb_colors) rgb_codes ayrıştırılmadan PaletteColor tablosundan, yalnızca hex için gereken sütunlarla
+    return Prefetch(lookup, queryset=PaletteColor.objects.only('palette_id', 'position', 'red', 'green', 'blue'))
+
+def palette_list_page(request, cursor=''):
+    """
+    Kullanıcının paletlerinden bir sayfa döndürür: (paletler, sonraki sayfa imleci).
+    Ağır sütunlar okunmaz, yalnızca listede gösterilen alanlar seçilir. Renkler rgb_codes ayrıştırılmadan
+    sayfanın tüm paletleri için tek sorguda PaletteColor tablosundan okunur (rgb_codes palet görseli sürümü içindir).
+    cursor verilmezse istekteki ?cursor= parametresi kullanılır.
+    """
+    if cursor == '':
+        cursor = request.GET.get('cursor')
+    queryset = (ColorPalette.objects.filter(user=request.user).select_related('image')
+                .only('id', 'created_at', 'rgb_codes', 'k_value', 'algorithm', 'image__id', 'image__image')
+                .prefetch_related(palette_colors_prefetch())) # renkler tek sorguda renk tablosundan
+    if request.GET.get('similar_to'):
+        return similar_palette_page(request, queryset, cursor)
+    return keyset_page(queryset, cursor, getattr(settings, 'PALETTES_PER_PAGE', 24))
+
+def similar_palette_page(request, queryset, cursor):
+    """
+    ?similar_to=<palet id> sıralaması: önce seçilen palet, sonra diğer paletler ona uzaklığa göre (?metric=, varsayılan emd).
+    Sıralama her sayfada palette_compare ile yeniden hesaplanır; imleç sıralamadaki konumdur. Paletlere distance eklenir.
+    """
+    from .palette_compare import rank_palettes # palet karşılaştırma (numpy) yalnızca bu sıralamada yüklenir
+
+    try:
+        palette_id = int(request.GET['similar_to'])
+        ranking = [(palette_id, 0.0)] + rank_palettes(request.user.id, palette_id, parse_metric(request.GET))
+    except (ValueError, ValidationError, KeyError):
+        raise Http404('Karşılaştırılacak palet bulunamadı.')
+    try:
+        offset = int(cursor or 0)
+    except ValueError as e:
+        raise ValueError('Geçersiz sayfa imleci.') from e
+    page_size = getattr(settings, 'PALETTES_PER_PAGE', 24)
+    page = ranking[offset:offset + page_size]
+    palettes = {palette.id: palette for palette in queryset.filter(id__in=[palette_id for palette_id, _ in page])}
+    items = []
+    for palette_id, distance in page:
+        if palette_id in palettes:
+            palettes[palette_id].distance = round(distance, 2)
+            items.append(palettes[palette_id])
+    return items, str(offset + page_size) if offset + page_size < len(ranking) else None
+
+@login_required
+def palette_list_json(request): # ana sayfadaki sonsuz kaydırma için aynı listenin json hali
+    try:
+        palettes, next_cursor = palette_list_page(request)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({
+        'palettes': [{
+            'id': palette.id,
+            'created_at': palette.created_at.isoformat(),
+            'colors': palette.rgb_colors,
+            'k_value': palette.k_value,
+            'algorithm': palette.algorithm,
+            'image_url': palette.image.image.url,
+            'palette_image_url': palette.palette_image_url,
+            'edit_url': reverse('edit_palette', args=[palette.id]),
+            'delete_url': reverse('delete_palette', args=[palette.id]),
+            'similar_url': f"{reverse('home')}?similar_to={palette.id}",
+            'distance': getattr(palette, 'distance', None),
+        } for palette in palettes],
+        'next_cursor': next_cursor,
+    })
+
+def parse_palette_options(data):
+    """
+    Formdan k, blur_kernel ve palet algoritmasını okur; geçersiz değerde kullanıcıya gösterilecek
+    mesajla ValidationError fırlatır. Dönüş: (k, blur_kernel, algorithm).
+    """
+    try:
+        k = int(data.get('k', 5))
+    except ValueError:
+        raise ValidationError('Geçersiz "k" değeri. Lütfen geçerli bir sayı girin.')
+    max_k = getattr(settings, 'PALETTE_MAX_K', 20)
+    if not 1 <= k <= max_k:
+        raise ValidationError(f'"k" değeri 1 ile {max_k} arasında olmalıdır.')
+    try:
+        blur_kernel = int(data.get('blur_kernel', 5))
+    except ValueError:
+        raise ValidationError('Geçersiz blur kernel değeri. Lütfen geçerli bir sayı girin.')
+    if blur_kernel % 2 == 0:  # gaussian blur için kernel tek sayı olmalı
+        raise ValidationError('Blur kernel değeri tek sayı olmalıdır.')
+    algorithm = data.get('algorithm') or PALETTE_ALGORITHMS[0]
+    if algorithm not in PALETTE_ALGORITHMS:
+        raise ValidationError(f'Geçersiz palet algoritması: {algorithm}')
+    return k, blur_kernel, algorithm
+
+def quick_palette(image_data, k, blur_kernel, algorithm, digest):
+    """
+    Yükleme yanıtından önce gösterilecek paleti döndürür (bkz. imaging.compute_preview_palette).
+    Önizleme en iyi çabadır: boru hattı doluysa ya da görsel çözülemezse None döner, palet yalnızca worker'da
+    oluşturulur ve hata iş kaydına yazılır.
+    """
+    from .imaging import compute_preview_palette # görüntü işleme modülü ilk kullanımda yüklenir
+
+    try:
+        return compute_preview_palette(image_data, k, blur_kernel, algorithm, digest)
+    except Exception:
+        return None
 
-    return render(request, 'home.html', {'form': form, 'palettes': palettes})
+def create_palette_job(user, image_instance, k, blur_kernel, algorithm, preview=None):
+    """
+    Palet işini oluşturur. Önizleme paleti varsa palet hemen kaydedilir ve işe bağlanır; worker aynı kaydı tam
+    kaliteli sonuçla yerinde günceller. Önizleme önbellekteki tam sonuçsa iş kuyruğa girmeden tamamlanmış olur.
+    """
+    finished = preview is not None and not preview['preview']
+    with transaction.atomic():
+        palette = None
+        if preview is not None:
+            palette = ColorPalette.objects.create(user=user, image=image_instance, rgb_codes='|'.join(preview['rgb_codes']),
+                                                  k_value=k, blur_kernel=blur_kernel, algorithm=algorithm)
+            replace_palette_colors([(palette.id, preview['rgb_codes'], preview['weights'])])
+        return PaletteJob.objects.create(
+            user=user,
+            image=image_instance,
+            k_value=k,
+            blur_kernel=blur_kernel,
+            algorithm=algorithm,
+            palette=palette,
+            status=PaletteJob.STATUS_DONE if finished else PaletteJob.STATUS_QUEUED,
+            finished_at=timezone.now() if finished else None,
+        )
+
+def job_queue_full_error():
+    return PipelineBusy('Palet kuyruğu dolu, lütfen biraz sonra tekrar deneyin.',
+                        retry_after=getattr(settings, 'PIPELINE_RETRY_AFTER', 5))
 
 @login_required
 def process_image(request):  # görüntünün adım adım işlendiği fonksiyon
@@ -122,77 +303,30 @@ def process_image(request):  # görüntünün adım adım işlendiği fonksiyon
             if not uploaded_image:
                 return handle_error(request, 'Görsel yüklenmedi, lütfen bir görsel seçin.')
             
-            # Görsel formatını doğrula
+            # Görsel formatını doğrula (yalnızca başlık baytları okunur)
             try:
                 validate_image_format(uploaded_image)
             except ValidationError as e:
                 return handle_error(request, str(e))
 
-            # Kullanıcıdan alınan k değeri
-            k = request.POST.get('k', 5)
+            # kullanıcıdan alınan k, blur_kernel ve palet algoritması
             try:
-                k = int(k)
-            except ValueError:
-                return handle_error(request, 'Geçersiz "k" değeri. Lütfen geçerli bir sayı girin.')
+                k, blur_kernel, algorithm = parse_palette_options(request.POST)
+            except ValidationError as e:
+                return handle_error(request, e.message)
 
-            # kullanıcıdan alınan blur_kernel değeri
-            blur_kernel = request.POST.get('blur_kernel', 5)
-            try:
-                blur_kernel = int(blur_kernel)
-                if blur_kernel % 2 == 0:  # gaussian blur için kernel tek sayı olmalı
-                    return handle_error(request, 'Blur kernel değeri tek sayı olmalıdır.')
-            except ValueError:
-                return handle_error(request, 'Geçersiz blur kernel değeri. Lütfen geçerli bir sayı girin.')
-
-            # Görüntü işleme
-            image_instance = ImageUpload.objects.create(image=uploaded_image)
-            image_path = image_instance.image.path
-
-            img_resized = load_and_resize_image(image_path) # yeniden boyutlandırma
-            img_blurred = apply_gaussian_blur(img_resized, (blur_kernel, blur_kernel))  # Kullanıcıdan alınan blur değeri
-            img_lab = convert_to_lab(img_blurred) # görüntü LAB formatına çevirme
-            centroids_lab = apply_kmeans(img_lab, k) # LAB'a çevirilen görüntüye KMeans algoritması uygulama
-            centroids_rgb = lab_to_rgb(centroids_lab) # LAB türünde olan görüntüyü RGB formatına çevirme.
-
-            # Paleti görsel olarak oluştur
-            palette_image = visualize_palette(centroids_rgb)
-
-            # Görseli base64 formatında kaydetme
-            palette_base64 = save_palette_to_base64(palette_image)
-            
-            # Gaussian Blur ve LAB uzayı görsellerini kaydet
-            blurred_image_path = save_image_to_file(img_blurred, 'blurred_image.png')
-            lab_image_path = save_image_to_file(img_lab, 'lab_image.png')
-
-            # Renk kodlarını oluştur
-            rgb_codes = ['#{:02x}{:02x}{:02x}'.format(int(c[0]), int(c[1]), int(c[2])) for c in centroids_rgb]
-            rgb_code_string = '|'.join(rgb_codes)
-
-            """ 
-            Veritabanına kaydetme işlemleri
-            kullanıcı,
-            görsel,
-            paletin görseli,
-            rgb kodunu string şeklinde
-            k değerini
-            """
-            ColorPalette.objects.create(
-                user=request.user, 
-                image=image_instance,
-                palette_image=palette_base64,
-                rgb_codes=rgb_code_string,
-                k_value=k
-            )
+            # kuyruk sınırı doluysa iş eklenmez, istemci Retry-After süresi sonra tekrar dener
+            queue_limit = getattr(settings, 'PALETTE_JOB_QUEUE_LIMIT', None)
+            if queue_limit is not None and PaletteJob.objects.filter(status=PaletteJob.STATUS_QUEUED).count() >= queue_limit:
+                return busy_response(request, job_queue_full_error())
 
-            return render(request, 'palette.html', {
-                'palette_image': palette_base64,
-                'rgb_codes': rgb_codes,
-                'uploaded_image_url': image_instance.image.url,
-                'blurred_image_url': blurred_image_path,
-                'lab_image_url': lab_image_path,
-                'k_value': k,
-                'blur_kernel': blur_kernel
-            })
+            # Görsel başlığı kontrol edildi; istek küçük bir çalışma görüntüsünden hızlı bir önizleme paleti
+            # hesaplayıp kaydeder, tam kaliteli palet palette_worker tarafından hesaplanıp aynı kayda yazılır.
+            image_data = uploaded_image.read()
+            image_instance = store_upload(uploaded_image.name, image_data) # depolamaya yazma arka planda yapılır
+            preview = quick_palette(image_data, k, blur_kernel, algorithm, image_instance.content_hash)
+            job = create_palette_job(request.user, image_instance, k, blur_kernel, algorithm, preview)
+            return redirect('palette_job', job_id=job.id)
 
         except FileNotFoundError:
             return handle_error(request, 'Görsel bulunamadı. Lütfen tekrar deneyin.')
@@ -205,52 +339,514 @@ def process_image(request):  # görüntünün adım adım işlendiği fonksiyon
 @login_required
 def edit_palette(request, palette_id):
     try:
-        palette = get_object_or_404(ColorPalette, id=palette_id, user=request.user)
+        palette = get_object_or_404(ColorPalette.objects.select_related('image'), id=palette_id, user=request.user)
         image_instance = palette.image
-        image_path = image_instance.image.path
-        k = palette.k_value # daha önce belirlenen renk kümesi sayısı
-
-        img_resized = load_and_resize_image(image_path)
-        # blur kernel varsayımı veya kullanıcıdan alınması
-        blur_kernel = 5  # varsayılan kernel değeri, gerekirse değiştirilir.
-        img_blurred = apply_gaussian_blur(img_resized, (blur_kernel, blur_kernel))
-        img_lab = convert_to_lab(img_resized)
-        centroids_lab = apply_kmeans(img_lab, k)
-        centroids_rgb = lab_to_rgb(centroids_lab)
-        blurred_image_path = save_image_to_file(img_blurred, 'blurred_image_edit.png') # Blurlanmış görselleri oluştur ve kaydet.
-        lab_image_path = save_image_to_file(img_lab, 'lab_image_edit.png') # Lab görselleri kaydetme.
-        # Paleti görsel olarak oluştur
-        palette_image = visualize_palette(centroids_rgb)
-        # Görseli base64 formatında kaydetme
-        palette_base64 = save_palette_to_base64(palette_image)
-        # Renk kodlarını oluştur
-        rgb_codes = ['#{:02x}{:02x}{:02x}'.format(int(c[0]), int(c[1]), int(c[2])) for c in centroids_rgb]
-
-        # Veritabanını güncelle
-        palette.palette_image = palette_base64 # yeni renk paletini kaydeder
-        palette.rgb_codes = '|'.join(rgb_codes) # renk kodlarını string olarak kaydeder
-        palette.save()
+        # k ve blur kernel istekte verilmezse paletin kendi değerleri kullanılır (palet hangi blur ile çıkarıldıysa)
+        try:
+            k, blur_kernel = parse_edit_options(request.POST if request.method == 'POST' else request.GET, palette)
+        except ValidationError as e:
+            return handle_error(request, e.message)
+
+        # KMeans paletleri mevcut renklerinden başlayarak görselin önbellekteki LAB histogramı üzerinde kısaca
+        # yeniden kümelenir; histogram önbellekteyse görsel dosyası okunmaz (bkz. imaging.compute_edited_palette)
+        from .imaging import compute_edited_palette # görüntü işleme modülü ilk kullanımda yüklenir
+
+        result = compute_edited_palette(lambda: read_field_file(image_instance.image), palette.rgb_codes, k, blur_kernel,
+                                        palette.algorithm, digest=image_instance.content_hash) # palet hangi algoritmayla üretildiyse onunla yeniden hesaplanır
+        rgb_codes = result['rgb_codes']
+
+        # Veritabanını güncelle (palet görseli rgb kodlarından istek anında üretilir)
+        save_edited_palette(palette, k, blur_kernel, result)
 
         """
         Test için kullanılan yönlendirme
         return redirect('home')  # Burada 'home', yönlendirme yapılacak URL'nin adı.
         """
-        return render(request, 'palette.html', {
-            'palette_image': palette_base64,
-            'rgb_codes': rgb_codes,
-            'blurred_image_url': blurred_image_path,
-            'lab_image_url': lab_image_path,
-            'uploaded_image_url': image_instance.image.url,
-            'k_value': k
-        })
+        return render(request, 'palette.html', edited_palette_context(palette, rgb_codes))
+    except PipelineBusy as e:
+        return busy_response(request, e)
     except Exception as e:
         return render(request, 'error.html', {'error': str(e)})
 
+def save_edited_palette(palette, k, blur_kernel, result):
+    # rgb_codes ve renk tablosu aynı işlemde (transaction) güncellenir
+    with transaction.atomic():
+        palette.rgb_codes = '|'.join(result['rgb_codes']) # renk kodlarını string olarak kaydeder
+        palette.k_value = k
+        palette.blur_kernel = blur_kernel
+        palette.save()
+        replace_palette_colors([(palette.id, result['rgb_codes'], result['weights'])])
+
+def parse_edit_options(data, palette):
+    """Düzenleme isteğindeki k ve blur_kernel değerlerini okur, verilmeyenler paletten alınır: (k, blur_kernel)."""
+    k, blur_kernel, _ = parse_palette_options({
+        'k': data.get('k') or palette.k_value,
+        'blur_kernel': data.get('blur_kernel') or palette.blur_kernel,
+    })
+    return k, blur_kernel
+
+def edited_palette_context(palette, rgb_codes): # edit_palette ve edit_palette_async'in sayfa bağlamı
+    return {
+        'palette_image': palette.palette_image_url,
+        'palette_id': palette.id,
+        'rgb_codes': rgb_codes,
+        'blurred_image_url': preview_url(palette.id, 'blurred', palette.blur_kernel),
+        'lab_image_url': preview_url(palette.id, 'lab', palette.blur_kernel),
+        'uploaded_image_url': palette.image.image.url,
+        'k_value': palette.k_value,
+        'blur_kernel': palette.blur_kernel,
+        'algorithm': palette.algorithm
+    }
+
+def read_field_file(field_file): # depolamadaki dosyanın tüm baytlarını okur
+    with field_file.open('rb') as file:
+        return file.read()
+
+# ASGI dağıtımı için async görünümler (PALETTE_ASYNC_VIEWS=True iken urls.py bunları kullanır)
+# Yükleme ve dosya okuma iş parçacıklarında, ORM çağrıları async API'si (acreate, asave, aget) ile yapılır;
+# CPU yoğun çözme ve kümeleme süreç havuzunda çalıştığı için tek bir ASGI worker'ı aynı anda çok sayıda isteği kabul eder.
+# Şablonlar request.user'a (tembel, veritabanından yüklenir) eriştiği için sayfalar da iş parçacığında çizilir.
+arender = sync_to_async(render)
+ahandle_error = sync_to_async(handle_error)
+abusy_response = sync_to_async(busy_response)
+
+async def aquick_palette(image_data, k, blur_kernel, algorithm, digest): # quick_palette'in async karşılığı
+    from .imaging import acompute_preview_palette
+
+    try:
+        return await acompute_preview_palette(image_data, k, blur_kernel, algorithm, digest)
+    except Exception:
+        return None
+
+@login_required
+async def process_image_async(request):
+    """process_image'ın async karşılığı: doğrulama ve hata mesajları aynıdır, önizleme süreç havuzunda hesaplanır."""
+    if request.method != 'POST':
+        return redirect('home')
+    try:
+        files = await sync_to_async(lambda: request.FILES)() # multipart ayrıştırma olay döngüsünü bekletmez
+        uploaded_image = files.get('image')
+        if not uploaded_image:
+            return await ahandle_error(request, 'Görsel yüklenmedi, lütfen bir görsel seçin.')
+        try:
+            validate_image_format(uploaded_image) # yalnızca başlık baytları okunur
+            k, blur_kernel, algorithm = parse_palette_options(request.POST)
+        except ValidationError as e:
+            return await ahandle_error(request, e.message)
+
+        queue_limit = getattr(settings, 'PALETTE_JOB_QUEUE_LIMIT', None)
+        if queue_limit is not None and await PaletteJob.objects.filter(status=PaletteJob.STATUS_QUEUED).acount() >= queue_limit:
+            return await abusy_response(request, job_queue_full_error())
+
+        image_data = await sync_to_async(uploaded_image.read, thread_sensitive=False)()
+        image_instance = await sync_to_async(store_upload)(uploaded_image.name, image_data) # içerik özeti ve ORM iş parçacığında
+        preview = await aquick_palette(image_data, k, blur_kernel, algorithm, image_instance.content_hash)
+        job = await sync_to_async(create_palette_job)(await request.auser(), image_instance, k, blur_kernel, algorithm, preview)
+        return redirect('palette_job', job_id=job.id)
+    except FileNotFoundError:
+        return await ahandle_error(request, 'Görsel bulunamadı. Lütfen tekrar deneyin.')
+    except Exception as e:
+        return await ahandle_error(request, f'Bilinmeyen bir hata oluştu: {str(e)}')
+
+@login_required
+async def edit_palette_async(request, palette_id):
+    """edit_palette'in async karşılığı: histogram önbellekte değilse görsel okunur, kümeleme süreç havuzunda çalışır."""
+    from .imaging import acompute_edited_palette # görüntü işleme modülü ilk kullanımda yüklenir
+
+    try:
+        palette = await aget_object_or_404(ColorPalette.objects.select_related('image'), id=palette_id, user=await request.auser())
+        image_instance = palette.image
+        try:
+            k, blur_kernel = parse_edit_options(request.POST if request.method == 'POST' else request.GET, palette)
+        except ValidationError as e:
+            return await ahandle_error(request, e.message)
+        result = await acompute_edited_palette(lambda: read_field_file(image_instance.image), palette.rgb_codes, k,
+                                               blur_kernel, palette.algorithm, digest=image_instance.content_hash)
+        rgb_codes = result['rgb_codes']
+
+        await sync_to_async(save_edited_palette)(palette, k, blur_kernel, result)
+        return await arender(request, 'palette.html', edited_palette_context(palette, rgb_codes))
+    except PipelineBusy as e:
+        return await abusy_response(request, e)
+    except Exception as e:
+        return await arender(request, 'error.html', {'error': str(e)})
+
+def read_batch_files(files):
+    """
+    Toplu yüklemedeki dosyaları okur: (dosya adı, baytlar, hata mesajı) listesi döndürür.
+    Formatı geçersiz dosyalar okunmaz, hata mesajıyla işaretlenir; toplu işin geri kalanı devam eder.
+    """
+    entries = []
+    for uploaded_file in files:
+        try:
+            validate_image_format(uploaded_file)
+        except ValidationError as e:
+            entries.append((uploaded_file.name, None, e.message))
+            continue
+        entries.append((uploaded_file.name, uploaded_file.read(), None))
+    return entries
+
+def batch_request_error(files, data):
+    """Toplu yükleme isteğini doğrular; sorun varsa kullanıcıya gösterilecek mesajı, yoksa None döndürür."""
+    if not files:
+        return 'Görsel yüklenmedi, lütfen en az bir görsel seçin.'
+    max_files = getattr(settings, 'PALETTE_BATCH_MAX_FILES', 50)
+    if len(files) > max_files:
+        return f'Bir seferde en fazla {max_files} görsel yüklenebilir.'
+    try:
+        parse_palette_options(data)
+    except ValidationError as e:
+        return e.message
+    return None
+
+def batch_response(events):
+    """İlerleme olaylarını satır satır json (NDJSON) olarak akıtan yanıt; her satır görsel bitince gönderilir."""
+    response = StreamingHttpResponse(events, content_type='application/x-ndjson')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # nginx gibi ters vekillerin yanıtı tamponlamasını engeller
+    return response
+
+@login_required
+def process_batch(request):
+    """
+    Çok sayıda görseli (images alanı) ortak k, blur_kernel ve algoritma ile tek istekte işler.
+    Görseller süreç havuzunda paralel işlenir, her biri bitince ilerleme satırı akıtılır (bkz. batch.PaletteBatch).
+    """
+    if request.method != 'POST':
+        return redirect('home')
+    files = request.FILES.getlist('images')
+    error = batch_request_error(files, request.POST)
+    if error:
+        return JsonResponse({'error': error}, status=400)
+    k, blur_kernel, algorithm = parse_palette_options(request.POST)
+    batch = PaletteBatch(request.user, read_batch_files(files), k, blur_kernel, algorithm)
+    return batch_response(json.dumps(event) + '\n' for event in batch)
+
+@login_required
+async def process_batch_async(request):
+    """process_batch'in async karşılığı: havuz beklenirken olay döngüsü serbesttir."""
+    if request.method != 'POST':
+        return redirect('home')
+    files = await sync_to_async(lambda: request.FILES.getlist('images'))() # multipart ayrıştırma iş parçacığında
+    error = batch_request_error(files, request.POST)
+    if error:
+        return JsonResponse({'error': error}, status=400)
+    k, blur_kernel, algorithm = parse_palette_options(request.POST)
+    entries = await sync_to_async(read_batch_files, thread_sensitive=False)(files)
+    batch = PaletteBatch(await request.auser(), entries, k, blur_kernel, algorithm)
+
+    async def events():
+        async for event in batch:
+            yield json.dumps(event) + '\n'
+    return batch_response(events())
+
+def parse_sweep_options(data):
+    """
+    Çoklu k taraması için k aralığını, blur kernel'i ve algoritmayı okur: (k_values, blur_kernel, algorithm).
+    Geçersiz değerde kullanıcıya gösterilecek mesajla ValidationError fırlatır.
+    """
+    max_k = getattr(settings, 'PALETTE_SWEEP_MAX_K', 16)
+    try:
+        k_min, k_max = int(data.get('k_min', 3)), int(data.get('k_max', 10))
+    except ValueError:
+        raise ValidationError('Geçersiz k aralığı. Lütfen geçerli sayılar girin.')
+    if not 1 <= k_min <= k_max <= max_k:
+        raise ValidationError(f'k aralığı 1 ile {max_k} arasında olmalı ve k_min, k_max\'tan büyük olmamalıdır.')
+    _, blur_kernel, algorithm = parse_palette_options({'blur_kernel': data.get('blur', 5), 'algorithm': data.get('algorithm')})
+    return list(range(k_min, k_max + 1)), blur_kernel, algorithm
+
+@login_required
+def palette_sweep(request, palette_id):
+    """
+    Paletin görseli için k_min..k_max aralığındaki tüm paletleri, skorlarını ve önerilen k'yı tek json
+    yanıtında döndürür (palet sayfasındaki k kaydırıcısı yeni istek yapmadan bu yanıtı kullanır).
+    POST ile gönderilen k, taramadaki paletiyle birlikte palete kaydedilir.
+    """
+    palette = get_object_or_404(ColorPalette.objects.select_related('image'), id=palette_id, user=request.user)
+    data = request.POST if request.method == 'POST' else request.GET
+    try:
+        k_values, blur_kernel, algorithm = parse_sweep_options(dict(
+            data.items(), blur=data.get('blur') or palette.blur_kernel, algorithm=data.get('algorithm') or palette.algorithm,
+        ))
+    except ValidationError as e:
+        return JsonResponse({'error': e.message}, status=400)
+
+    from .imaging import compute_palette_sweep # görüntü işleme modülü ilk kullanımda yüklenir
+    try:
+        sweep = compute_palette_sweep(read_field_file(palette.image.image), k_values, blur_kernel, algorithm,
+                                      digest=palette.image.content_hash)
+    except PipelineBusy as e:
+        response = JsonResponse({'error': str(e)}, status=503)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+    except FileNotFoundError:
+        raise Http404('Görsel bulunamadı.')
+
+    if request.method == 'POST':
+        try:
+            chosen = next(row for row in sweep['palettes'] if row['k'] == int(data.get('k', '')))
+        except (ValueError, StopIteration):
+            return JsonResponse({'error': 'Seçilen k taranan aralıkta olmalıdır.'}, status=400)
+        palette.rgb_codes = '|'.join(chosen['rgb_codes'])
+        palette.k_value = chosen['k']
+        palette.algorithm = algorithm
+        palette.blur_kernel = blur_kernel
+        with transaction.atomic():
+            palette.save(update_fields=['rgb_codes', 'k_value', 'algorithm', 'blur_kernel', 'updated_at'])
+            replace_palette_colors([(palette.id, chosen['rgb_codes'], chosen['weights'])])
+        return JsonResponse({'palette_id': palette.id, 'k': palette.k_value, 'rgb_codes': chosen['rgb_codes'],
+                             'palette_image_url': palette.palette_image_url})
+    return JsonResponse(dict(sweep, palette_id=palette.id, algorithm=algorithm, blur_kernel=blur_kernel))
+
+def parse_metric(data):
+    metric = data.get('metric') or PALETTE_METRICS[0]
+    if metric not in PALETTE_METRICS:
+        raise ValidationError(f"Geçersiz palet uzaklığı. Seçenekler: {', '.join(PALETTE_METRICS)}.")
+    return metric
+
+@login_required
+def palette_compare(request, palette_id):
+    """
+    Paleti kullanıcının diğer tüm paletleriyle karşılaştırır (json), en benzer n palet uzaklığa göre sıralı döner.
+    ?metric=emd (varsayılan, piksel paylarıyla Sinkhorn EMD) ya da nearest (en yakın renk ortalaması), renk farkı CIEDE2000.
+    ?max_distance= verilirse yalnızca bu uzaklıktan yakın paletler döner (ör. neredeyse aynı paletleri bulmak için).
+    """
+    get_object_or_404(ColorPalette.objects.only('id'), id=palette_id, user=request.user)
+    max_results = getattr(settings, 'PALETTE_SEARCH_MAX_RESULTS', 50)
+    try:
+        metric = parse_metric(request.GET)
+        n = int(request.GET.get('n', 20))
+        max_distance = float(request.GET['max_distance']) if request.GET.get('max_distance') else None
+    except ValidationError as e:
+        return JsonResponse({'error': e.message}, status=400)
+    except ValueError:
+        return JsonResponse({'error': 'Geçersiz n ya da max_distance değeri.'}, status=400)
+    if not 1 <= n <= max_results:
+        return JsonResponse({'error': f'Sonuç sayısı 1 ile {max_results} arasında olmalıdır.'}, status=400)
+
+    from .palette_compare import rank_palettes # palet karşılaştırma (numpy) yalnızca bu uç noktada yüklenir
+    try:
+        ranking = rank_palettes(request.user.id, palette_id, metric)
+    except KeyError:
+        raise Http404('Paletin renkleri bulunamadı.')
+    matches = [(other, distance) for other, distance in ranking if max_distance is None or distance <= max_distance][:n]
+    palettes = ColorPalette.objects.only('id', 'rgb_codes').in_bulk([other for other, _ in matches])
+    return JsonResponse({
+        'palette_id': palette_id,
+        'metric': metric,
+        'compared': len(ranking),
+        'results': [{
+            'palette_id': other,
+            'distance': round(distance, 3),
+            'colors': palettes[other].rgb_codes.split('|'),
+            'palette_image_url': palettes[other].palette_image_url,
+            'edit_url': reverse('edit_palette', args=[other]),
+        } for other, distance in matches if other in palettes],
+    })
+
+HEX_COLOR_RE = re.compile(r'^#?[0-9a-fA-F]{6}$')
+
+def parse_search_options(data):
+    """
+    Renk araması için sorguyu ve sonuç sayısını okur: ('color', hex) ya da ('palette', palet id) ve n.
+    Geçersiz değerde kullanıcıya gösterilecek mesajla ValidationError fırlatır.
+    """
+    max_results = getattr(settings, 'PALETTE_SEARCH_MAX_RESULTS', 50)
+    try:
+        n = int(data.get('n', 10))
+    except ValueError:
+        raise ValidationError('Geçersiz sonuç sayısı.')
+    if not 1 <= n <= max_results:
+        raise ValidationError(f'Sonuç sayısı 1 ile {max_results} arasında olmalıdır.')
+    color, palette_id = data.get('color'), data.get('palette')
+    if bool(color) == bool(palette_id):
+        raise ValidationError('Aramak için color ya da palette parametrelerinden biri verilmelidir.')
+    if color:
+        if not HEX_COLOR_RE.match(color):
+            raise ValidationError('Renk #rrggbb biçiminde olmalıdır.')
+        return ('color', color), n
+    try:
+        return ('palette', int(palette_id)), n
+    except ValueError:
+        raise ValidationError('Geçersiz palet id.')
+
+@login_required
+def palette_search(request):
+    """
+    Kullanıcının paletlerinde renk araması (json). ?color=#1e90ff verilirse bu renge en yakın rengi içeren paletler
+    Delta E'ye (CIE76) göre, ?palette=<id> verilirse o palete en çok benzeyen paletler palet uzaklığına göre sıralı döner.
+    Arama süreç içi ızgara indeksinde yapılır (bkz. color_search.py); yalnızca isteği yapan kullanıcının paletleri aranır.
+    """
+    try:
+        (kind, query), n = parse_search_options(request.GET)
+    except ValidationError as e:
+        return JsonResponse({'error': e.message}, status=400)
+
+    from .color_search import get_search_index # arama indeksi (numpy) yalnızca bu uç noktada yüklenir
+    index = get_search_index()
+    if kind == 'palette':
+        get_object_or_404(ColorPalette.objects.only('id'), id=query, user=request.user)
+        search = lambda: [(palette_id, {'distance': round(distance, 3)})
+                          for palette_id, distance in index.similar_palettes(request.user.id, query, n)]
+    else:
+        lab = rgb_to_lab(*hex_to_rgb(query))
+        search = lambda: [(palette_id, {'delta_e': round(delta_e, 3), 'position': position})
+                          for palette_id, delta_e, position in index.nearest_palettes(request.user.id, lab, n)]
+
+    matches = search()
+    palettes = ColorPalette.objects.filter(user=request.user, id__in=[palette_id for palette_id, _ in matches]).only('id', 'rgb_codes')
+    palettes = {palette.id: palette for palette in palettes}
+    if len(palettes) < len(matches):
+        # başka bir süreçte silinen paletler indeksten çıkarılıp arama bir kez tekrarlanır
+        for palette_id, _ in matches:
+            if palette_id not in palettes:
+                index.discard_palette(palette_id)
+        matches = search()
+        palettes.update((palette.id, palette) for palette in ColorPalette.objects.filter(
+            user=request.user, id__in=[palette_id for palette_id, _ in matches if palette_id not in palettes],
+        ).only('id', 'rgb_codes'))
+
+    results = []
+    for palette_id, match in matches:
+        palette = palettes.get(palette_id)
+        if palette is None:
+            continue
+        colors = palette.rgb_codes.split('|')
+        if 'position' in match:
+            match['color'] = colors[match['position']] if match['position'] < len(colors) else None
+        results.append(dict(match, palette_id=palette_id, colors=colors, palette_image_url=palette.palette_image_url,
+                            edit_url=reverse('edit_palette', args=[palette_id])))
+    return JsonResponse({'query': {kind: query}, 'results': results})
+
+@login_required
+def palette_job(request, job_id):
+    """
+    Kuyruğa eklenen palet işinin sayfası: iş bittiyse palet gösterilir. Bitmediyse (varsa) önizleme paleti
+    gösterilir ve sayfa palette_job_status uç noktasını yoklar (polling); tam palet gelince renkler yerinde güncellenir.
+    """
+    job = get_object_or_404(PaletteJob.objects.select_related('palette', 'image').prefetch_related(palette_colors_prefetch('palette__colors')),
+                            id=job_id, user=request.user)
+    context = {
+        'job': job,
+        'uploaded_image_url': job.image.image.url,
+        'k_value': job.k_value,
+        'blur_kernel': job.blur_kernel,
+        'algorithm': job.algorithm,
+    }
+    if job.palette and job.status != PaletteJob.STATUS_FAILED: # iş bitmediyse önizleme paleti gösterilir
+        context.update({
+            'palette_image': job.palette.palette_image_url,
+            'palette_id': job.palette_id,
+            'rgb_codes': job.palette.rgb_colors,
+            'blurred_image_url': preview_url(job.palette_id, 'blurred', job.blur_kernel),
+            'lab_image_url': preview_url(job.palette_id, 'lab', job.blur_kernel),
+        })
+    return render(request, 'palette.html', context)
+
+@login_required
+def palette_job_status(request, job_id): # palet sayfasının yokladığı json durum uç noktası
+    job = get_object_or_404(PaletteJob, id=job_id, user=request.user)
+    data = {'id': job.id, 'status': job.status, 'palette_id': job.palette_id, 'error': job.error}
+    if job.palette_id:  # iş bitmediyse önizleme paletinin renkleri
+        palette = ColorPalette.objects.only('rgb_codes').prefetch_related(palette_colors_prefetch()).get(id=job.palette_id)
+        data.update(rgb_codes=palette.rgb_colors, palette_image_url=palette.palette_image_url)
+    return JsonResponse(data)
+
+@login_required
+def palette_image_view(request, palette_id, image_format='png'):
+    """
+    Palet şeridini rgb_codes alanından istek anında PNG ya da SVG olarak üretir.
+    Güçlü ETag ve uzun süreli Cache-Control başlıkları döner, If-None-Match ile koşullu GET'te 304 verir.
+    URL'deki ?v= parametresi ETag'e eşittir; palet düzenlenince URL değiştiği için uzun önbellek süresi güvenlidir.
+    """
+    if image_format not in PALETTE_IMAGE_CONTENT_TYPES:
+        raise Http404('Desteklenmeyen palet görseli formatı.')
+    rgb_codes = get_object_or_404(
+        ColorPalette.objects.filter(user=request.user).values_list('rgb_codes', flat=True), id=palette_id,
+    )
+    etag = f'"{palette_image_etag(rgb_codes, image_format)}"'
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        from .imaging import PALETTE_IMAGE_RENDERERS # 304 yanıtlarında görüntü işleme modülü hiç yüklenmez
+        render_palette = PALETTE_IMAGE_RENDERERS[image_format]
+        response = HttpResponse(render_palette(rgb_codes), content_type=PALETTE_IMAGE_CONTENT_TYPES[image_format])
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=PALETTE_IMAGE_MAX_AGE)
+    return response
+
+def metrics_view(request):
+    """
+    Süreç içi metrikleri (aşama süreleri, görsel boyutları, k, önbellek isabetleri, kuyruk derinliği)
+    Prometheus metin formatında döndürür. Varsayılan olarak kapalıdır: METRICS_TOKEN ayarlanmışsa
+    'Authorization: Bearer <token>' istenir; ayarlanmamışsa yalnızca DEBUG'da ya da INTERNAL_IPS'teki adreslerden açılır.
+    """
+    if not getattr(settings, 'METRICS_ENABLED', True):
+        raise Http404('Metrikler kapalı.')
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        if not secrets.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse('Yetkisiz.', status=401)
+    elif not (settings.DEBUG or request.META.get('REMOTE_ADDR') in getattr(settings, 'INTERNAL_IPS', ())):
+        return HttpResponse('Yetkisiz.', status=403)
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+def preview_url(palette_id, kind, blur_kernel):
+    return f"{reverse('palette_preview', args=[palette_id, kind])}?blur={blur_kernel}"
+
+@login_required
+def palette_preview(request, palette_id, kind):
+    """
+    Paletin görselinden bulanık ya da LAB önizlemeyi ilk istendiğinde üretir ve depolamadaki
+    içerik adresli dosyaya yönlendirir. Hedef dosyanın adı içeriğe bağlı olduğundan yönlendirme önbelleğe alınabilir.
+    """
+    from .previews import PREVIEW_KINDS, get_or_create_preview # önizleme üretimi yalnızca bu uç noktada gerekir
+
+    if kind not in PREVIEW_KINDS:
+        raise Http404('Bilinmeyen önizleme türü.')
+    try:
+        blur_kernel = int(request.GET.get('blur', 5))
+    except ValueError:
+        return HttpResponseBadRequest('Geçersiz blur kernel değeri.')
+    if blur_kernel < 1 or blur_kernel % 2 == 0 or blur_kernel > 99:
+        return HttpResponseBadRequest('Blur kernel değeri 1-99 arasında tek sayı olmalıdır.')
+
+    palette = get_object_or_404(ColorPalette.objects.select_related('image'), id=palette_id, user=request.user)
+    try:
+        name = get_or_create_preview(palette.image, kind, blur_kernel)
+    except FileNotFoundError:
+        raise Http404('Görsel bulunamadı.')
+    response = redirect(default_storage.url(name))
+    patch_cache_control(response, private=True, max_age=PALETTE_IMAGE_MAX_AGE)
+    return response
+
+@login_required
+def export_palettes(request):
+    """
+    Kullanıcının bütün paletlerini ZIP arşivi olarak indirir: her palet için .gpl (GIMP), .ase (Adobe), .css, .json ve .png.
+    Arşiv üretildikçe akıtılır (bkz. palette_export.py), palet sayısı ne olursa olsun bellek kullanımı sabit kalır.
+    """
+    chunks = export_palettes_zip(request.user)
+    if getattr(settings, 'PALETTE_ASYNC_VIEWS', False):
+        chunks = aiter_in_thread(chunks)  # ASGI'de akış parça parça iş parçacığında üretilir
+    response = StreamingHttpResponse(chunks, content_type='application/zip')
+    response['Content-Disposition'] = content_disposition_header(True, f'palettes-{request.user.username}.zip')
+    response['X-Accel-Buffering'] = 'no'  # nginx gibi ters vekillerin yanıtı tamponlamasını engeller
+    return response
+
 @login_required
 def delete_palette(request, palette_id):
     try:
         palette = get_object_or_404(ColorPalette, id=palette_id, user=request.user)
-        palette.delete()
+        # önizleme paleti silindiyse bekleyen iş de silinir, çalışan iş iptal edilir (worker sonucu yazmaz);
+        # worker silinen paleti yeniden oluşturmaz
+        with transaction.atomic():
+            PaletteJob.objects.filter(palette=palette, status=PaletteJob.STATUS_QUEUED).delete()
+            PaletteJob.objects.filter(palette=palette, status=PaletteJob.STATUS_RUNNING).update(
+                status=PaletteJob.STATUS_FAILED, error='Palet silindiği için iş iptal edildi.',
+                finished_at=timezone.now(), updated_at=timezone.now(),
+            )
+            palette.delete()
         return redirect('home')
     except Exception as e:
         return render(request, 'error.html', {'error': str(e)})